@@ -0,0 +1,124 @@
+from celery import Celery
+from celery.schedules import crontab
+from celery.signals import celeryd_init, setup_logging, task_postrun, task_prerun, worker_process_init
+from kombu import Queue
+from app.utils.logging_config import configure_logging
+from app.utils.metrics import get_recorder, start_metrics_server
+from app.utils.profiling import install_signal_trigger
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Prefork child N serves Prometheus metrics on CELERY_METRICS_PORT + N; 0 disables
+CELERY_METRICS_PORT = int(os.getenv("CELERY_METRICS_PORT", "0"))
+
+# Queues, each consumed by its own worker (`-Q <queue>`) so heavy inference never delays reminder sends:
+#   dispatch: time-sensitive reminder sends; analysis: NLP inference; exports: large result payloads;
+#   default: maintenance
+QUEUE_DISPATCH, QUEUE_ANALYSIS, QUEUE_EXPORTS, QUEUE_DEFAULT = "dispatch", "analysis", "exports", "default"
+# Messages prefetched per worker process. Long analysis and export tasks take one at a time, so a
+# busy process never holds tasks another idle process could run
+QUEUE_PREFETCH = {QUEUE_DISPATCH: 4, QUEUE_ANALYSIS: 1, QUEUE_EXPORTS: 1, QUEUE_DEFAULT: 4}
+# Queues a worker consumes (set from -Q when the worker starts; all queues when -Q is omitted)
+worker_queues = set(QUEUE_PREFETCH)
+
+# Configure Celery with Redis as broker and backend
+celery_app = Celery(
+    main="patient_feedback",
+    broker=os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"),
+    backend=os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
+)
+
+# Celery configuration
+celery_app.conf.timezone = "UTC"
+celery_app.conf.task_serializer = "json"
+celery_app.conf.accept_content = ["json"]
+celery_app.conf.result_serializer = "json"
+celery_app.conf.result_compression = "gzip"  # Only export results are stored, and they are large
+celery_app.conf.result_expires = 86400  # Results expire after 24 hours
+celery_app.conf.task_ignore_result = True  # Tasks whose result is read opt in with ignore_result=False
+
+celery_app.conf.task_queues = [Queue(name) for name in QUEUE_PREFETCH]
+celery_app.conf.task_default_queue = QUEUE_DEFAULT
+celery_app.conf.task_routes = {
+    "app.tasks.trigger_reminders_task": {"queue": QUEUE_DISPATCH},
+    "app.tasks.analyze_feedback_task": {"queue": QUEUE_ANALYSIS},
+    "app.tasks.transcribe_feedback_task": {"queue": QUEUE_ANALYSIS},
+    "app.tasks.reanalyze_feedback_task": {"queue": QUEUE_ANALYSIS},
+    "app.tasks.export_feedback_csv_task": {"queue": QUEUE_EXPORTS},
+}
+# Redis: tasks not acknowledged within this time (e.g. acks-late analysis on a dead worker) are redelivered.
+# Every acks-late task must finish well within it (reanalysis is one task per batch), or it runs twice
+celery_app.conf.broker_transport_options = {"visibility_timeout": 3 * 3600}
+
+
+@celeryd_init.connect
+def tune_worker_for_queues(sender=None, conf=None, options=None, **kwargs):
+    # Runs in the worker's main process before the pool forks, so children inherit the settings
+    queues = (options or {}).get("queues")
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    if queues:
+        worker_queues.clear()
+        worker_queues.update(queue.strip() for queue in queues)
+    # The smallest prefetch among the consumed queues; -O fair stops one child hoarding long tasks
+    conf.worker_prefetch_multiplier = min(QUEUE_PREFETCH.get(queue, 4) for queue in worker_queues)
+    logger.info("Worker consuming %s with prefetch %s", sorted(worker_queues), conf.worker_prefetch_multiplier)
+
+
+@setup_logging.connect
+def configure_worker_logging(**kwargs):
+    # Use the application's queued JSON logging instead of Celery's own handlers
+    configure_logging()
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    # Each prefork child keeps its own metrics registry, so each gets its own scrape port
+    if CELERY_METRICS_PORT:
+        from billiard.process import current_process
+        start_metrics_server(CELERY_METRICS_PORT + (current_process().index or 0))
+    # `kill -USR2 <pid>` writes a PROFILE_SIGNAL_SECONDS profile of that child to PROFILE_DIR
+    install_signal_trigger()
+    if QUEUE_ANALYSIS in worker_queues:
+        # Load the models once per child before the first task instead of inside it
+        from app.utils.nlp import load_nlp_models, load_topic_embedding_model
+        from app.utils.transcription import preload_transcription_models
+        load_nlp_models()
+        load_topic_embedding_model()
+        preload_transcription_models()
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, task=None, **kwargs):
+    task.request.metrics_started = time.perf_counter()
+
+
+@task_postrun.connect
+def record_task_duration(task_id=None, task=None, state=None, **kwargs):
+    started = getattr(task.request, "metrics_started", None)
+    if started is not None:
+        get_recorder("celery_task", "Celery task run time", labels={"task": task.name}) \
+            .observe(time.perf_counter() - started, error=state != "SUCCESS")
+
+
+# Autodiscover tasks in app.tasks
+celery_app.autodiscover_tasks(["app.tasks"])
+
+# Configure periodic tasks
+celery_app.conf.beat_schedule = {
+    "trigger-reminders-every-hour": {
+        "task": "app.tasks.trigger_reminders_task",
+        "schedule": crontab(minute=0, hour="*"),  # Run every hour
+    },
+    "ensure-feedback-partitions-daily": {
+        "task": "app.tasks.ensure_feedback_partitions_task",
+        "schedule": crontab(minute=30, hour=2),  # Run daily at 02:30 UTC
+    },
+    "prune-reminder-tombstones-daily": {
+        "task": "app.tasks.prune_reminder_tombstones_task",
+        "schedule": crontab(minute=45, hour=2),  # Run daily at 02:45 UTC
+    }
+}
\ No newline at end of file
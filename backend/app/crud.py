@@ -1,72 +1,186 @@
+from sqlalchemy import insert, update, bindparam, case, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
 from app import models, schemas
-from passlib.context import CryptContext
-from datetime import datetime
-from app.utils.nlp import analyze_sentiment, extract_themes, detect_urgency, translate_to_english
-from app.utils.reminders import send_whatsapp, send_sms, send_call, validate_phone_number
-from uuid import UUID
+from datetime import datetime, timedelta
+from app.utils.nlp import analyze_sentiment, embed_texts, extract_themes, detect_urgency, translate_to_english, stage_recorder
+from app.utils.similarity import save_feedback_embeddings
+from app.utils.reminders import send_whatsapp, send_sms, send_call, validate_phone_number, coalesce_reminders, STATUS_RANK
+from app.utils.reminder_templates import REMINDER_LANGUAGES, render_reminder_groups
+from app.utils.passwords import pwd_context, hash_password, verify_password
+from app.utils.principal_cache import principal_cache
+from app.utils.encryption import BLIND_INDEX_ENABLED, encrypt_many, blind_index
+from app.utils.encoding import schema_columns
+from app.utils.metrics import get_counter, get_recorder
+from uuid import UUID, uuid4
+import io
 import logging
+import os
+import time
+import pandas as pd
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-handler = logging.FileHandler("app.log")
-handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
-logger.addHandler(handler)
 
 VALID_REMINDER_METHODS = {"whatsapp", "sms", "call"}
-VALID_LANGUAGES = {"english", "french", "douala", "bassa"}
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+VALID_LANGUAGES = set(REMINDER_LANGUAGES)
+# Due reminders for the same patient, phone and method scheduled within this window are sent as one message
+REMINDER_COALESCE_WINDOW = timedelta(minutes=int(os.getenv("REMINDER_COALESCE_WINDOW_MINUTES", "60")))
 
 def get_patient_by_name(db: Session, name: str) -> models.Patient:
     return db.query(models.Patient).filter(models.Patient.name == name).first()
 
 def create_patient(db: Session, name: str, password: str, role: str, phone_number: str = None, user_id: UUID = None) -> models.Patient:
-    hashed_password = pwd_context.hash(password)
+    hashed_password = hash_password(password)
     db_patient = models.Patient(name=name, hashed_password=hashed_password, role=role, phone_number=phone_number)
     db.add(db_patient)
     db.commit()
     db.refresh(db_patient)
-    logger.info(f"Created patient: {name} with role {role} by user {user_id or 'unknown'}")
+    logger.info("Created patient: %s with role %s by user %s", name, role, user_id or 'unknown')
     return db_patient
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+def update_password_hash(db: Session, patient: models.Patient, hashed_password: str) -> models.Patient:
+    patient.hashed_password = hashed_password
+    db.commit()
+    logger.info("Rehashed password for patient %s", patient.patient_id)
+    return patient
+
+def revoke_patient_tokens(db: Session, patient: models.Patient) -> models.Patient:
+    # Tokens embed the version they were issued for; bumping it rejects them on their next validation
+    patient.token_version = (patient.token_version or 0) + 1
+    db.commit()
+    principal_cache.invalidate_patient(patient.patient_id)
+    logger.info("Revoked access tokens for patient %s", patient.patient_id)
+    return patient
+
+def update_patient_role(db: Session, patient_id: UUID, role: str, user_id: UUID = None) -> models.Patient:
+    patient = db.query(models.Patient).filter(models.Patient.patient_id == patient_id).first()
+    if not patient:
+        raise ValueError("Patient not found")
+    patient.role = role
+    revoke_patient_tokens(db, patient)
+    logger.info("Changed role of patient %s to %s by user %s", patient_id, role, user_id or 'unknown')
+    return patient
+
+def delete_patient(db: Session, patient_id: UUID, user_id: UUID = None) -> bool:
+    patient = db.query(models.Patient).filter(models.Patient.patient_id == patient_id).first()
+    if not patient:
+        logger.warning("Failed to delete patient: ID %s not found by user %s", patient_id, user_id or 'unknown')
+        return False
+    # Feedback and reminders are medical records: an account that has any is never deleted with them
+    if db.query(models.Feedback.id).filter(models.Feedback.patient_id == patient_id).first() is not None or \
+            db.query(models.Reminder.id).filter(models.Reminder.patient_id == patient_id).first() is not None:
+        raise ValueError(f"Patient {patient_id} has feedback or reminders")
+    db.delete(patient)
+    db.commit()
+    principal_cache.invalidate_patient(patient_id)
+    logger.info("Deleted patient %s by user %s", patient_id, user_id or 'unknown')
+    return True
+
+def get_feedback(db: Session, feedback_id: str) -> models.Feedback:
+    return db.query(models.Feedback).filter(models.Feedback.feedback_id == feedback_id).first()
 
-def submit_feedback(db: Session, feedback: schemas.FeedbackSubmit, user_id: UUID = None) -> models.Feedback:
+def submit_feedback(db: Session, feedback: schemas.FeedbackSubmit, user_id: UUID = None, audio_path: str = None) -> models.Feedback:
+    if db.query(models.Feedback.id).filter(models.Feedback.feedback_id == feedback.feedback_id).first():
+        logger.error("Duplicate feedback ID: %s by user %s", feedback.feedback_id, user_id or 'unknown')
+        raise ValueError(f"Feedback ID already exists: {feedback.feedback_id}")
     db_feedback = models.Feedback(
         feedback_id=feedback.feedback_id,
         patient_id=feedback.patient_id,
         text=feedback.text or "",
-        audio_path=feedback.audio_path,
+        audio_path=audio_path,
         rating=feedback.rating,
         language=feedback.language,
         department=feedback.department,
         submitted_at=datetime.utcnow()
     )
     db.add(db_feedback)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        # A concurrent submission with the same ID committed first (unique index or feedback_keys)
+        if get_feedback(db, feedback.feedback_id) is None:
+            raise
+        logger.error("Duplicate feedback ID: %s by user %s", feedback.feedback_id, user_id or 'unknown')
+        raise ValueError(f"Feedback ID already exists: {feedback.feedback_id}")
     db.refresh(db_feedback)
-    logger.info(f"Submitted feedback: {feedback.feedback_id} for patient {feedback.patient_id} by user {user_id or 'unknown'}")
+    logger.info("Submitted feedback: %s for patient %s by user %s", feedback.feedback_id, feedback.patient_id, user_id or 'unknown')
     return db_feedback
 
 def analyze_feedback(db: Session, feedback: models.Feedback, user_id: UUID = None) -> models.Feedback:
     text = feedback.text
     if feedback.language != "english":
-        text = translate_to_english(text, feedback.language)
+        with stage_recorder("translation").time():
+            text = translate_to_english(text, feedback.language)
+    # Embedded once: the vector feeds BERTopic and is stored for similar-feedback search
+    embeddings = embed_texts([text])
     sentiment = analyze_sentiment([text])[0]
-    theme = extract_themes([text])[0]
+    theme = extract_themes([text], embeddings=embeddings)[0]
     urgent = detect_urgency([text])[0]
     feedback.sentiment = sentiment
     feedback.theme = theme
     feedback.urgent = urgent
+    save_feedback_embeddings(db, [feedback], embeddings)
     db.commit()
-    logger.info(f"Analyzed feedback: {feedback.feedback_id} - sentiment: {sentiment}, theme: {theme}, urgent: {urgent} by user {user_id or 'unknown'}")
+    logger.info("Analyzed feedback: %s - sentiment: %s, theme: %s, urgent: %s by user %s", feedback.feedback_id, sentiment, theme, urgent, user_id or 'unknown')
     return feedback
 
-def get_feedback_metrics(db: Session, user_id: UUID = None) -> schemas.FeedbackMetrics:
-    feedbacks = db.query(models.Feedback).all()
+def reanalyze_feedback_batch(db: Session, start: datetime = None, end: datetime = None, after_id: int = 0, batch_size: int = 256, user_id: UUID = None) -> tuple[int, int]:
+    # One batch of feedback after after_id (keyset pagination), so the sentiment model, encoder and
+    # BERTopic run once per batch; returns the batch size and its last id, the next batch's after_id
+    batch = filter_feedback_period(db.query(models.Feedback), start, end) \
+        .filter(models.Feedback.id > after_id).order_by(models.Feedback.id).limit(batch_size).all()
+    if not batch:
+        return 0, after_id
+    texts = []
+    for feedback in batch:
+        text = feedback.text
+        if feedback.language != "english":
+            with stage_recorder("translation").time():
+                text = translate_to_english(text, feedback.language)
+        texts.append(text)
+    embeddings = embed_texts(texts)
+    themes = extract_themes(texts, embeddings=embeddings)
+    for feedback, sentiment, theme, urgent in zip(batch, analyze_sentiment(texts), themes, detect_urgency(texts)):
+        feedback.sentiment = sentiment
+        feedback.theme = theme
+        feedback.urgent = urgent
+    save_feedback_embeddings(db, batch, embeddings)
+    db.commit()
+    last_id = batch[-1].id
+    logger.info("Reanalyzed %s feedbacks after ID %s by user %s", len(batch), after_id, user_id or 'unknown')
+    return len(batch), last_id
+
+def export_feedback_csv(db: Session, start: datetime = None, end: datetime = None) -> str:
+    feedbacks = filter_feedback_period(db.query(models.Feedback), start, end).all()
+    df = pd.DataFrame([
+        {
+            "feedback_id": fb.feedback_id,
+            "patient_id": fb.patient_id,
+            "text": fb.text,
+            "rating": fb.rating,
+            "sentiment": fb.sentiment,
+            "theme": fb.theme,
+            "urgent": fb.urgent,
+            "department": fb.department,
+            "submitted_at": fb.submitted_at
+        } for fb in feedbacks
+    ])
+    return df.to_csv(index=False)
+
+def filter_feedback_period(query, start: datetime = None, end: datetime = None):
+    # Bounds on submitted_at let PostgreSQL prune the monthly feedback partitions
+    if start is not None:
+        query = query.filter(models.Feedback.submitted_at >= start)
+    if end is not None:
+        query = query.filter(models.Feedback.submitted_at < end)
+    return query
+
+def get_feedback_metrics(db: Session, user_id: UUID = None, start: datetime = None, end: datetime = None) -> schemas.FeedbackMetrics:
+    feedbacks = filter_feedback_period(db.query(models.Feedback), start, end).all()
     if not feedbacks:
-        logger.warning(f"No feedback found for metrics computation by user {user_id or 'unknown'}")
+        logger.warning("No feedback found for metrics computation by user %s", user_id or 'unknown')
         return schemas.FeedbackMetrics(sentiment_distribution={}, theme_distribution={}, urgent_by_department={}, most_urgent_dept="None", total_rows=0)
     sentiment_dist = {}
     theme_dist = {}
@@ -77,7 +191,7 @@ def get_feedback_metrics(db: Session, user_id: UUID = None) -> schemas.FeedbackM
         if fb.urgent:
             urgent_by_dept[fb.department] = urgent_by_dept.get(fb.department, 0) + 1
     most_urgent_dept = max(urgent_by_dept.items(), key=lambda x: x[1], default=('None', 0))[0]
-    logger.info(f"Computed feedback metrics: {len(feedbacks)} feedbacks processed by user {user_id or 'unknown'}")
+    logger.info("Computed feedback metrics: %s feedbacks processed by user %s", len(feedbacks), user_id or 'unknown')
     return schemas.FeedbackMetrics(
         sentiment_distribution=sentiment_dist,
         theme_distribution=theme_dist,
@@ -90,14 +204,14 @@ def create_reminder(db: Session, reminder: schemas.ReminderCreate, user_id: UUID
     if reminder.phone_number:
         validated_number = validate_phone_number(reminder.phone_number)
         if not validated_number:
-            logger.error(f"Invalid phone number format: {reminder.phone_number} by user {user_id or 'unknown'}")
+            logger.error("Invalid phone number format: %s by user %s", reminder.phone_number, user_id or 'unknown')
             raise ValueError(f"Invalid phone number format: {reminder.phone_number}")
         reminder.phone_number = validated_number
     if reminder.method not in VALID_REMINDER_METHODS:
-        logger.error(f"Invalid reminder method: {reminder.method} by user {user_id or 'unknown'}")
+        logger.error("Invalid reminder method: %s by user %s", reminder.method, user_id or 'unknown')
         raise ValueError(f"Invalid reminder method: {reminder.method}. Must be one of {VALID_REMINDER_METHODS}")
     if reminder.language not in VALID_LANGUAGES:
-        logger.error(f"Invalid language: {reminder.language} by user {user_id or 'unknown'}")
+        logger.error("Invalid language: %s by user %s", reminder.language, user_id or 'unknown')
         raise ValueError(f"Invalid language: {reminder.language}. Must be one of {VALID_LANGUAGES}")
     db_reminder = models.Reminder(
         patient_id=reminder.patient_id,
@@ -113,67 +227,210 @@ def create_reminder(db: Session, reminder: schemas.ReminderCreate, user_id: UUID
     db.add(db_reminder)
     db.commit()
     db.refresh(db_reminder)
-    logger.info(f"Created reminder: ID {db_reminder.id} for patient {reminder.patient_id} by user {user_id or 'unknown'}")
+    logger.info("Created reminder: ID %s for patient %s by user %s", db_reminder.id, reminder.patient_id, user_id or 'unknown')
     return db_reminder
 
-def get_reminders(db: Session, patient_id: UUID, skip: int = 0, limit: int = 100, user_id: UUID = None) -> list[models.Reminder]:
-    reminders = db.query(models.Reminder).filter(models.Reminder.patient_id == patient_id).offset(skip).limit(limit).all()
-    logger.info(f"Retrieved {len(reminders)} reminders for patient {patient_id} with skip={skip}, limit={limit} by user {user_id or 'unknown'}")
+# Columns schemas.Reminder is built from; read paths select only these (no medication/consultation text)
+REMINDER_COLUMNS = schema_columns(models.Reminder, schemas.Reminder)
+
+BULK_REMINDER_COLUMNS = ["uid", "patient_id", "patient_name", "phone_number", "phone_number_index", "appointment_reason",
+                         "medication_list", "consultation_list", "language", "method", "scheduled_time", "sent",
+                         "updated_at"]
+
+def bulk_create_reminders(db: Session, reminders: pd.DataFrame, user_id: UUID = None) -> tuple[int, list[dict]]:
+    if reminders.empty:
+        return 0, []
+    patient_ids = set(reminders["patient_id"])
+    existing = {row[0] for row in db.query(models.Patient.patient_id).filter(models.Patient.patient_id.in_(patient_ids))}
+    unknown = ~reminders["patient_id"].isin(existing)
+    errors = [{"row": int(row), "field": "patient_id", "error": "Patient not found"} for row in reminders.index[unknown]]
+    rows = reminders.loc[~unknown]
+    phones = rows["phone_number"].astype(object).where(rows["phone_number"].notna(), None)
+    # Encrypted up front (one token per distinct number) since COPY bypasses the column type
+    # updated_at from the application clock like every other write (COPY would take the transaction start)
+    rows = rows.assign(sent=False, uid=[uuid4() for _ in range(len(rows))], phone_number=encrypt_many(phones),
+                       phone_number_index=[blind_index(p) for p in phones], updated_at=datetime.utcnow())
+    rows = rows[BULK_REMINDER_COLUMNS]
+    if rows.empty:
+        return 0, errors
+    if db.get_bind().dialect.name == "postgresql":
+        # COPY streams the whole batch in one round trip
+        buffer = io.StringIO()
+        rows.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d %H:%M:%S.%f")
+        buffer.seek(0)
+        cursor = db.connection().connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY reminders ({', '.join(BULK_REMINDER_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    else:
+        db.execute(insert(models.Reminder), rows.astype(object).where(rows.notna(), None).to_dict("records"))
+    db.commit()
+    logger.info("Bulk created %s reminders (%s unknown patients) by user %s", len(rows), len(errors), user_id or 'unknown')
+    return len(rows), errors
+
+def get_reminder_rows(db: Session, patient_id: UUID, columns: list[str], skip: int = 0, limit: int = 100, user_id: UUID = None) -> list[tuple]:
+    # Selects only the requested columns: no ORM entities, no unused text columns
+    rows = db.query(*[getattr(models.Reminder, column) for column in columns]) \
+        .filter(models.Reminder.patient_id == patient_id).offset(skip).limit(limit).all()
+    logger.info("Retrieved %s reminder rows (%s) for patient %s with skip=%s, limit=%s by user %s", len(rows), ','.join(columns), patient_id, skip, limit, user_id or 'unknown')
+    return rows
+
+def get_reminders_by_phone(db: Session, phone_number: str, user_id: UUID = None) -> list[models.Reminder]:
+    # Rows indexed without a configured key hold NULL, so a lookup could only ever miss
+    if not BLIND_INDEX_ENABLED:
+        raise RuntimeError("Phone number lookups need ENCRYPTION_KEY or BLIND_INDEX_KEY")
+    validated_number = validate_phone_number(phone_number)
+    if not validated_number:
+        raise ValueError(f"Invalid phone number format: {phone_number}")
+    reminders = db.query(models.Reminder).filter(models.Reminder.phone_number_index == blind_index(validated_number)).all()
+    logger.info("Retrieved %s reminders by phone number by user %s", len(reminders), user_id or 'unknown')
     return reminders
 
+def encrypt_phone_numbers(db: Session, batch_size: int = 500) -> int:
+    # Rewrites legacy plaintext phone numbers (and fills their blind index) after encryption is turned on
+    updated = 0
+    for model in (models.Patient, models.Reminder):
+        while True:
+            rows = db.query(model).filter(model.phone_number.isnot(None), model.phone_number_index.is_(None)).limit(batch_size).all()
+            if not rows:
+                break
+            for row in rows:
+                row.phone_number_index = blind_index(row.phone_number)
+                flag_modified(row, "phone_number")
+            db.commit()
+            updated += len(rows)
+    logger.info("Encrypted and indexed %s phone numbers", updated)
+    return updated
+
 def trigger_reminders(db: Session, user_id: UUID = None) -> int:
     now = datetime.utcnow()
-    reminders = db.query(models.Reminder).filter(models.Reminder.scheduled_time <= now, models.Reminder.sent == False).limit(100).all()
-    for reminder in reminders:
-        message = f"Reminder for {reminder.patient_name}: {reminder.appointment_reason}"
-        if reminder.medication_list:
-            message += f"\nMedications: {reminder.medication_list}"
-        if reminder.consultation_list:
-            message += f"\nConsultations: {reminder.consultation_list}"
-        success = False
-        if reminder.method == "whatsapp":
-            success = send_whatsapp(reminder.phone_number, message, reminder.language)
-        elif reminder.method == "sms":
-            success = send_sms(reminder.phone_number, message, reminder.language)
-        elif reminder.method == "call":
-            success = send_call(reminder.phone_number, message, reminder.language)
-        if success:
-            reminder.sent = True
-            reminder.sent_at = now
-            logger.info(f"Triggered reminder: ID {reminder.id} for patient {reminder.patient_id} via {reminder.method} by user {user_id or 'unknown'}")
+    reminders = db.query(models.Reminder).filter(models.Reminder.scheduled_time <= now, models.Reminder.sent == False,
+                                               models.Reminder.origin_node.is_(None)).limit(100).all()
+    groups = coalesce_reminders(reminders, REMINDER_COALESCE_WINDOW)
+    messages = render_reminder_groups(groups)
+    # Detached so the per-message commits below do not expire (and reload) them
+    db.expunge_all()
+    for group, message in zip(groups, messages):
+        first = group[0]
+        ids = [reminder.id for reminder in group]
+        sid = None
+        started = time.perf_counter()
+        if first.method == "whatsapp":
+            sid = send_whatsapp(first.phone_number, message, first.language)
+        elif first.method == "sms":
+            sid = send_sms(first.phone_number, message, first.language)
+        elif first.method == "call":
+            sid = send_call(first.phone_number, message, first.language)
+        get_recorder("reminder_send", "Reminder send latency per method, including Twilio", labels={"method": first.method}) \
+            .observe(time.perf_counter() - started, error=sid is None)
+        if sid:
+            db.query(models.Reminder).filter(models.Reminder.id.in_(ids)).update(
+                {"sent": True, "sent_at": now, "message_sid": sid}, synchronize_session=False)
+            # Recorded per message: a crash later in the batch must not resend it, and delta sync
+            # relies on updated_at being committed promptly
+            db.commit()
+            # Reminders rather than messages: with coalescing one message covers several
+            get_counter("reminders_sent", "Reminders sent per method", labels={"method": first.method}).inc(len(group))
+            logger.info("Triggered reminders: IDs %s for patient %s via %s (SID %s) by user %s", ids, first.patient_id, first.method, sid, user_id or 'unknown')
         else:
-            logger.error(f"Failed to trigger reminder: ID {reminder.id} for patient {reminder.patient_id} by user {user_id or 'unknown'}")
+            logger.error("Failed to trigger reminders: IDs %s for patient %s by user %s", ids, first.patient_id, user_id or 'unknown')
     db.commit()
-    logger.info(f"Triggered {len(reminders)} reminders by user {user_id or 'unknown'}")
+    logger.info("Triggered %s reminders in %s messages by user %s", len(reminders), len(groups), user_id or 'unknown')
     return len(reminders)
 
+def apply_delivery_receipts(db: Session, receipts: dict[str, tuple[str, datetime]]) -> int:
+    if not receipts:
+        return 0
+    # A receipt only applies if it is at least as far along as the stored status (callbacks arrive out of order)
+    if db.get_bind().dialect.name == "postgresql":
+        values, params = [], {}
+        for i, (sid, (status, received_at)) in enumerate(receipts.items()):
+            values.append(f"(:sid_{i}, :status_{i}, CAST(:rank_{i} AS INTEGER), CAST(:received_at_{i} AS TIMESTAMP))")
+            params.update({f"sid_{i}": sid, f"status_{i}": status, f"rank_{i}": STATUS_RANK.get(status, 0),
+                           f"received_at_{i}": received_at})
+        params["updated_at"] = datetime.utcnow()
+        stored_rank = " ".join(f"WHEN '{status}' THEN {rank}" for status, rank in STATUS_RANK.items())
+        result = db.execute(text(
+            "UPDATE reminders SET delivery_status = v.status, delivery_updated_at = v.received_at, "
+            "updated_at = :updated_at, version = reminders.version + 1 "
+            f"FROM (VALUES {', '.join(values)}) AS v(sid, status, rank, received_at) "
+            "WHERE reminders.message_sid = v.sid "
+            f"AND v.rank >= CASE reminders.delivery_status {stored_rank} ELSE 0 END"
+        ), params)
+    else:
+        table = models.Reminder.__table__
+        stored_rank = case(STATUS_RANK, value=table.c.delivery_status, else_=0)
+        result = db.execute(
+            update(table).where(table.c.message_sid == bindparam("b_sid"), stored_rank <= bindparam("b_rank")).values(
+                delivery_status=bindparam("b_status"), delivery_updated_at=bindparam("b_received_at")),
+            [{"b_sid": sid, "b_status": status, "b_rank": STATUS_RANK.get(status, 0), "b_received_at": received_at}
+             for sid, (status, received_at) in receipts.items()]
+        )
+    db.commit()
+    logger.info("Applied %s delivery receipts, %s reminders updated", len(receipts), result.rowcount)
+    return result.rowcount
+
 def delete_reminder(db: Session, reminder_id: int, user_id: UUID = None) -> bool:
     reminder = db.query(models.Reminder).filter(models.Reminder.id == reminder_id).first()
     if not reminder:
-        logger.warning(f"Failed to delete reminder: ID {reminder_id} not found by user {user_id or 'unknown'}")
+        logger.warning("Failed to delete reminder: ID %s not found by user %s", reminder_id, user_id or 'unknown')
         return False
+    db.add(_tombstone(reminder))
     db.delete(reminder)
     db.commit()
-    logger.info(f"Deleted reminder: ID {reminder_id} by user {user_id or 'unknown'}")
+    logger.info("Deleted reminder: ID %s by user %s", reminder_id, user_id or 'unknown')
     return True
 
+def _tombstone(reminder: models.Reminder) -> models.ReminderTombstone:
+    return models.ReminderTombstone(reminder_id=reminder.id, uid=reminder.uid, patient_id=reminder.patient_id,
+                                    deleted_at=datetime.utcnow())
+
+# Reminder fields a clinic node edits; merged from its pushes as they are
+NODE_REMINDER_FIELDS = ("patient_name", "phone_number", "appointment_reason", "medication_list", "consultation_list",
+                        "language", "method", "scheduled_time")
+
+def _merge_node_reminder(db: Session, reminder: models.Reminder, record: dict) -> None:
+    if record["patient_id"] != reminder.patient_id:
+        db.add(_tombstone(reminder))  # Gone from the previous patient's delta sync
+        reminder.patient_id = record["patient_id"]
+    for field in NODE_REMINDER_FIELDS:
+        if getattr(reminder, field) != record[field]:
+            setattr(reminder, field, record[field])
+    # Dispatch state only moves forward: status callbacks may reach the central API before the node's push
+    if record["sent"] and not reminder.sent:
+        reminder.sent, reminder.sent_at, reminder.message_sid = True, record["sent_at"], record["message_sid"]
+    status = record["delivery_status"]
+    if status is not None and STATUS_RANK.get(status, 0) > STATUS_RANK.get(reminder.delivery_status, -1):
+        reminder.delivery_status, reminder.delivery_updated_at = status, record["delivery_updated_at"]
+
+def prune_reminder_tombstones(db: Session, days: int) -> int:
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    count = db.query(models.ReminderTombstone).filter(models.ReminderTombstone.deleted_at < cutoff) \
+        .delete(synchronize_session=False)
+    db.commit()
+    logger.info("Pruned %s reminder tombstones older than %s days", count, days)
+    return count
+
 def update_reminder(db: Session, reminder_id: int, reminder_update: schemas.ReminderCreate, user_id: UUID = None) -> models.Reminder:
     reminder = db.query(models.Reminder).filter(models.Reminder.id == reminder_id).first()
     if not reminder:
-        logger.warning(f"Failed to update reminder: ID {reminder_id} not found by user {user_id or 'unknown'}")
+        logger.warning("Failed to update reminder: ID %s not found by user %s", reminder_id, user_id or 'unknown')
         return None
     if reminder_update.phone_number:
         validated_number = validate_phone_number(reminder_update.phone_number)
         if not validated_number:
-            logger.error(f"Invalid phone number format: {reminder_update.phone_number} by user {user_id or 'unknown'}")
+            logger.error("Invalid phone number format: %s by user %s", reminder_update.phone_number, user_id or 'unknown')
             raise ValueError(f"Invalid phone number format: {reminder_update.phone_number}")
         reminder_update.phone_number = validated_number
     if reminder_update.method not in VALID_REMINDER_METHODS:
-        logger.error(f"Invalid reminder method: {reminder_update.method} by user {user_id or 'unknown'}")
+        logger.error("Invalid reminder method: %s by user %s", reminder_update.method, user_id or 'unknown')
         raise ValueError(f"Invalid reminder method: {reminder_update.method}. Must be one of {VALID_REMINDER_METHODS}")
     if reminder_update.language not in VALID_LANGUAGES:
-        logger.error(f"Invalid language: {reminder_update.language} by user {user_id or 'unknown'}")
+        logger.error("Invalid language: %s by user %s", reminder_update.language, user_id or 'unknown')
         raise ValueError(f"Invalid language: {reminder_update.language}. Must be one of {VALID_LANGUAGES}")
+    if reminder.patient_id != reminder_update.patient_id:
+        db.add(_tombstone(reminder))  # Gone from the previous patient's delta sync
     reminder.patient_id = reminder_update.patient_id
     reminder.patient_name = reminder_update.patient_name
     reminder.phone_number = reminder_update.phone_number
@@ -185,5 +442,81 @@ def update_reminder(db: Session, reminder_id: int, reminder_update: schemas.Remi
     reminder.scheduled_time = reminder_update.scheduled_time
     db.commit()
     db.refresh(reminder)
-    logger.info(f"Updated reminder: ID {reminder_id} for patient {reminder.patient_id} by user {user_id or 'unknown'}")
+    logger.info("Updated reminder: ID %s for patient %s by user %s", reminder_id, reminder.patient_id, user_id or 'unknown')
     return reminder
+
+def ingest_sync_records(db: Session, records: list[dict], node: str) -> dict:
+    # Idempotent: patients and feedback are inserted once, reminders are upserted by uid when the node's
+    # version is newer, and deleted when the node pushes their tombstone.
+    # A record the central database cannot take (a node-granted role, a name taken by another patient,
+    # a reminder owned elsewhere) is skipped and reported with the records that depend on it, instead of
+    # failing the whole batch
+    by_type = {"patient": [], "feedback": [], "reminder": [], "reminder_deleted": []}
+    for record in records:
+        by_type[record.pop("type")].append(record)
+    counts = {"patients": 0, "feedback": 0, "reminders_created": 0, "reminders_updated": 0, "reminders_deleted": 0}
+    skipped = []
+
+    patient_ids = {r["patient_id"] for kind in ("patient", "feedback", "reminder") for r in by_type[kind]}
+    known = {row[0] for row in db.query(models.Patient.patient_id).filter(models.Patient.patient_id.in_(patient_ids))} if patient_ids else set()
+    for record in by_type["patient"]:
+        if record["patient_id"] in known:
+            continue
+        if record["role"] != "patient":
+            skipped.append({"type": "patient", "id": str(record["patient_id"]), "reason": f"Role {record['role']!r} is not synced"})
+            continue
+        try:
+            with db.begin_nested():
+                db.add(models.Patient(**record))
+        except IntegrityError:
+            skipped.append({"type": "patient", "id": str(record["patient_id"]), "reason": f"Name {record['name']!r} belongs to another patient"})
+            continue
+        known.add(record["patient_id"])
+        counts["patients"] += 1
+
+    feedback_ids = {r["feedback_id"] for r in by_type["feedback"]}
+    existing_feedback = {row[0] for row in db.query(models.Feedback.feedback_id).filter(models.Feedback.feedback_id.in_(feedback_ids))} if feedback_ids else set()
+    for record in by_type["feedback"]:
+        if record["feedback_id"] in existing_feedback:
+            continue
+        if record["patient_id"] not in known:
+            skipped.append({"type": "feedback", "id": record["feedback_id"], "reason": "Unknown patient"})
+            continue
+        db.add(models.Feedback(**record))
+        existing_feedback.add(record["feedback_id"])
+        counts["feedback"] += 1
+
+    uids = {r["uid"] for kind in ("reminder", "reminder_deleted") for r in by_type[kind]}
+    existing = {row.uid: row for row in db.query(models.Reminder).filter(models.Reminder.uid.in_(uids))} if uids else {}
+    for record in by_type["reminder"]:
+        reminder = existing.get(record["uid"])
+        version = record.pop("version")
+        if record["patient_id"] not in known:
+            skipped.append({"type": "reminder", "id": str(record["uid"]), "reason": "Unknown patient"})
+        elif reminder is None:
+            # The node dispatches it: central trigger_reminders skips reminders with an origin node
+            existing[record["uid"]] = reminder = models.Reminder(**record, origin_node=node, origin_version=version)
+            db.add(reminder)
+            counts["reminders_created"] += 1
+        elif reminder.origin_node != node:
+            skipped.append({"type": "reminder", "id": str(record["uid"]), "reason": "Reminder is owned by another node"})
+        elif version > (reminder.origin_version or 0):
+            _merge_node_reminder(db, reminder, record)
+            reminder.origin_version = version
+            counts["reminders_updated"] += 1
+
+    for record in by_type["reminder_deleted"]:
+        reminder = existing.pop(record["uid"], None)
+        if reminder is None:
+            continue  # Never pushed, or already deleted by a resent batch
+        if reminder.origin_node != node:
+            skipped.append({"type": "reminder_deleted", "id": str(record["uid"]), "reason": "Reminder is owned by another node"})
+            continue
+        db.add(_tombstone(reminder))
+        db.delete(reminder)
+        counts["reminders_deleted"] += 1
+    db.commit()
+    logger.info("Ingested sync batch of %s records from node %s: %s", len(records), node, counts)
+    if skipped:
+        logger.warning("Skipped %s sync records from node %s: %s", len(skipped), node, skipped)
+    return {**counts, "skipped": skipped}
@@ -6,6 +6,8 @@ from typing import Optional
 from sqlalchemy.orm import Session
 from app import models, schemas
 from app.database import SessionLocal
+from app.utils.principal_cache import principal_cache
+from uuid import UUID
 import os
 
 # Load JWT secret key from environment variable for security
@@ -33,7 +35,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     Create a JWT access token with the provided data and expiration time.
 
     Args:
-        data: Dictionary containing token payload (e.g., name, role).
+        data: Dictionary containing token payload (e.g., name, role, patient ID, token version).
         expires_delta: Optional custom expiration time.
 
     Returns:
@@ -52,6 +54,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     """
     Validate JWT token and return the authenticated patient.
 
+    Validated tokens are cached for PRINCIPAL_CACHE_TTL seconds, so repeat requests skip
+    the JWT decode and the database lookup. On a cache miss the token's patient ID, role
+    and version claims are checked against the patients table; bumping a patient's
+    token_version revokes every token issued before it. Tokens without patient ID and
+    version claims cannot be revoked and are rejected.
+
     Args:
         token: JWT token from Authorization header.
         db: Database session for querying the patient.
@@ -60,8 +68,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         Patient schema with patient_id, name, and role.
 
     Raises:
-        HTTPException: If credentials are invalid or the patient is not found.
+        HTTPException: If credentials are invalid, revoked, or the patient is not found.
     """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -71,17 +83,23 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         name: str = payload.get("sub")
         role: str = payload.get("role")
-        if name is None:
+        patient_id: Optional[str] = payload.get("pid")
+        version: Optional[int] = payload.get("ver")
+        if name is None or patient_id is None or version is None:
             raise credentials_exception
-    except JWTError:
+        patient_id = UUID(patient_id)
+    except (JWTError, ValueError):
         raise credentials_exception
 
-    patient = db.query(models.Patient).filter(models.Patient.name == name).first()
-    if patient is None or patient.role != role:
+    columns = (models.Patient.patient_id, models.Patient.name, models.Patient.role, models.Patient.token_version)
+    patient = db.query(*columns).filter(models.Patient.patient_id == patient_id).first()
+    if patient is None or patient.role != role or patient.token_version != version:
         raise credentials_exception
 
-    return schemas.Patient(
+    principal = schemas.Patient(
         patient_id=patient.patient_id,
         name=patient.name,
         role=patient.role
-    )
\ No newline at end of file
+    )
+    principal_cache.put(token, principal, payload.get("exp"))
+    return principal
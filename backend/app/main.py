@@ -1,37 +1,64 @@
+from app.utils.logging_config import configure_logging
+
+# Configure logging before the other imports, which log while creating the engine and loading templates.
+# Records are queued and written by a background thread
+configure_logging()
+
 from fastapi import FastAPI
-from fastapi.middleware.gzip import GZipMiddleware
-from app.routers import auth, feedback, reminders
+from app.routers import admin, auth, feedback, metrics, reminders, sync
 from app.database import engine
 from app.models import Base
+from app.utils.search import create_search_indexes
+from app.utils.delivery import run_delivery_flusher, stop_delivery_flusher
+from app.utils.sync import SYNC_UPSTREAM_URL, run_upstream_sync
+from app.utils.compression import CompressionMiddleware
+from app.utils.metrics import RequestMetricsMiddleware
+from app.utils.profiling import ProfilingMiddleware
 from app.celery_app import celery_app
+import asyncio
 import logging
 import redis
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    filename="app.log",
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Patient Feedback System", version="1.1.0")
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(CompressionMiddleware)  # Brotli/zstd/gzip with ETags and cached compressed bodies
+app.add_middleware(ProfilingMiddleware, authorize=admin.authorize_profiling)  # X-Profile requests from admins
+app.add_middleware(RequestMetricsMiddleware)  # Outermost: request latency includes compression
 
 # Initialize Redis client
 redis_client = redis.Redis(host='redis', port=6379, db=0, decode_responses=True)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# PostgreSQL schemas and search indexes are managed by Alembic (`alembic upgrade head`); other databases are created directly
+if engine.dialect.name != "postgresql":
+    Base.metadata.create_all(bind=engine)
+    create_search_indexes(engine)
 
 # Include routers
 app.include_router(auth.router)
 app.include_router(feedback.router)
 app.include_router(reminders.router)
+app.include_router(admin.router)
+app.include_router(sync.router)
+app.include_router(metrics.router)
 
 @app.on_event("startup")
 async def startup_event():
     """
-    Startup event to initialize the application and log startup.
+    Startup event to start the delivery receipt flusher, the upstream sync of an offline
+    clinic node (when SYNC_UPSTREAM_URL is set), and log startup.
     """
+    app.state.delivery_flusher = asyncio.create_task(run_delivery_flusher())
+    app.state.upstream_sync = asyncio.create_task(run_upstream_sync()) if SYNC_UPSTREAM_URL else None
     logger.info("Application started successfully")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Shutdown event to stop background tasks and apply any buffered receipts.
+    """
+    if app.state.upstream_sync:
+        app.state.upstream_sync.cancel()
+    await stop_delivery_flusher(app.state.delivery_flusher)
+    logger.info("Application stopped")
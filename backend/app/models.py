@@ -1,46 +1,29 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index, UniqueConstraint, Uuid, event, func, literal_column
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
-from cryptography.fernet import Fernet
-import os
+from app.utils.encryption import EncryptedString, blind_index
+from app.utils.embeddings import Embedding
+from datetime import datetime
 import uuid
 
 Base = declarative_base()
 
-# Load or generate encryption key securely (store in environment variable for production)
-ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", Fernet.generate_key().decode())
-cipher = Fernet(ENCRYPTION_KEY.encode())
-
 
 class Patient(Base):
     __tablename__ = "patients"
 
-    patient_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    patient_id = Column(Uuid, primary_key=True, default=uuid.uuid4, index=True)
     name = Column(String(100), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
-    phone_number = Column(String(20), nullable=True)  # Encrypted
+    phone_number = Column(EncryptedString(255), nullable=True)  # Fernet-encrypted
+    phone_number_index = Column(String(64), nullable=True, index=True)  # Blind index for exact-match lookup
     role = Column(String(20), nullable=False)  # 'admin' or 'patient'
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped to revoke issued tokens
 
     # Relationships
     feedbacks = relationship("Feedback", back_populates="patient")
     reminders = relationship("Reminder", back_populates="patient")
 
-    @property
-    def encrypted_phone_number(self):
-        """Encrypt phone number before storing."""
-        if self.phone_number:
-            return cipher.encrypt(self.phone_number.encode()).decode()
-        return None
-
-    @encrypted_phone_number.setter
-    def encrypted_phone_number(self, value):
-        """Decrypt phone number when retrieving."""
-        if value:
-            self.phone_number = cipher.decrypt(value.encode()).decode()
-        else:
-            self.phone_number = None
-
     __table_args__ = (
         {"comment": "Stores patient and admin user data with encrypted phone numbers."},
     )
@@ -50,9 +33,11 @@ class Feedback(Base):
     __tablename__ = "feedback"
 
     id = Column(Integer, primary_key=True, index=True)
-    feedback_id = Column(String(50), unique=True, index=True, nullable=False)
-    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False)
-    text = Column(Text, nullable=False)
+    # Unique: a unique index, or on PostgreSQL the feedback_keys triggers of migration 0003
+    feedback_id = Column(String(50), index=True, unique=True, nullable=False)
+    patient_id = Column(Uuid, ForeignKey("patients.patient_id"), nullable=False)
+    text = Column(Text, nullable=False)  # Empty until an audio feedback is transcribed
+    audio_path = Column(String(255), nullable=True)  # Voice note under AUDIO_DIR, for audio feedback
     rating = Column(Integer, nullable=False)
     language = Column(String(20), nullable=False)
     sentiment = Column(String(20), nullable=True)
@@ -64,18 +49,38 @@ class Feedback(Base):
     # Relationship
     patient = relationship("Patient", back_populates="feedbacks")
 
+    # On PostgreSQL the table is range-partitioned by month on submitted_at (migration 0003),
+    # with primary key (id, submitted_at)
     __table_args__ = (
+        Index("ix_feedback_department_submitted_at", "department", "submitted_at"),
         {"comment": "Stores patient feedback with sentiment analysis and urgency flags."},
     )
 
 
+class FeedbackEmbedding(Base):
+    __tablename__ = "feedback_embeddings"
+
+    # No foreign key: on PostgreSQL the partitioned feedback key is (id, submitted_at)
+    id = Column(Integer, primary_key=True, autoincrement=False)  # Same as feedback.id
+    department = Column(String(50), nullable=False)  # Copied from feedback to filter next to the vector index
+    submitted_at = Column(DateTime, nullable=False)
+    embedding = Column(Embedding(), nullable=False)  # Unit-length, float16
+
+    __table_args__ = (
+        Index("ix_feedback_embeddings_department_submitted_at", "department", "submitted_at"),
+        {"comment": "Feedback text embeddings for similar-feedback search (HNSW-indexed on PostgreSQL)."},
+    )
+
+
 class Reminder(Base):
     __tablename__ = "reminders"
 
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False)
+    uid = Column(Uuid, default=uuid.uuid4, nullable=False)  # Stable ID across clinic nodes
+    patient_id = Column(Uuid, ForeignKey("patients.patient_id"), nullable=False)
     patient_name = Column(String(100), nullable=False)
-    phone_number = Column(String(20), nullable=True)  # Encrypted
+    phone_number = Column(EncryptedString(255), nullable=True)  # Fernet-encrypted
+    phone_number_index = Column(String(64), nullable=True, index=True)  # Blind index for exact-match lookup
     appointment_reason = Column(String(255), nullable=False)
     medication_list = Column(Text, nullable=True)
     consultation_list = Column(Text, nullable=True)
@@ -84,25 +89,59 @@ class Reminder(Base):
     scheduled_time = Column(DateTime, nullable=False)
     sent = Column(Boolean, default=False, nullable=False)
     sent_at = Column(DateTime, nullable=True)
+    message_sid = Column(String(64), nullable=True, index=True)  # Twilio message/call SID
+    delivery_status = Column(String(20), nullable=True)  # Latest Twilio status callback value
+    delivery_updated_at = Column(DateTime, nullable=True)
+    # Set on every insert and update, including bulk UPDATE statements; drives upstream sync
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow,
+                        server_default=func.now())
+    # Incremented on every update, like updated_at; orders the pushes of a row without comparing clocks
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version") + 1)
+    # Clinic node that owns and dispatches the reminder (NULL: this database does)
+    origin_node = Column(String(100), nullable=True)
+    origin_version = Column(Integer, nullable=True)  # Node version last merged by upstream sync
 
     # Relationship
     patient = relationship("Patient", back_populates="reminders")
 
-    @property
-    def encrypted_phone_number(self):
-        """Encrypt phone number before storing."""
-        if self.phone_number:
-            return cipher.encrypt(self.phone_number.encode()).decode()
-        return None
-
-    @encrypted_phone_number.setter
-    def encrypted_phone_number(self, value):
-        """Decrypt phone number when retrieving."""
-        if value:
-            self.phone_number = cipher.decrypt(value.encode()).decode()
-        else:
-            self.phone_number = None
-
     __table_args__ = (
+        UniqueConstraint("uid", name="uq_reminders_uid"),
+        Index("ix_reminders_updated_at_id", "updated_at", "id"),
+        Index("ix_reminders_patient_id_updated_at_id", "patient_id", "updated_at", "id"),  # Patient delta sync
         {"comment": "Stores reminders for patients with encrypted phone numbers."},
-    )
\ No newline at end of file
+    )
+
+
+@event.listens_for(Patient.phone_number, "set")
+@event.listens_for(Reminder.phone_number, "set")
+def _update_phone_number_index(target, value, oldvalue, initiator):
+    """Keep the blind index in step with the phone number on every ORM assignment."""
+    target.phone_number_index = blind_index(value)
+
+
+class ReminderTombstone(Base):
+    __tablename__ = "reminder_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    reminder_id = Column(Integer, nullable=False)
+    uid = Column(Uuid, nullable=False)
+    patient_id = Column(Uuid, nullable=False)  # No foreign key: outlives deleted patients until pruned
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_reminder_tombstones_patient_id_deleted_at_id", "patient_id", "deleted_at", "id"),
+        {"comment": "Reminders deleted from (or moved away from) a patient, for delta sync; pruned after REMINDER_TOMBSTONE_DAYS."},
+    )
+
+
+class SyncState(Base):
+    __tablename__ = "sync_state"
+
+    name = Column(String(50), primary_key=True)  # e.g. 'feedback', 'reminders'
+    last_id = Column(Integer, nullable=False, default=0)
+    last_updated_at = Column(DateTime, nullable=True)
+    synced_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        {"comment": "Upstream sync watermarks of an offline clinic node."},
+    )
@@ -0,0 +1,194 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app import crud, schemas
+from app.database import SessionLocal, get_pool_stats
+from app.dependencies import get_current_user, get_db
+from app.utils.passwords import get_password_pool_stats
+from app.utils.profiling import PROFILE_FORMATS, PROFILE_MAX_SECONDS, profile_for
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+import os
+
+router = APIRouter(prefix="/admin", tags=["Administration"])
+
+
+def require_admin(current_user: schemas.Patient = Depends(get_current_user)) -> schemas.Patient:
+    """
+    Allow only admin users.
+
+    Args:
+        current_user: Authenticated user.
+
+    Returns:
+        The authenticated admin.
+
+    Raises:
+        HTTPException: If user is not an admin.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return current_user
+
+
+@router.put("/patients/{patient_id}/role", response_model=schemas.Patient)
+async def update_patient_role(
+    patient_id: UUID,
+    role: str = Query(..., pattern="^(patient|admin)$"),
+    db: Session = Depends(get_db),
+    current_user: schemas.Patient = Depends(require_admin),
+):
+    """
+    Change a patient's role; tokens issued for the previous role stop working.
+
+    Args:
+        patient_id: ID of the patient.
+        role: New role, 'patient' or 'admin'.
+        db: Database session.
+        current_user: Authenticated admin.
+
+    Returns:
+        The updated patient.
+
+    Raises:
+        HTTPException: If the patient is not found.
+    """
+    try:
+        patient = crud.update_patient_role(db, patient_id, role, user_id=current_user.patient_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return schemas.Patient(patient_id=patient.patient_id, name=patient.name, role=patient.role)
+
+
+@router.delete("/patients/{patient_id}", response_model=dict)
+async def delete_patient(
+    patient_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: schemas.Patient = Depends(require_admin),
+):
+    """
+    Delete a patient account that has no feedback or reminders; its tokens stop working.
+
+    Args:
+        patient_id: ID of the patient.
+        db: Database session.
+        current_user: Authenticated admin.
+
+    Returns:
+        Success message.
+
+    Raises:
+        HTTPException: If the patient is not found, or still has feedback or reminders.
+    """
+    try:
+        deleted = crud.delete_patient(db, patient_id, user_id=current_user.patient_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return {"message": f"Patient {patient_id} deleted"}
+
+
+@router.get("/db/pool")
+async def get_db_pool_stats(current_user: schemas.Patient = Depends(require_admin)):
+    """
+    Return the database connection pool counters of the worker process serving the request.
+
+    Args:
+        current_user: Authenticated admin.
+
+    Returns:
+        Pool size, checked-out and overflow connections, connect and invalidation counts,
+        and checkout wait-time percentiles (seconds).
+    """
+    return get_pool_stats()
+
+
+@router.get("/passwords/pool")
+async def get_password_pool(current_user: schemas.Patient = Depends(require_admin)):
+    """
+    Return the password hashing pool statistics of the worker process serving the request.
+
+    Args:
+        current_user: Authenticated admin.
+
+    Returns:
+        Pool size, current and maximum pending checks, rejected logins, bcrypt cost,
+        and queue-wait and total latency snapshots (seconds).
+    """
+    return get_password_pool_stats()
+
+
+async def authorize_profiling(token: str) -> schemas.Patient:
+    """
+    Check that a bearer token belongs to an admin (used by ProfilingMiddleware for X-Profile requests).
+
+    Args:
+        token: JWT token from the Authorization header.
+
+    Returns:
+        The authenticated admin.
+
+    Raises:
+        HTTPException: If the token is invalid or the user is not an admin.
+    """
+    db = SessionLocal()
+    try:
+        return require_admin(await get_current_user(token, db))
+    finally:
+        db.close()
+
+
+@router.get("/profile")
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=PROFILE_MAX_SECONDS),
+    fmt: str = Query("collapsed", alias="format", pattern="^(collapsed|speedscope)$"),
+    current_user: schemas.Patient = Depends(require_admin),
+):
+    """
+    Sample every thread of the worker process serving the request for a few seconds.
+
+    Requests served by this worker meanwhile keep running and show up in the profile.
+
+    Args:
+        seconds: Sampling duration.
+        fmt: 'collapsed' (flamegraph.pl, inferno, speedscope) or 'speedscope' JSON.
+        current_user: Authenticated admin.
+
+    Returns:
+        The profile, with the worker PID in X-Profile-Pid.
+    """
+    profiler = await run_in_threadpool(profile_for, seconds)
+    return Response(profiler.render(fmt, f"worker {os.getpid()}"), media_type=PROFILE_FORMATS[fmt],
+                    headers={"X-Profile-Pid": str(os.getpid()), "X-Profile-Samples": str(profiler.samples),
+                             "Cache-Control": "no-store"})
+
+
+@router.post("/feedback/reanalyze", status_code=202)
+async def reanalyze_feedback(
+    start: Optional[datetime] = Query(None, description="Only reanalyze feedback submitted at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only reanalyze feedback submitted before this time"),
+    batch_size: int = Query(256, ge=1, le=5000),
+    current_user: schemas.Patient = Depends(require_admin),
+):
+    """
+    Queue a re-run of sentiment, theme and urgency analysis over feedback in a period.
+
+    The job runs on the analysis queue, so reminder sends on the dispatch queue are not delayed.
+    Each batch is its own task, which queues the next batch when it finishes.
+
+    Args:
+        start: Optional lower bound on submitted_at (inclusive).
+        end: Optional upper bound on submitted_at (exclusive).
+        batch_size: Feedbacks analyzed and committed together.
+        current_user: Authenticated admin.
+
+    Returns:
+        The Celery task ID of the first batch.
+    """
+    from app.tasks import reanalyze_feedback_task
+
+    result = await run_in_threadpool(reanalyze_feedback_task.delay, start.isoformat() if start else None,
+                                     end.isoformat() if end else None, batch_size)
+    return {"task_id": result.id}
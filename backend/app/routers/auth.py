@@ -3,6 +3,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app import schemas, crud
 from app.dependencies import get_db, create_access_token
+from app.utils.passwords import verify_password_async, PasswordHasherBusy
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -15,6 +16,9 @@ async def login_for_access_token(
     """
     Authenticate a patient and return a JWT access token.
 
+    The bcrypt check runs on a bounded worker pool so it never blocks the event loop.
+    Hashes created with a different bcrypt cost are transparently rehashed.
+
     Args:
         form_data: OAuth2 password request form with name and password.
         db: Database session for querying the patient.
@@ -23,14 +27,31 @@ async def login_for_access_token(
         Token schema with access token and token type.
 
     Raises:
-        HTTPException: If name or password is incorrect.
+        HTTPException: If name or password is incorrect, or too many logins are pending.
     """
     patient = crud.get_patient_by_name(db, form_data.username)
-    if not patient or not crud.verify_password(form_data.password, patient.hashed_password):
+    verified, new_hash = False, None
+    if patient:
+        try:
+            verified, new_hash = await verify_password_async(form_data.password, patient.hashed_password)
+        except PasswordHasherBusy:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent logins, please retry",
+                headers={"Retry-After": "1"},
+            )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect name or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(data={"sub": patient.name, "role": patient.role})
+    if new_hash:
+        crud.update_password_hash(db, patient, new_hash)
+    access_token = create_access_token(data={
+        "sub": patient.name,
+        "role": patient.role,
+        "pid": str(patient.patient_id),
+        "ver": patient.token_version or 0,
+    })
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
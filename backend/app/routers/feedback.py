@@ -1,11 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app import schemas, crud, models
 from app.dependencies import get_db, get_current_user
-import pandas as pd
+from app.utils.encoding import FORMAT_JSON, negotiate_format, model_response
+from app.utils.idempotency import get_submission_cache
+from app.utils.similarity import SIMILAR_FEEDBACK_MAX_K, find_similar_feedback
+from app.utils.transcription import AUDIO_MAX_BYTES, spool_upload, store_audio
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+import os
 
 router = APIRouter(prefix="/feedback", tags=["Feedback"])
 
+# Twilio statuses confirming the reminder reached the patient
+DELIVERED_STATUSES = {"delivered", "read", "completed"}
+
 
 @router.post("/submit", response_model=schemas.FeedbackAnalysis)
 async def submit_feedback(
@@ -16,6 +27,10 @@ async def submit_feedback(
     """
     Submit a new feedback entry and analyze it for sentiment, theme, and urgency.
 
+    Submissions are idempotent on feedback_id: a client retrying after a lost response gets the
+    stored analysis back without the feedback being analyzed again, and a duplicate sent while
+    the first is still being analyzed waits for its result.
+
     Args:
         feedback: Feedback data including patient_id, text, rating, language, and department.
         db: Database session.
@@ -25,28 +40,138 @@ async def submit_feedback(
         FeedbackAnalysis schema with analysis results.
 
     Raises:
-        HTTPException: If user is not a patient or patient_id does not match.
+        HTTPException: If user is not a patient, patient_id does not match, the feedback ID belongs
+            to another feedback, or a duplicate of it is still being processed.
     """
     if current_user.role != "patient":
         raise HTTPException(status_code=403, detail="Not authorized")
     if feedback.patient_id != current_user.patient_id:
         raise HTTPException(status_code=403, detail="Patient ID mismatch")
 
-    db_feedback = crud.submit_feedback(db, feedback)
-    analyzed_feedback = crud.analyze_feedback(db, db_feedback)
-
+    cache = get_submission_cache()
+    key = f"feedback_submit:{feedback.feedback_id}"
+    try:
+        stored = await cache.get_or_claim(key)
+    except TimeoutError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "5"})
+    if stored is not None:
+        analysis = schemas.FeedbackAnalysis.model_validate_json(stored)
+    else:
+        try:
+            analysis = await run_in_threadpool(_submit_and_analyze, db, feedback)
+        except BaseException:
+            cache.release(key)
+            raise
+        cache.complete(key, analysis.model_dump_json())
+    if analysis.patient_id != current_user.patient_id:
+        raise HTTPException(status_code=409, detail=f"Feedback ID already exists: {feedback.feedback_id}")
+    return analysis
+
+
+def _submit_and_analyze(db: Session, feedback: schemas.FeedbackSubmit) -> schemas.FeedbackAnalysis:
+    # Falls back to the database when the cache has no result (expired, or another worker's memory cache)
+    db_feedback = crud.get_feedback(db, feedback.feedback_id)
+    if db_feedback is None:
+        try:
+            db_feedback = crud.submit_feedback(db, feedback)
+        except ValueError as e:
+            # A concurrent submission (another worker) stored it first: carry on as a retry of it
+            db_feedback = crud.get_feedback(db, feedback.feedback_id)
+            if db_feedback is None:
+                raise HTTPException(status_code=409, detail=str(e))
+    if db_feedback.patient_id != feedback.patient_id or db_feedback.audio_path:
+        raise HTTPException(status_code=409, detail=f"Feedback ID already exists: {feedback.feedback_id}")
+    if db_feedback.sentiment is None:
+        # New, or stored by an earlier attempt that failed during analysis
+        db_feedback = crud.analyze_feedback(db, db_feedback)
     return schemas.FeedbackAnalysis(
-        feedback_id=analyzed_feedback.feedback_id,
-        sentiment=analyzed_feedback.sentiment,
-        theme=analyzed_feedback.theme,
-        urgent=analyzed_feedback.urgent,
-        patient_id=analyzed_feedback.patient_id,
-        department=analyzed_feedback.department
+        feedback_id=db_feedback.feedback_id,
+        sentiment=db_feedback.sentiment,
+        theme=db_feedback.theme,
+        urgent=db_feedback.urgent,
+        patient_id=db_feedback.patient_id,
+        department=db_feedback.department
     )
 
 
+@router.post("/transcribe", response_model=schemas.FeedbackTranscription, status_code=202)
+async def transcribe_feedback(
+        request: Request,
+        feedback_id: str = Query(...),
+        rating: int = Query(...),
+        language: str = Query(...),
+        department: str = Query(...),
+        patient_id: UUID = Query(...),
+        content_type: Optional[str] = Header(None),
+        content_length: Optional[int] = Header(None),
+        db: Session = Depends(get_db),
+        current_user: schemas.Patient = Depends(get_current_user)
+):
+    """
+    Submit a voice note as feedback; it is transcribed and analyzed in the background.
+
+    The request body is the raw audio (any format ffmpeg decodes, e.g. audio/ogg from WhatsApp),
+    streamed to a temporary file that only stays in memory while small. Transcription runs
+    offline on an analysis worker, then the transcript goes through the usual analysis.
+
+    Args:
+        request: Request whose body is the audio.
+        feedback_id: Client feedback ID.
+        rating: Rating given with the voice note.
+        language: Spoken language, selecting the transcription model.
+        department: Department the feedback is about.
+        patient_id: ID of the submitting patient.
+        content_type: Audio media type (audio/* or application/octet-stream).
+        content_length: Announced body size, checked before reading.
+        db: Database session.
+        current_user: Authenticated patient.
+
+    Returns:
+        FeedbackTranscription with status 'queued'.
+
+    Raises:
+        HTTPException: If user is not a patient, patient_id does not match, the body is empty,
+            too large or not audio, or the feedback ID already exists.
+    """
+    if current_user.role != "patient":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if patient_id != current_user.patient_id:
+        raise HTTPException(status_code=403, detail="Patient ID mismatch")
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if not (media_type.startswith("audio/") or media_type == "application/octet-stream"):
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Body must be audio")
+    if content_length is not None and content_length > AUDIO_MAX_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Audio larger than {AUDIO_MAX_BYTES} bytes")
+
+    try:
+        audio, size = await spool_upload(request.stream())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    if not size:
+        audio.close()
+        raise HTTPException(status_code=400, detail="Empty audio")
+    audio_path = await run_in_threadpool(store_audio, audio, media_type)
+
+    feedback = schemas.FeedbackSubmit(feedback_id=feedback_id, text="", rating=rating, language=language,
+                                      department=department, patient_id=patient_id)
+    try:
+        db_feedback = crud.submit_feedback(db, feedback, audio_path=audio_path)
+    except ValueError as e:
+        os.remove(audio_path)
+        raise HTTPException(status_code=409, detail=str(e))
+
+    from app.tasks import transcribe_feedback_task
+    await run_in_threadpool(transcribe_feedback_task.delay, db_feedback.feedback_id)
+    return schemas.FeedbackTranscription(feedback_id=db_feedback.feedback_id, patient_id=db_feedback.patient_id,
+                                         status="queued")
+
+
 @router.get("/metrics", response_model=schemas.FeedbackMetrics)
 async def get_feedback_metrics(
+        start: Optional[datetime] = Query(None, description="Only include feedback submitted at or after this time"),
+        end: Optional[datetime] = Query(None, description="Only include feedback submitted before this time"),
+        accept: Optional[str] = Header(None, description="application/json or application/msgpack"),
         db: Session = Depends(get_db),
         current_user: schemas.Patient = Depends(get_current_user)
 ):
@@ -54,6 +179,9 @@ async def get_feedback_metrics(
     Retrieve aggregated feedback metrics for admin users.
 
     Args:
+        start: Optional lower bound on submitted_at (inclusive).
+        end: Optional upper bound on submitted_at (exclusive).
+        accept: Accept header; application/msgpack returns MessagePack.
         db: Database session.
         current_user: Authenticated user.
 
@@ -66,22 +194,32 @@ async def get_feedback_metrics(
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    metrics = crud.get_feedback_metrics(db)
+    metrics = crud.get_feedback_metrics(db, start=start, end=end)
     if not metrics.total_rows:
         raise HTTPException(status_code=404, detail="No feedback available")
 
-    return metrics
+    fmt = negotiate_format(accept)
+    return metrics if fmt == FORMAT_JSON else model_response(metrics, fmt)
 
 
 @router.get("/dashboard/metrics", response_model=schemas.DashboardMetrics)
 async def get_dashboard_metrics(
+        start: Optional[datetime] = Query(None, description="Only include feedback submitted at or after this time"),
+        end: Optional[datetime] = Query(None, description="Only include feedback submitted before this time"),
+        accept: Optional[str] = Header(None, description="application/json or application/msgpack"),
         db: Session = Depends(get_db),
         current_user: schemas.Patient = Depends(get_current_user)
 ):
     """
     Retrieve dashboard metrics for admin users, including satisfaction and reminder success rates.
 
+    reminder_success_rate counts reminders accepted by Twilio; reminder_delivery_rate is the
+    share of those confirmed delivered by Twilio status callbacks.
+
     Args:
+        start: Optional lower bound on submitted_at (inclusive).
+        end: Optional upper bound on submitted_at (exclusive).
+        accept: Accept header; application/msgpack returns MessagePack.
         db: Database session.
         current_user: Authenticated user.
 
@@ -94,16 +232,18 @@ async def get_dashboard_metrics(
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    feedbacks = db.query(models.Feedback).all()
+    feedbacks = crud.filter_feedback_period(db.query(models.Feedback), start, end).all()
     reminders = db.query(models.Reminder).all()
 
+    fmt = negotiate_format(accept)
     if not feedbacks:
-        return schemas.DashboardMetrics(
+        metrics = schemas.DashboardMetrics(
             satisfaction_rate=0.0,
             reminder_success_rate=0.0,
             top_themes=[],
             urgent_issues_count=0
         )
+        return metrics if fmt == FORMAT_JSON else model_response(metrics, fmt)
 
     positive_count = sum(1 for fb in feedbacks if fb.sentiment == "Positive")
     satisfaction_rate = (positive_count / len(feedbacks)) * 100
@@ -115,52 +255,136 @@ async def get_dashboard_metrics(
     top_themes = sorted(theme_counts, key=theme_counts.get, reverse=True)[:3]
 
     urgent_count = sum(1 for fb in feedbacks if fb.urgent)
-    reminder_success = sum(1 for r in reminders if r.sent) / len(reminders) if reminders else 0.0
+    sent_count = sum(1 for r in reminders if r.sent)
+    reminder_success = sent_count / len(reminders) if reminders else 0.0
+    delivered_count = sum(1 for r in reminders if r.delivery_status in DELIVERED_STATUSES)
+    reminder_delivery = delivered_count / sent_count if sent_count else 0.0
 
-    return schemas.DashboardMetrics(
+    metrics = schemas.DashboardMetrics(
         satisfaction_rate=satisfaction_rate,
         reminder_success_rate=reminder_success * 100,
+        reminder_delivery_rate=reminder_delivery * 100,
         top_themes=top_themes,
         urgent_issues_count=urgent_count
     )
+    return metrics if fmt == FORMAT_JSON else model_response(metrics, fmt)
 
 
-@router.get("/dashboard/export")
-async def export_dashboard_data(
+@router.get("/similar", response_model=List[schemas.SimilarFeedback])
+async def get_similar_feedback(
+        feedback_id: str,
+        k: int = Query(10, ge=1, le=SIMILAR_FEEDBACK_MAX_K, description="Maximum number of similar feedbacks"),
+        department: Optional[str] = Query(None, description="Only return feedback from this department"),
+        start: Optional[datetime] = Query(None, description="Only return feedback submitted at or after this time"),
+        end: Optional[datetime] = Query(None, description="Only return feedback submitted before this time"),
         db: Session = Depends(get_db),
         current_user: schemas.Patient = Depends(get_current_user)
 ):
     """
-    Export feedback data as CSV for admin users.
+    Return the feedback whose text is most similar to a given feedback, for admin users.
 
     Args:
+        feedback_id: Client feedback ID of the feedback to compare with.
+        k: Maximum number of similar feedbacks.
+        department: Optional department filter.
+        start: Optional lower bound on submitted_at (inclusive).
+        end: Optional upper bound on submitted_at (exclusive).
         db: Database session.
         current_user: Authenticated user.
 
     Returns:
-        Dictionary with CSV data as a string.
+        List of SimilarFeedback schemas, most similar first.
+
+    Raises:
+        HTTPException: If user is not an admin, the feedback does not exist, or it has not been analyzed yet.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    feedback = crud.get_feedback(db, feedback_id)
+    if feedback is None:
+        raise HTTPException(status_code=404, detail=f"Feedback not found: {feedback_id}")
+    similar = find_similar_feedback(db, feedback, k, department, start, end)
+    if similar is None:
+        raise HTTPException(status_code=409, detail=f"Feedback not analyzed yet: {feedback_id}")
+    return [
+        schemas.SimilarFeedback(
+            feedback_id=fb.feedback_id,
+            text=fb.text,
+            department=fb.department,
+            sentiment=fb.sentiment,
+            theme=fb.theme,
+            urgent=fb.urgent,
+            submitted_at=fb.submitted_at,
+            similarity=similarity
+        ) for fb, similarity in similar
+    ]
+
+
+@router.post("/dashboard/export", status_code=202)
+async def export_dashboard_data(
+        start: Optional[datetime] = Query(None, description="Only include feedback submitted at or after this time"),
+        end: Optional[datetime] = Query(None, description="Only include feedback submitted before this time"),
+        current_user: schemas.Patient = Depends(get_current_user)
+):
+    """
+    Queue an export of feedback data as CSV for admin users.
+
+    The CSV is built on the exports queue, so a large export never holds an API worker;
+    fetch it from GET /feedback/dashboard/export/{task_id}.
+
+    Args:
+        start: Optional lower bound on submitted_at (inclusive).
+        end: Optional upper bound on submitted_at (exclusive).
+        current_user: Authenticated user.
+
+    Returns:
+        The Celery task ID of the export.
 
     Raises:
         HTTPException: If user is not an admin.
     """
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
+    from app.tasks import export_feedback_csv_task
+
+    result = await run_in_threadpool(export_feedback_csv_task.delay, start.isoformat() if start else None,
+                                     end.isoformat() if end else None)
+    return {"task_id": result.id}
+
 
-    feedbacks = db.query(models.Feedback).all()
-
-    df = pd.DataFrame([
-        {
-            "feedback_id": fb.feedback_id,
-            "patient_id": fb.patient_id,
-            "text": fb.text,
-            "rating": fb.rating,
-            "sentiment": fb.sentiment,
-            "theme": fb.theme,
-            "urgent": fb.urgent,
-            "department": fb.department,
-            "submitted_at": fb.submitted_at
-        } for fb in feedbacks
-    ])
-    csv_data = df.to_csv(index=False)
-
-    return {"csv_data": csv_data}
\ No newline at end of file
+@router.get("/dashboard/export/{task_id}")
+async def get_dashboard_export(
+        task_id: str,
+        response: Response,
+        current_user: schemas.Patient = Depends(get_current_user)
+):
+    """
+    Fetch a queued CSV export for admin users.
+
+    Results are kept for 24 hours (Celery result_expires); an unknown or expired task ID
+    reads as pending.
+
+    Args:
+        task_id: Task ID returned by POST /feedback/dashboard/export.
+        response: Response whose status is set to 202 while the export is running.
+        current_user: Authenticated user.
+
+    Returns:
+        Dictionary with CSV data as a string, or the task status (202) while it is not ready.
+
+    Raises:
+        HTTPException: If user is not an admin, or the export failed.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    from app.tasks import export_feedback_csv_task
+
+    result = export_feedback_csv_task.AsyncResult(task_id)
+    state = await run_in_threadpool(lambda: result.state)
+    if state == "SUCCESS":
+        return await run_in_threadpool(result.get)
+    if state == "FAILURE":
+        raise HTTPException(status_code=500, detail="Export failed")
+    response.status_code = status.HTTP_202_ACCEPTED
+    return {"task_id": task_id, "status": state.lower()}
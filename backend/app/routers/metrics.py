@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Header, HTTPException, Response
+from app.utils.metrics import PROMETHEUS_CONTENT_TYPE, render_prometheus
+from typing import Optional
+import hmac
+import os
+
+router = APIRouter(tags=["Monitoring"])
+
+# Bearer token Prometheus must send (loaded from environment variables); empty leaves /metrics open
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    """
+    Expose the latency histograms and counters of this worker process for Prometheus.
+
+    Args:
+        authorization: 'Bearer <METRICS_TOKEN>' when a token is configured.
+
+    Returns:
+        Metrics in the Prometheus text exposition format.
+
+    Raises:
+        HTTPException: If a token is configured and the request does not carry it.
+    """
+    if METRICS_TOKEN and not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
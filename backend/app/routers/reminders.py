@@ -1,13 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app import schemas, crud, models
 from app.dependencies import get_db, get_current_user
+from app.utils.search import apply_text_search
+from app.utils.reminder_import import parse_reminder_batch, validate_reminder_batch
+from app.utils.reminders import validate_status_callback, TWILIO_STATUS_CALLBACK_URL
+from app.utils.delivery import record_receipt
+from app.utils.encoding import FORMAT_JSON, models_response, negotiate_format, rows_response, select_fields
+from app.utils.sync import REMINDER_SYNC_PAGE, collect_reminder_changes
+from pydantic import TypeAdapter
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
+import os
 
 router = APIRouter(prefix="/reminders", tags=["Reminders"])
 
+# Maximum number of rows accepted by a single bulk import
+REMINDER_IMPORT_MAX_ROWS = int(os.getenv("REMINDER_IMPORT_MAX_ROWS", "50000"))
+# Fields a fields= projection may select
+REMINDER_FIELDS = tuple(schemas.Reminder.model_fields)
+FIELDS_DESCRIPTION = f"Comma-separated fields to return ({', '.join(REMINDER_FIELDS)}); only these columns are loaded"
+ACCEPT_DESCRIPTION = "application/json, application/vnd.compact+json or application/msgpack"
+
+
+REMINDER_LIST = TypeAdapter(List[schemas.Reminder])
+
+
+def _projection(fields: Optional[str], accept: Optional[str]):
+    # (columns to select, format); every schemas.Reminder column unless fields= narrows them
+    try:
+        return select_fields(fields, REMINDER_FIELDS), negotiate_format(accept)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _rows_response(columns: List[str], rows, fmt: str, fields: Optional[str]):
+    # Plain JSON of the full schema: rows validated into schemas.Reminder; otherwise encoded as they are
+    if fields is None and fmt == FORMAT_JSON:
+        return models_response(REMINDER_LIST, rows)
+    return rows_response(columns, rows, fmt)
+
 
 @router.post("/create", response_model=schemas.Reminder)
 async def create_reminder(
@@ -37,17 +71,53 @@ async def create_reminder(
         raise HTTPException(status_code=404, detail="Patient not found")
 
     db_reminder = crud.create_reminder(db, reminder, user_id=current_user.patient_id)
-    return schemas.Reminder(
-        id=db_reminder.id,
-        patient_id=db_reminder.patient_id,
-        patient_name=db_reminder.patient_name,
-        appointment_reason=db_reminder.appointment_reason,
-        language=db_reminder.language,
-        method=db_reminder.method,
-        scheduled_time=db_reminder.scheduled_time,
-        sent=db_reminder.sent,
-        sent_at=db_reminder.sent_at
-    )
+    return schemas.Reminder.model_validate(db_reminder)
+
+
+@router.post("/import", response_model=schemas.ReminderImportResult)
+async def import_reminders(
+        request: Request,
+        db: Session = Depends(get_db),
+        current_user: schemas.Patient = Depends(get_current_user)
+):
+    """
+    Bulk-create reminders from a CSV or NDJSON booking export (admin only).
+
+    The whole batch is validated in one pass, patient existence is checked with a single
+    query, and valid rows are inserted together. Invalid rows are skipped and reported.
+
+    Args:
+        request: Request whose body is the export (Content-Type text/csv or application/x-ndjson).
+        db: Database session.
+        current_user: Authenticated user.
+
+    Returns:
+        ReminderImportResult with the number of imported rows and per-row errors.
+
+    Raises:
+        HTTPException: If user is not an admin, the format is unsupported, or the batch is too large.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    payload = await request.body()
+    content_type = request.headers.get("content-type", "")
+
+    def run_import():
+        try:
+            rows, errors = parse_reminder_batch(payload, content_type)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        total_rows = len(rows) + len(errors)
+        if total_rows > REMINDER_IMPORT_MAX_ROWS:
+            raise HTTPException(status_code=413,
+                                detail=f"Too many rows: {total_rows}. Maximum is {REMINDER_IMPORT_MAX_ROWS}")
+        valid, validation_errors = validate_reminder_batch(rows, crud.VALID_REMINDER_METHODS, crud.VALID_LANGUAGES)
+        imported, insert_errors = crud.bulk_create_reminders(db, valid, user_id=current_user.patient_id)
+        all_errors = sorted(errors + validation_errors + insert_errors, key=lambda e: e["row"])
+        return schemas.ReminderImportResult(total_rows=total_rows, imported=imported, errors=all_errors)
+
+    return await run_in_threadpool(run_import)
 
 
 @router.get("/list", response_model=List[schemas.Reminder])
@@ -55,21 +125,28 @@ async def list_reminders(
         patient_id: UUID,
         skip: int = Query(0, ge=0),
         limit: int = Query(100, ge=1, le=100),
+        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+        accept: Optional[str] = Header(None, description=ACCEPT_DESCRIPTION),
         db: Session = Depends(get_db),
         current_user: schemas.Patient = Depends(get_current_user)
 ):
     """
     List reminders for a specific patient with pagination (accessible by patient or admin).
 
+    With fields= or a compact Accept type, only the requested columns are selected and
+    rows are encoded directly (see app.utils.encoding).
+
     Args:
         patient_id: UUID of the patient to query reminders for.
         skip: Number of records to skip (for pagination).
         limit: Maximum number of records to return (for pagination).
+        fields: Optional comma-separated subset of Reminder fields.
+        accept: Accept header selecting JSON, compact JSON arrays or MessagePack.
         db: Database session.
         current_user: Authenticated user.
 
     Returns:
-        List of Reminder schemas.
+        List of Reminder schemas, or the projected fields in the negotiated encoding.
 
     Raises:
         HTTPException: If user is neither the patient nor an admin.
@@ -77,20 +154,87 @@ async def list_reminders(
     if current_user.role != "admin" and current_user.patient_id != patient_id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    reminders = crud.get_reminders(db, patient_id, skip=skip, limit=limit, user_id=current_user.patient_id)
-    return [
-        schemas.Reminder(
-            id=r.id,
-            patient_id=r.patient_id,
-            patient_name=r.patient_name,
-            appointment_reason=r.appointment_reason,
-            language=r.language,
-            method=r.method,
-            scheduled_time=r.scheduled_time,
-            sent=r.sent,
-            sent_at=r.sent_at
-        ) for r in reminders
-    ]
+    columns, fmt = _projection(fields, accept)
+    rows = crud.get_reminder_rows(db, patient_id, columns, skip=skip, limit=limit, user_id=current_user.patient_id)
+    return _rows_response(columns, rows, fmt, fields)
+
+
+@router.get("/by-phone", response_model=List[schemas.Reminder])
+async def get_reminders_by_phone(
+        phone_number: str,
+        db: Session = Depends(get_db),
+        current_user: schemas.Patient = Depends(get_current_user)
+):
+    """
+    Find the reminders sent to a phone number (admin only).
+
+    Phone numbers are stored encrypted, so the lookup goes through their blind index.
+
+    Args:
+        phone_number: Phone number in any format accepted at creation.
+        db: Database session.
+        current_user: Authenticated user.
+
+    Returns:
+        List of Reminder schemas for that number.
+
+    Raises:
+        HTTPException: If user is not an admin, the number is invalid, or no blind index key is configured.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    try:
+        reminders = crud.get_reminders_by_phone(db, phone_number, user_id=current_user.patient_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return models_response(REMINDER_LIST, reminders)
+
+
+@router.get("/changes", response_model=schemas.ReminderChanges)
+async def get_reminder_changes(
+        patient_id: UUID,
+        cursor: Optional[str] = Query(None, description="Cursor from the previous call; omit for a full sync"),
+        limit: int = Query(REMINDER_SYNC_PAGE, ge=1, le=1000),
+        db: Session = Depends(get_db),
+        current_user: schemas.Patient = Depends(get_current_user)
+):
+    """
+    Return a patient's reminders created, updated, sent or deleted since a sync cursor.
+
+    Clients keep a local copy and poll with the returned cursor; when nothing changed the
+    response carries no reminders. Changes become visible REMINDER_SYNC_SETTLE seconds after
+    they are made.
+
+    Args:
+        patient_id: UUID of the patient to sync reminders for.
+        cursor: Cursor returned by the previous call.
+        limit: Maximum reminders, and maximum deletions, per page.
+        db: Database session.
+        current_user: Authenticated user.
+
+    Returns:
+        ReminderChanges with the changed reminders, deleted IDs and the next cursor.
+
+    Raises:
+        HTTPException: If user is neither the patient nor an admin, or the cursor is invalid.
+    """
+    if current_user.role != "admin" and current_user.patient_id != patient_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    try:
+        changes = collect_reminder_changes(db, patient_id, cursor, limit, columns=crud.REMINDER_COLUMNS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return schemas.ReminderChanges(
+        reminders=REMINDER_LIST.validate_python(changes["reminders"]),
+        deleted=changes["deleted"],
+        cursor=changes["cursor"],
+        has_more=changes["has_more"],
+        full=changes["full"]
+    )
 
 
 @router.post("/trigger")
@@ -118,6 +262,39 @@ async def trigger_reminders(
     return {"message": f"{count} reminders triggered"}
 
 
+@router.post("/status-callback", status_code=status.HTTP_204_NO_CONTENT)
+async def delivery_status_callback(request: Request):
+    """
+    Receive a Twilio status callback (delivery receipt) for a sent reminder.
+
+    The receipt is only buffered here; a background flusher applies buffered receipts
+    to the reminders table in bulk, so the callback returns immediately.
+
+    Args:
+        request: Form-encoded Twilio callback with MessageSid/MessageStatus or CallSid/CallStatus.
+
+    Returns:
+        Empty 204 response.
+
+    Raises:
+        HTTPException: If the Twilio signature is invalid or the callback lacks a SID or status.
+    """
+    form = await request.form()
+    params = {key: value for key, value in form.items()}
+    if os.getenv("ENV", "development") != "development":
+        url = TWILIO_STATUS_CALLBACK_URL or str(request.url)
+        if not validate_status_callback(url, params, request.headers.get("X-Twilio-Signature", "")):
+            raise HTTPException(status_code=403, detail="Invalid Twilio signature")
+
+    sid = params.get("MessageSid") or params.get("CallSid")
+    delivery_status = params.get("MessageStatus") or params.get("CallStatus")
+    if not sid or not delivery_status:
+        raise HTTPException(status_code=400, detail="Missing SID or status")
+
+    record_receipt(sid, delivery_status)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.delete("/delete/{reminder_id}", response_model=dict)
 async def delete_reminder(
         reminder_id: int,
@@ -181,58 +358,57 @@ async def update_reminder(
     if db_reminder is None:
         raise HTTPException(status_code=404, detail="Reminder not found")
 
-    return schemas.Reminder(
-        id=db_reminder.id,
-        patient_id=db_reminder.patient_id,
-        patient_name=db_reminder.patient_name,
-        appointment_reason=db_reminder.appointment_reason,
-        language=db_reminder.language,
-        method=db_reminder.method,
-        scheduled_time=db_reminder.scheduled_time,
-        sent=db_reminder.sent,
-        sent_at=db_reminder.sent_at
-    )
+    return schemas.Reminder.model_validate(db_reminder)
 
 
 @router.get("/search", response_model=List[schemas.Reminder])
 async def search_reminders(
-        patient_id: UUID,
+        patient_id: Optional[UUID] = Query(None, description="Patient to search reminders for (admins may omit it to search all patients)"),
         method: Optional[str] = Query(None, description="Filter by reminder method (whatsapp, sms, call)"),
         language: Optional[str] = Query(None, description="Filter by language (e.g., english, french)"),
         sent: Optional[bool] = Query(None, description="Filter by sent status (true/false)"),
         scheduled_after: Optional[datetime] = Query(None, description="Filter by scheduled time after this datetime"),
         appointment_reason: Optional[str] = Query(None, description="Filter by appointment reason (partial match)"),
+        q: Optional[str] = Query(None, min_length=1, description="Ranked text search over appointment reason, medications and consultations"),
         skip: int = Query(0, ge=0, description="Number of records to skip"),
         limit: int = Query(100, ge=1, le=100, description="Maximum number of records to return"),
+        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+        accept: Optional[str] = Header(None, description=ACCEPT_DESCRIPTION),
         db: Session = Depends(get_db),
         current_user: schemas.Patient = Depends(get_current_user)
 ):
     """
-    Search reminders for a specific patient with optional filters and pagination.
+    Search reminders for a specific patient (or all patients, for admins) with optional filters and pagination.
 
     Args:
-        patient_id: UUID of the patient to query reminders for.
+        patient_id: UUID of the patient to query reminders for; admins may omit it.
         method: Optional filter for reminder method (whatsapp, sms, call).
         language: Optional filter for reminder language.
         sent: Optional filter for sent status.
         scheduled_after: Optional filter for reminders scheduled after this time.
         appointment_reason: Optional filter for appointment reason (partial match).
+        q: Optional text search term; results are ordered by relevance when provided.
         skip: Number of records to skip (for pagination).
         limit: Maximum number of records to return (for pagination).
+        fields: Optional comma-separated subset of Reminder fields; only these columns are selected.
+        accept: Accept header selecting JSON, compact JSON arrays or MessagePack.
         db: Database session.
         current_user: Authenticated user.
 
     Returns:
-        List of Reminder schemas matching the filters.
+        List of Reminder schemas matching the filters, or the projected fields in the negotiated encoding.
 
     Raises:
         HTTPException: If user is neither the patient nor an admin or invalid method.
     """
-    if current_user.role != "admin" and current_user.patient_id != patient_id:
+    if current_user.role != "admin" and (patient_id is None or current_user.patient_id != patient_id):
         raise HTTPException(status_code=403, detail="Not authorized")
 
+    projection = _projection(fields, accept)
     from sqlalchemy import or_
-    query = db.query(models.Reminder).filter(models.Reminder.patient_id == patient_id)
+    query = db.query(models.Reminder)
+    if patient_id is not None:
+        query = query.filter(models.Reminder.patient_id == patient_id)
 
     if method:
         if method not in crud.VALID_REMINDER_METHODS:
@@ -255,17 +431,9 @@ async def search_reminders(
     if appointment_reason:
         query = query.filter(or_(models.Reminder.appointment_reason.ilike(f"%{appointment_reason}%")))
 
-    reminders = query.offset(skip).limit(limit).all()
-    return [
-        schemas.Reminder(
-            id=r.id,
-            patient_id=r.patient_id,
-            patient_name=r.patient_name,
-            appointment_reason=r.appointment_reason,
-            language=r.language,
-            method=r.method,
-            scheduled_time=r.scheduled_time,
-            sent=r.sent,
-            sent_at=r.sent_at
-        ) for r in reminders
-    ]
\ No newline at end of file
+    if q:
+        query = apply_text_search(query, q, db.get_bind().dialect.name)
+
+    columns, fmt = projection
+    rows = query.with_entities(*[getattr(models.Reminder, column) for column in columns]).offset(skip).limit(limit).all()
+    return _rows_response(columns, rows, fmt, fields)
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app import crud
+from app.dependencies import get_db
+from app.utils.sync import SYNC_NODE_ID_MAX_LENGTH, SYNC_TOKEN, decode_records
+from typing import Dict
+import hmac
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+@router.post("/ingest")
+async def ingest_sync_batch(request: Request, db: Session = Depends(get_db)) -> Dict[str, object]:
+    """
+    Receive a batch of feedback, reminder and patient changes pushed by an offline clinic node.
+
+    The body is NDJSON, usually gzip-compressed (Content-Encoding: gzip). Clinic nodes
+    authenticate with the shared SYNC_TOKEN in the X-Sync-Token header and name themselves
+    in X-Sync-Node: reminders a node pushes stay owned, and dispatched, by that node. Re-sent
+    batches are ignored, so a node can safely retry after a dropped link. Records that conflict
+    with central data (a role other than 'patient', a name taken by another patient, a reminder
+    owned by another node) are skipped, along with the feedback and reminders of a skipped
+    patient, and listed in the response.
+
+    Args:
+        request: Raw request carrying the batch.
+        db: Database session.
+
+    Returns:
+        Counts of patients, feedback and reminders created, updated or deleted, and the skipped records.
+
+    Raises:
+        HTTPException: If sync is disabled, the token is wrong, the node is unnamed, or the batch is malformed.
+    """
+    token = request.headers.get("X-Sync-Token", "")
+    if not SYNC_TOKEN or not hmac.compare_digest(token.encode(), SYNC_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid sync token")
+    node = request.headers.get("X-Sync-Node", "")
+    if not node or len(node) > SYNC_NODE_ID_MAX_LENGTH:
+        raise HTTPException(status_code=400, detail="Missing or invalid X-Sync-Node header")
+    body = await request.body()
+    try:
+        records = await run_in_threadpool(decode_records, body, request.headers.get("Content-Encoding"))
+    except (ValueError, OSError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid sync batch: {str(e)}")
+    return await run_in_threadpool(crud.ingest_sync_records, db, records, node)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 from typing import Optional, List, Dict
 from uuid import UUID
@@ -24,6 +24,11 @@ class FeedbackSubmit(BaseModel):
     department: str
     patient_id: UUID
 
+class FeedbackTranscription(BaseModel):
+    feedback_id: str
+    patient_id: UUID
+    status: str  # 'queued' until the transcript has been analyzed
+
 class FeedbackAnalysis(BaseModel):
     feedback_id: str
     sentiment: str
@@ -32,6 +37,16 @@ class FeedbackAnalysis(BaseModel):
     patient_id: UUID
     department: str
 
+class SimilarFeedback(BaseModel):
+    feedback_id: str
+    text: str
+    department: str
+    sentiment: Optional[str]
+    theme: Optional[str]
+    urgent: bool
+    submitted_at: datetime
+    similarity: float  # Cosine similarity with the queried feedback, 1.0 for identical text
+
 class FeedbackMetrics(BaseModel):
     sentiment_distribution: Dict[str, int]
     theme_distribution: Dict[str, int]
@@ -51,6 +66,9 @@ class ReminderCreate(BaseModel):
     scheduled_time: datetime
 
 class Reminder(BaseModel):
+    # Built straight from ORM entities or column-projected rows (crud.REMINDER_COLUMNS)
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     patient_id: UUID
     patient_name: str
@@ -61,8 +79,26 @@ class Reminder(BaseModel):
     sent: bool
     sent_at: Optional[datetime]
 
+class ReminderChanges(BaseModel):
+    reminders: List[Reminder]  # Created or changed since the cursor, oldest change first
+    deleted: List[int]  # IDs of reminders deleted (or reassigned) since the cursor
+    cursor: str  # Pass back on the next call
+    has_more: bool  # More changes are waiting: call again right away
+    full: bool  # reminders is the complete set: replace the local copy
+
+class ReminderImportError(BaseModel):
+    row: int
+    field: Optional[str] = None
+    error: str
+
+class ReminderImportResult(BaseModel):
+    total_rows: int
+    imported: int
+    errors: List[ReminderImportError]
+
 class DashboardMetrics(BaseModel):
     satisfaction_rate: float
     reminder_success_rate: float
+    reminder_delivery_rate: float = 0.0
     top_themes: List[str]
     urgent_issues_count: int
\ No newline at end of file
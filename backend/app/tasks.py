@@ -1,9 +1,15 @@
 from app.celery_app import celery_app
-from app.database import SessionLocal
-from app.crud import trigger_reminders
+from app.database import SessionLocal, engine
+from app.crud import trigger_reminders, prune_reminder_tombstones, get_feedback, analyze_feedback, reanalyze_feedback_batch, export_feedback_csv
+from app.utils.partitions import ensure_feedback_partitions
+from app.utils.sync import REMINDER_TOMBSTONE_DAYS
+from app.utils.transcription import transcribe_audio
+from datetime import datetime
+from typing import Optional
 
 
-@celery_app.task
+# Sends are acknowledged on receipt: redelivering a half-finished batch would message patients twice
+@celery_app.task(acks_late=False)
 def trigger_reminders_task():
     """
     Celery task to trigger pending reminders periodically.
@@ -19,4 +25,141 @@ def trigger_reminders_task():
         db.rollback()
         raise Exception(f"Failed to trigger reminders: {str(e)}")
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@celery_app.task
+def ensure_feedback_partitions_task():
+    """
+    Celery task to create upcoming monthly feedback partitions ahead of time.
+
+    Returns:
+        dict: Number of partitions created.
+    """
+    created = ensure_feedback_partitions(engine)
+    return {"message": f"Created {created} feedback partitions"}
+
+
+@celery_app.task
+def prune_reminder_tombstones_task():
+    """
+    Celery task to delete reminder tombstones older than REMINDER_TOMBSTONE_DAYS.
+
+    Returns:
+        dict: Number of tombstones deleted.
+    """
+    db = SessionLocal()
+    try:
+        count = prune_reminder_tombstones(db, REMINDER_TOMBSTONE_DAYS)
+        return {"message": f"Pruned {count} reminder tombstones"}
+    finally:
+        db.close()
+
+
+# Analysis is idempotent, so it is acknowledged after it runs and redelivered if the worker dies
+@celery_app.task(acks_late=True, reject_on_worker_lost=True)
+def analyze_feedback_task(feedback_id: str):
+    """
+    Celery task to run sentiment, theme and urgency analysis on one submitted feedback.
+
+    Args:
+        feedback_id: Client feedback ID.
+
+    Returns:
+        dict: Whether the feedback was found and analyzed.
+    """
+    db = SessionLocal()
+    try:
+        feedback = get_feedback(db, feedback_id)
+        if feedback is None:
+            return {"message": f"Feedback not found: {feedback_id}"}
+        analyze_feedback(db, feedback, user_id=None)
+        return {"message": f"Analyzed feedback {feedback_id}"}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(acks_late=True, reject_on_worker_lost=True)
+def transcribe_feedback_task(feedback_id: str):
+    """
+    Celery task to transcribe an audio feedback, then queue its analysis.
+
+    Args:
+        feedback_id: Client feedback ID.
+
+    Returns:
+        dict: Length of the transcript.
+    """
+    db = SessionLocal()
+    try:
+        feedback = get_feedback(db, feedback_id)
+        if feedback is None or not feedback.audio_path:
+            return {"message": f"No audio feedback: {feedback_id}"}
+        transcript = transcribe_audio(feedback.audio_path, feedback.language)
+        feedback.text = transcript
+        db.commit()
+        analyze_feedback_task.delay(feedback_id)
+        return {"message": f"Transcribed {len(transcript)} characters for feedback {feedback_id}"}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# One message per batch: each is acknowledged within minutes, far inside the broker's visibility
+# timeout, and a dead worker only costs its current batch
+@celery_app.task(acks_late=True, reject_on_worker_lost=True)
+def reanalyze_feedback_task(start: Optional[str] = None, end: Optional[str] = None, batch_size: int = 256,
+                            after_id: int = 0):
+    """
+    Celery task to re-run the analysis over one batch of feedback in a period, then queue the next batch.
+
+    Args:
+        start: Optional ISO lower bound on submitted_at (inclusive).
+        end: Optional ISO upper bound on submitted_at (exclusive).
+        batch_size: Feedbacks analyzed and committed together.
+        after_id: Only feedback with a larger id is analyzed (the previous batch's last id).
+
+    Returns:
+        dict: Number of feedbacks reanalyzed in this batch.
+    """
+    db = SessionLocal()
+    try:
+        count, last_id = reanalyze_feedback_batch(db, _parse_datetime(start), _parse_datetime(end), after_id, batch_size)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    if count == batch_size:
+        reanalyze_feedback_task.delay(start, end, batch_size, last_id)
+    return {"message": f"Reanalyzed {count} feedbacks after ID {after_id}"}
+
+
+# The CSV is read back by the caller, so this task stores its (gzip-compressed) result
+@celery_app.task(ignore_result=False, acks_late=True, compression="gzip")
+def export_feedback_csv_task(start: Optional[str] = None, end: Optional[str] = None):
+    """
+    Celery task to export feedback in a period as CSV.
+
+    Args:
+        start: Optional ISO lower bound on submitted_at (inclusive).
+        end: Optional ISO upper bound on submitted_at (exclusive).
+
+    Returns:
+        dict: CSV data as a string.
+    """
+    db = SessionLocal()
+    try:
+        return {"csv_data": export_feedback_csv(db, _parse_datetime(start), _parse_datetime(end))}
+    finally:
+        db.close()
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    # Task arguments travel as JSON, so datetimes are passed as ISO strings
+    return datetime.fromisoformat(value) if value else None
@@ -0,0 +1,271 @@
+from collections import OrderedDict
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, List, Optional, Tuple
+import brotli
+import hashlib
+import logging
+import os
+import threading
+import zlib
+import zstandard
+
+logger = logging.getLogger(__name__)
+
+# Response compression configuration (loaded from environment variables)
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1000"))  # Smaller bodies are sent as-is
+COMPRESSION_CACHE_MAX_BYTES = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+COMPRESSION_CACHE_MAX_BODY = int(os.getenv("COMPRESSION_CACHE_MAX_BODY", str(1024 * 1024)))  # Larger bodies are not cached
+
+# Server preference when the client accepts several encodings equally
+ENCODINGS = ("br", "zstd", "gzip")
+# Levels for responses compressed once and cached, and for everything else. Brotli 11 and
+# zstd 19 shrink an 800 KB export only ~10% further than these but take 1-2.5 s instead of ~20-40 ms
+CACHED_LEVELS = {"br": 9, "zstd": 15, "gzip": 9}
+DYNAMIC_LEVELS = {"br": 4, "zstd": 3, "gzip": 6}
+# Bodies that do not shrink any further
+COMPRESSED_CONTENT_TYPES = ("image/png", "image/jpeg", "image/gif", "image/webp", "audio/", "video/",
+                            "application/zip", "application/gzip", "application/x-gzip", "application/zstd")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the best content coding the client accepts.
+
+    Args:
+        accept_encoding: Value of the Accept-Encoding header, e.g. 'gzip, br;q=0.9'.
+
+    Returns:
+        'br', 'zstd', 'gzip', or None when the client accepts none of them.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                continue
+        weights[coding.strip()] = weight
+    best, best_weight = None, 0.0
+    for coding in ENCODINGS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    """
+    Compress a complete body.
+
+    Args:
+        body: Uncompressed bytes.
+        encoding: 'br', 'zstd' or 'gzip'.
+        level: Compression level (Brotli quality for 'br').
+
+    Returns:
+        Compressed bytes.
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    return compressor.compress(body) + compressor.flush()
+
+
+class _StreamCompressor:
+    """Incremental compressor for streamed bodies; each chunk is flushed so it can be sent at once."""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        if self.encoding == "zstd":
+            return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        if self.encoding == "zstd":
+            return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+        return self._compressor.flush()
+
+
+class CompressedBodyCache:
+    """
+    LRU cache of compressed response bodies keyed by (ETag, encoding), bounded in bytes.
+
+    The ETag is a hash of the uncompressed body, so entries are shared by every client
+    receiving identical bytes and can never serve another response's content.
+    """
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str, encoding: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get((etag, encoding))
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((etag, encoding))
+            self.hits += 1
+            return body
+
+    def put(self, etag: str, encoding: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop((etag, encoding), None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[(etag, encoding)] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+compressed_body_cache = CompressedBodyCache()
+
+
+def _etag_matches(if_none_match: Optional[str], etags: Tuple[str, ...]) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or any(etag in candidates for etag in etags)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with Brotli, zstd or gzip, replacing GZipMiddleware.
+
+    Complete GET/HEAD 200 responses get an ETag (a hash of the body) and are answered with
+    304 when the client already holds it. Their compressed bytes are produced once at a
+    high level and cached by ETag, so hot responses such as the dashboard metrics and the
+    export are not recompressed per request. Other responses, and streamed ones, are
+    compressed at a fast level. Small bodies and already-compressed content types are
+    sent as-is.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+                 cache: CompressedBodyCache = compressed_body_cache):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        cacheable_method = scope["method"] in ("GET", "HEAD")
+        if_none_match = request_headers.get("if-none-match")
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        mode = "buffer"
+        streamer: Optional[_StreamCompressor] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, mode, streamer
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+            if mode == "passthrough":
+                await send(message)
+            elif mode == "stream":
+                data = streamer.compress(body) + (b"" if more_body else streamer.finish())
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+            elif more_body:
+                # Streamed response: compress on the fly without caching
+                headers = MutableHeaders(raw=list(start["headers"]))
+                if encoding and self._compressible(headers):
+                    mode, streamer = "stream", _StreamCompressor(encoding, DYNAMIC_LEVELS[encoding])
+                    del headers["content-length"]
+                    headers["content-encoding"] = encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    await send({**start, "headers": headers.raw})
+                    data = streamer.compress(b"".join(chunks) + body)
+                    await send({"type": "http.response.body", "body": data, "more_body": True})
+                else:
+                    mode = "passthrough"
+                    await send(start)
+                    await send({"type": "http.response.body", "body": b"".join(chunks) + body, "more_body": True})
+            else:
+                chunks.append(body)
+                await self._send_complete(send, start, b"".join(chunks), encoding, cacheable_method, if_none_match)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _compressible(self, headers: MutableHeaders) -> bool:
+        content_type = headers.get("content-type", "")
+        return "content-encoding" not in headers and not content_type.startswith(COMPRESSED_CONTENT_TYPES)
+
+    async def _send_complete(self, send: Send, start: Message, body: bytes, encoding: Optional[str],
+                             cacheable_method: bool, if_none_match: Optional[str]) -> None:
+        headers = MutableHeaders(raw=list(start["headers"]))
+        cacheable = (cacheable_method and start["status"] == 200
+                     and "no-store" not in headers.get("cache-control", ""))
+        compressible = len(body) >= self.minimum_size and self._compressible(headers)
+        compress_body = encoding is not None and compressible
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+
+        etag = None
+        if cacheable:
+            etag = headers.get("etag") or f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            # Each encoding is a distinct representation and needs its own validator
+            headers["etag"] = etag[:-1] + f'-{encoding}"' if compress_body else etag
+            if _etag_matches(if_none_match, (etag, headers["etag"])):
+                del headers["content-length"]
+                if "content-type" in headers:
+                    del headers["content-type"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        if compress_body:
+            cached = cacheable and len(body) <= COMPRESSION_CACHE_MAX_BODY
+            compressed = self.cache.get(etag, encoding) if cached else None
+            if compressed is None and cached:
+                # Compressed once per body at a high level, off the event loop
+                compressed = await run_in_threadpool(compress, body, encoding, CACHED_LEVELS[encoding])
+                self.cache.put(etag, encoding, compressed)
+            elif compressed is None:
+                compressed = compress(body, encoding, DYNAMIC_LEVELS[encoding])
+            body = compressed
+            headers["content-encoding"] = encoding
+        headers["content-length"] = str(len(body))
+        await send({**start, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
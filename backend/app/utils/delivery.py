@@ -0,0 +1,201 @@
+from fastapi.concurrency import run_in_threadpool
+from app import crud
+from app.database import SessionLocal
+from app.utils.reminders import STATUS_RANK
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Tuple
+import asyncio
+import json
+import logging
+import os
+import threading
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Delivery receipt buffering (loaded from environment variables)
+DELIVERY_BUFFER_BACKEND = os.getenv("DELIVERY_BUFFER_BACKEND", "memory")  # 'memory' or 'redis'
+DELIVERY_REDIS_URL = os.getenv("DELIVERY_REDIS_URL", os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"))
+DELIVERY_BUFFER_KEY = "delivery_receipts"
+DELIVERY_BUFFER_MAX = int(os.getenv("DELIVERY_BUFFER_MAX", "100000"))  # In-memory backend only
+DELIVERY_FLUSH_INTERVAL = float(os.getenv("DELIVERY_FLUSH_INTERVAL", "2"))  # Seconds between flushes
+DELIVERY_FLUSH_BATCH = int(os.getenv("DELIVERY_FLUSH_BATCH", "1000"))  # Receipts per UPDATE statement
+DELIVERY_SHUTDOWN_FLUSHES = int(os.getenv("DELIVERY_SHUTDOWN_FLUSHES", "10"))  # Batches flushed at most on shutdown
+
+Receipt = Tuple[str, str, datetime]
+
+
+class MemoryReceiptBuffer:
+    """Process-local receipt buffer; suitable for a single API worker."""
+
+    def __init__(self, max_size: int = DELIVERY_BUFFER_MAX):
+        self._items = deque()
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+    def append(self, receipt: Receipt) -> None:
+        with self._lock:
+            if len(self._items) >= self._max_size:
+                dropped = self._items.popleft()
+                logger.warning("Delivery receipt buffer full; dropped receipt for %s", dropped[0])
+            self._items.append(receipt)
+
+    def drain(self, max_items: int) -> List[Receipt]:
+        with self._lock:
+            count = min(max_items, len(self._items))
+            return [self._items.popleft() for _ in range(count)]
+
+
+class RedisReceiptBuffer:
+    """Receipt buffer in a Redis list, shared by every API worker."""
+
+    def __init__(self, url: str = DELIVERY_REDIS_URL, key: str = DELIVERY_BUFFER_KEY):
+        self._client = redis.Redis.from_url(url)
+        self._key = key
+
+    def append(self, receipt: Receipt) -> None:
+        sid, status, received_at = receipt
+        self._client.rpush(self._key, json.dumps([sid, status, received_at.isoformat()]))
+
+    def drain(self, max_items: int) -> List[Receipt]:
+        # LRANGE + LTRIM in one MULTI block so concurrent flushers never see the same receipt
+        pipe = self._client.pipeline(transaction=True)
+        pipe.lrange(self._key, 0, max_items - 1)
+        pipe.ltrim(self._key, max_items, -1)
+        items, _ = pipe.execute()
+        receipts = []
+        for item in items:
+            sid, status, received_at = json.loads(item)
+            receipts.append((sid, status, datetime.fromisoformat(received_at)))
+        return receipts
+
+
+@lru_cache(maxsize=1)
+def get_receipt_buffer():
+    """
+    Return the configured delivery receipt buffer.
+
+    Returns:
+        MemoryReceiptBuffer or RedisReceiptBuffer depending on DELIVERY_BUFFER_BACKEND.
+    """
+    if DELIVERY_BUFFER_BACKEND == "redis":
+        return RedisReceiptBuffer()
+    return MemoryReceiptBuffer()
+
+
+def record_receipt(sid: str, status: str) -> None:
+    """
+    Buffer a delivery receipt from a Twilio status callback.
+
+    Args:
+        sid: Twilio message or call SID.
+        status: Twilio status value (e.g. 'delivered').
+    """
+    get_receipt_buffer().append((sid, status.lower(), datetime.utcnow()))
+
+
+def coalesce_receipts(receipts: List[Receipt]) -> Dict[str, Tuple[str, datetime]]:
+    """
+    Reduce a batch of receipts to the most advanced status per SID.
+
+    Args:
+        receipts: Buffered (sid, status, received_at) tuples.
+
+    Returns:
+        Dictionary mapping SID to (status, received_at).
+    """
+    latest = {}
+    for sid, status, received_at in receipts:
+        current = latest.get(sid)
+        rank = STATUS_RANK.get(status, 0)
+        if current is None or (rank, received_at) >= (STATUS_RANK.get(current[0], 0), current[1]):
+            latest[sid] = (status, received_at)
+    return latest
+
+
+# Serializes flushes within the process (the periodic flusher and the shutdown flush)
+_flush_lock = threading.Lock()
+
+
+def flush_delivery_receipts(max_items: int = DELIVERY_FLUSH_BATCH) -> int:
+    """
+    Apply up to max_items buffered receipts to the reminders table in one UPDATE.
+
+    Receipts are put back in the buffer if the update fails. Flushes of one process run
+    one at a time, so a batch being re-buffered is never overtaken by the next drain.
+
+    Args:
+        max_items: Maximum number of receipts to drain from the buffer.
+
+    Returns:
+        Number of receipts drained.
+    """
+    with _flush_lock:
+        buffer = get_receipt_buffer()
+        receipts = buffer.drain(max_items)
+        if not receipts:
+            return 0
+        db = SessionLocal()
+        try:
+            crud.apply_delivery_receipts(db, coalesce_receipts(receipts))
+        except Exception as e:
+            db.rollback()
+            logger.error("Failed to apply %s delivery receipts, re-buffering: %s", len(receipts), e)
+            for receipt in receipts:
+                buffer.append(receipt)
+            raise
+        finally:
+            db.close()
+        return len(receipts)
+
+
+async def run_delivery_flusher(interval: float = DELIVERY_FLUSH_INTERVAL) -> None:
+    """
+    Periodically flush buffered delivery receipts until cancelled.
+
+    Full batches are flushed back-to-back so a burst of callbacks drains quickly.
+
+    Args:
+        interval: Seconds to wait between flushes when the buffer is not full.
+    """
+    while True:
+        try:
+            while await run_in_threadpool(flush_delivery_receipts) >= DELIVERY_FLUSH_BATCH:
+                pass
+        except Exception:
+            logger.exception("Delivery receipt flush failed; retrying in %s s", interval)
+        await asyncio.sleep(interval)
+
+
+async def stop_delivery_flusher(task: asyncio.Task, max_passes: int = DELIVERY_SHUTDOWN_FLUSHES) -> int:
+    """
+    Stop the receipt flusher and apply what is left in the buffer.
+
+    The cancelled flusher is awaited first so it cannot start another flush. Cancellation does
+    not interrupt a flush already running in a worker thread; the final flushes wait for it
+    on the flush lock, so the two never drain the buffer concurrently. Receipts left after
+    max_passes batches, or after a failure, stay buffered (in Redis they survive the restart).
+
+    Args:
+        task: Task running run_delivery_flusher.
+        max_passes: Maximum number of batches to flush.
+
+    Returns:
+        Number of receipts flushed.
+    """
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    flushed = 0
+    for _ in range(max_passes):
+        try:
+            count = await run_in_threadpool(flush_delivery_receipts)
+        except Exception:
+            logger.exception("Delivery receipt flush failed on shutdown; leaving receipts buffered")
+            return flushed
+        if not count:
+            return flushed
+        flushed += count
+    logger.warning("Stopped flushing delivery receipts on shutdown after %s batches", max_passes)
+    return flushed
@@ -0,0 +1,111 @@
+from functools import lru_cache
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+from typing import List
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Feedback embedding configuration (loaded from environment variables)
+EMBEDDING_DIM = int(os.getenv("FEEDBACK_EMBEDDING_DIM", "384"))  # Encoder output size; halfvec size in migration 0007
+EMBEDDING_BATCH_SIZE = int(os.getenv("FEEDBACK_EMBEDDING_BATCH_SIZE", "32"))
+
+# BERTopic's own multilingual default, also used for English so all feedback shares one vector space
+DEFAULT_ENCODER = "paraphrase-multilingual-MiniLM-L12-v2"
+
+
+class Embedding(TypeDecorator):
+    """
+    Unit-length vector stored as float16: a pgvector ``halfvec`` on PostgreSQL (HNSW-indexed,
+    see migration 0007), raw float16 bytes elsewhere. Loaded values are float32 arrays.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        super().__init__()
+        self.dim = dim
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from pgvector.sqlalchemy import HALFVEC
+            return dialect.type_descriptor(HALFVEC(self.dim))
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        vector = np.asarray(value, dtype=np.float16)
+        return vector if dialect.name == "postgresql" else vector.tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if dialect.name == "postgresql":
+            return value.to_numpy().astype(np.float32)
+        return np.frombuffer(value, dtype=np.float16).astype(np.float32)
+
+
+@lru_cache(maxsize=2)
+def load_encoder(model_name: str = DEFAULT_ENCODER):
+    """
+    Load and cache a sentence-transformers encoder.
+
+    The same instance embeds feedback for similarity search and is passed to BERTopic, so
+    the model is loaded once per process.
+
+    Args:
+        model_name: Sentence-transformers model name.
+
+    Returns:
+        SentenceTransformer instance.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    logger.info("Loading sentence encoder: %s", model_name)
+    return SentenceTransformer(model_name)
+
+
+def encode_texts(texts: List[str], model_name: str = DEFAULT_ENCODER) -> np.ndarray:
+    """
+    Embed texts with a sentence-transformers encoder.
+
+    Args:
+        texts: Texts to embed.
+        model_name: Sentence-transformers model name.
+
+    Returns:
+        Float32 array of shape (len(texts), EMBEDDING_DIM), one unit-length row per text.
+
+    Raises:
+        ValueError: If the encoder output size is not EMBEDDING_DIM.
+    """
+    embeddings = load_encoder(model_name).encode(texts, batch_size=EMBEDDING_BATCH_SIZE, convert_to_numpy=True,
+                                                 normalize_embeddings=True, show_progress_bar=False)
+    if embeddings.shape[1] != EMBEDDING_DIM:
+        raise ValueError(f"Encoder {model_name} returns {embeddings.shape[1]} dimensions, "
+                         f"not FEEDBACK_EMBEDDING_DIM={EMBEDDING_DIM}")
+    return embeddings.astype(np.float32)
+
+
+def hash_texts(texts: List[str]) -> np.ndarray:
+    """
+    Embed texts offline with hashed character n-grams.
+
+    Stateless, so vectors stay comparable across batches; used when no sentence encoder is
+    available (the benchmark and load-test 'tfidf' configuration).
+
+    Args:
+        texts: Texts to embed.
+
+    Returns:
+        Float32 array of shape (len(texts), EMBEDDING_DIM), one unit-length row per text.
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    vectorizer = HashingVectorizer(n_features=EMBEDDING_DIM, analyzer="char_wb", ngram_range=(3, 4),
+                                   alternate_sign=False, norm="l2")
+    return vectorizer.transform(texts).toarray().astype(np.float32)
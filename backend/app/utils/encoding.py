@@ -0,0 +1,146 @@
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Type
+from uuid import UUID
+import msgpack
+import orjson
+
+# Media types clients can request in the Accept header
+JSON_MEDIA_TYPE = "application/json"
+COMPACT_JSON_MEDIA_TYPE = "application/vnd.compact+json"  # {"fields": [...], "rows": [[...], ...]}
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+FORMAT_JSON, FORMAT_COMPACT, FORMAT_MSGPACK = "json", "compact", "msgpack"
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """
+    Pick the response encoding from an Accept header.
+
+    The first supported media type listed wins; anything else (including */*) gets JSON.
+
+    Args:
+        accept: Value of the Accept header.
+
+    Returns:
+        One of 'json', 'compact' or 'msgpack'.
+    """
+    for media_range in (accept or "").split(","):
+        media_type = media_range.split(";", 1)[0].strip().lower()
+        if media_type in MSGPACK_MEDIA_TYPES:
+            return FORMAT_MSGPACK
+        if media_type == COMPACT_JSON_MEDIA_TYPE:
+            return FORMAT_COMPACT
+        if media_type == JSON_MEDIA_TYPE:
+            return FORMAT_JSON
+    return FORMAT_JSON
+
+
+def select_fields(fields: Optional[str], allowed: Sequence[str]) -> List[str]:
+    """
+    Parse a comma-separated fields= parameter against the fields a response may carry.
+
+    Args:
+        fields: Requested fields, e.g. 'id,scheduled_time,sent'; empty means all allowed fields.
+        allowed: Field names of the response schema, in schema order.
+
+    Returns:
+        Requested field names in request order, without duplicates.
+
+    Raises:
+        ValueError: If a requested field is not allowed.
+    """
+    if not fields:
+        return list(allowed)
+    selected = []
+    for field in fields.split(","):
+        field = field.strip()
+        if not field or field in selected:
+            continue
+        if field not in allowed:
+            raise ValueError(f"Unknown field: {field}. Must be one of {', '.join(allowed)}")
+        selected.append(field)
+    return selected or list(allowed)
+
+
+def _msgpack_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def rows_response(fields: Sequence[str], rows: Iterable[Sequence], fmt: str) -> Response:
+    """
+    Encode projected rows without building pydantic models.
+
+    JSON keeps the usual list of objects; the compact and MessagePack encodings send the
+    field names once followed by one array per row.
+
+    Args:
+        fields: Column names, in row order.
+        rows: Row tuples as returned by a column-projected query.
+        fmt: Format returned by negotiate_format.
+
+    Returns:
+        Encoded response with the negotiated media type.
+    """
+    if fmt == FORMAT_JSON:
+        return Response(orjson.dumps([dict(zip(fields, row)) for row in rows]), media_type=JSON_MEDIA_TYPE,
+                        headers={"Vary": "Accept"})
+    payload = {"fields": list(fields), "rows": [list(row) for row in rows]}
+    if fmt == FORMAT_MSGPACK:
+        return Response(msgpack.packb(payload, default=_msgpack_default), media_type=MSGPACK_MEDIA_TYPES[0],
+                        headers={"Vary": "Accept"})
+    return Response(orjson.dumps(payload), media_type=COMPACT_JSON_MEDIA_TYPE, headers={"Vary": "Accept"})
+
+
+def schema_columns(entity, schema: Type[BaseModel]) -> list:
+    """
+    Return the columns of an ORM entity that a response schema is built from.
+
+    Args:
+        entity: Mapped class, e.g. models.Reminder.
+        schema: Response schema whose field names are column names of the entity.
+
+    Returns:
+        Column attributes in schema field order, for a column-projected query.
+    """
+    return [getattr(entity, field) for field in schema.model_fields]
+
+
+def models_response(adapter: TypeAdapter, rows: Iterable) -> Response:
+    """
+    Validate rows into response models in one call and encode them as JSON.
+
+    Rows may be ORM entities or the Row tuples of a column-projected query (the schema needs
+    from_attributes). Returning the encoded response skips FastAPI's second validation and
+    jsonable_encoder pass over the response_model.
+
+    Args:
+        adapter: TypeAdapter of a list of the response schema.
+        rows: Entities or rows to validate.
+
+    Returns:
+        JSON response, identical to what the response_model would produce.
+    """
+    return Response(adapter.dump_json(adapter.validate_python(rows)), media_type=JSON_MEDIA_TYPE,
+                    headers={"Vary": "Accept"})
+
+
+def model_response(model: BaseModel, fmt: str) -> Response:
+    """
+    Encode a response model as MessagePack, or as JSON with orjson.
+
+    Args:
+        model: Response model instance.
+        fmt: Format returned by negotiate_format; 'compact' is plain JSON for single objects.
+
+    Returns:
+        Encoded response with the negotiated media type.
+    """
+    if fmt == FORMAT_MSGPACK:
+        return Response(msgpack.packb(model.model_dump(mode="json")), media_type=MSGPACK_MEDIA_TYPES[0],
+                        headers={"Vary": "Accept"})
+    return Response(orjson.dumps(model.model_dump()), media_type=JSON_MEDIA_TYPE, headers={"Vary": "Accept"})
@@ -0,0 +1,189 @@
+from cryptography.fernet import Fernet, MultiFernet, InvalidToken
+from sqlalchemy import String
+from sqlalchemy.types import TypeDecorator
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import hmac
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Field encryption configuration (loaded from environment variables).
+# ENCRYPTION_KEY may list several comma-separated Fernet keys: the first encrypts, all decrypt (key rotation).
+ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", "")
+FIELD_ENCRYPTION_ENABLED = os.getenv("FIELD_ENCRYPTION_ENABLED", "true" if ENCRYPTION_KEY else "false").lower() == "true"
+# Separate HMAC key for blind indexes; derived from the first encryption key when unset
+BLIND_INDEX_KEY = os.getenv("BLIND_INDEX_KEY", "")
+# Decrypted values kept per database session, keyed by ciphertext (0 disables the cache)
+DECRYPT_CACHE_SIZE = int(os.getenv("DECRYPT_CACHE_SIZE", "4096"))
+ENV = os.getenv("ENV", "development")
+
+# Every Fernet token starts with version byte 0x80, i.e. 'gAAAAA' once base64-encoded
+FERNET_TOKEN_PREFIX = "gAAAAA"
+
+if not ENCRYPTION_KEY and ENV != "development":
+    raise RuntimeError("ENCRYPTION_KEY must be set outside development")
+if FIELD_ENCRYPTION_ENABLED and not ENCRYPTION_KEY:
+    # Ciphertext written with a throwaway key would be unreadable after a restart
+    raise RuntimeError("FIELD_ENCRYPTION_ENABLED is set without ENCRYPTION_KEY")
+
+_keys = [key.strip() for key in ENCRYPTION_KEY.split(",") if key.strip()]
+cipher = MultiFernet([Fernet(key.encode()) for key in _keys]) if _keys else None
+# Without a configured key blind indexes stay NULL: a per-process key would match nothing after a restart
+if BLIND_INDEX_KEY:
+    _blind_index_key: Optional[bytes] = BLIND_INDEX_KEY.encode()
+elif _keys:
+    _blind_index_key = hmac.new(_keys[0].encode(), b"blind-index", hashlib.sha256).hexdigest().encode()
+else:
+    _blind_index_key = None
+BLIND_INDEX_ENABLED = _blind_index_key is not None
+
+# Cache of the session currently loading rows (see use_decrypt_cache); None decrypts every value
+_decrypt_cache: ContextVar[Optional[Dict[str, str]]] = ContextVar("decrypt_cache", default=None)
+
+def is_ciphertext(value: str) -> bool:
+    """Return True if a stored value looks like a Fernet token rather than legacy plaintext."""
+    return value.startswith(FERNET_TOKEN_PREFIX)
+
+
+def encrypt_value(value: Optional[str]) -> Optional[str]:
+    """
+    Encrypt a field value for storage.
+
+    Args:
+        value: Plaintext value.
+
+    Returns:
+        Fernet token, or the value unchanged if it is None, already encrypted, or
+        field encryption is disabled.
+    """
+    if value is None or not FIELD_ENCRYPTION_ENABLED or is_ciphertext(value):
+        return value
+    return cipher.encrypt(value.encode()).decode()
+
+
+def decrypt_value(value: Optional[str]) -> Optional[str]:
+    """
+    Decrypt a stored field value.
+
+    Legacy plaintext rows (written before encryption was enabled) are returned as is.
+
+    Args:
+        value: Stored value.
+
+    Returns:
+        Plaintext value.
+
+    Raises:
+        ValueError: If the value is a Fernet token that no configured key can decrypt.
+    """
+    if value is None or not is_ciphertext(value):
+        return value
+    cache = _decrypt_cache.get()
+    if cache is None:
+        return _decrypt(value)
+    plaintext = cache.get(value)
+    if plaintext is None:
+        plaintext = _decrypt(value)
+        if len(cache) < DECRYPT_CACHE_SIZE:
+            cache[value] = plaintext
+    return plaintext
+
+
+def _decrypt(token: str) -> str:
+    if cipher is None:
+        raise ValueError("Cannot decrypt field value: ENCRYPTION_KEY is not set")
+    try:
+        return cipher.decrypt(token.encode()).decode()
+    except InvalidToken:
+        raise ValueError("Cannot decrypt field value with the configured ENCRYPTION_KEY")
+
+
+def use_decrypt_cache(cache: Optional[Dict[str, str]]) -> None:
+    """
+    Decrypt values loaded in the current context through a session's cache.
+
+    Plaintext therefore lives only as long as the session holding the cache, and rows
+    sharing a token (see encrypt_many) are decrypted once per session.
+
+    Args:
+        cache: Dictionary owned by the session, or None to stop caching.
+    """
+    _decrypt_cache.set(cache)
+
+
+def release_decrypt_cache(cache: Dict[str, str]) -> None:
+    """
+    Drop a session's decrypted values when the session closes.
+
+    Args:
+        cache: Dictionary previously passed to use_decrypt_cache.
+    """
+    cache.clear()
+    if _decrypt_cache.get() is cache:
+        _decrypt_cache.set(None)
+
+def encrypt_many(values: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """
+    Encrypt a batch of values, producing one ciphertext per distinct value.
+
+    Rows of the same batch holding the same value share a token, so loading them back
+    costs one decryption. Equality within the batch is already revealed by the blind
+    index, so sharing tokens leaks nothing further.
+
+    Args:
+        values: Plaintext values, possibly containing duplicates or None.
+
+    Returns:
+        Encrypted values in the same order.
+    """
+    tokens: Dict[str, Optional[str]] = {}
+    encrypted = []
+    for value in values:
+        if value is None:
+            encrypted.append(None)
+            continue
+        token = tokens.get(value)
+        if token is None:
+            token = tokens[value] = encrypt_value(value)
+        encrypted.append(token)
+    return encrypted
+
+
+def blind_index(value: Optional[str]) -> Optional[str]:
+    """
+    Compute the keyed blind index of a value for exact-match lookups on encrypted columns.
+
+    Args:
+        value: Plaintext value (already normalized, e.g. a validated phone number).
+
+    Returns:
+        Hex HMAC-SHA256 digest, or None for None or when no key is configured.
+    """
+    if value is None or _blind_index_key is None:
+        return None
+    return hmac.new(_blind_index_key, value.encode(), hashlib.sha256).hexdigest()
+
+
+class EncryptedString(TypeDecorator):
+    """
+    String column encrypted with Fernet on bind and decrypted on result.
+
+    Within an InstrumentedSession, values are decrypted through the session's cache keyed
+    by ciphertext (at most DECRYPT_CACHE_SIZE entries), so reloading the same rows, or rows
+    sharing a token, skips the AES and HMAC work until the session closes.
+
+    A Fernet token is 4/3 of the plaintext length (padded to 16 bytes) plus 76
+    characters, so the column length must be sized accordingly.
+    """
+
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return encrypt_value(value)
+
+    def process_result_value(self, value, dialect):
+        return decrypt_value(value)
@@ -0,0 +1,161 @@
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+import asyncio
+import logging
+import os
+import threading
+import time
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Idempotency cache configuration (loaded from environment variables)
+IDEMPOTENCY_BACKEND = os.getenv("IDEMPOTENCY_BACKEND", "memory")  # 'memory' or 'redis'
+IDEMPOTENCY_REDIS_URL = os.getenv("IDEMPOTENCY_REDIS_URL", os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"))
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "86400"))  # Seconds a stored result answers retries
+IDEMPOTENCY_LOCK_TTL = int(os.getenv("IDEMPOTENCY_LOCK_TTL", "120"))  # Claim expiry if its owner dies
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "30"))  # Max wait on an in-flight duplicate
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "100000"))  # In-memory backend only
+
+PENDING = "__pending__"  # Value of a key claimed by a request still computing its result
+
+
+class MemoryIdempotencyStore:
+    """Process-local bounded store; duplicates are only detected within one API worker."""
+
+    def __init__(self, max_size: int = IDEMPOTENCY_CACHE_SIZE):
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def claim(self, key: str, ttl: float) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return False
+            self._put(key, PENDING, ttl)
+            return True
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._put(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _put(self, key: str, value: str, ttl: float) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (value, time.monotonic() + ttl)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+class RedisIdempotencyStore:
+    """Store in Redis, shared by every API worker."""
+
+    def __init__(self, url: str = IDEMPOTENCY_REDIS_URL, prefix: str = "idempotency:"):
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._client.get(self._prefix + key)
+        return value.decode() if value is not None else None
+
+    def claim(self, key: str, ttl: float) -> bool:
+        # SET NX: exactly one concurrent request wins the claim
+        return bool(self._client.set(self._prefix + key, PENDING, nx=True, ex=int(ttl)))
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._client.set(self._prefix + key, value, ex=int(ttl))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._prefix + key)
+
+
+class IdempotencyCache:
+    """
+    Run a request's work at most once per key and replay its stored result to retries.
+
+    The first request for a key claims it and must then ``complete`` it with its result (or
+    ``release`` it on failure). Retries get the stored result; duplicates arriving while the
+    first is still running wait for its result instead of redoing the work.
+    """
+
+    def __init__(self, store, ttl: float = IDEMPOTENCY_TTL, lock_ttl: float = IDEMPOTENCY_LOCK_TTL,
+                 wait_timeout: float = IDEMPOTENCY_WAIT_TIMEOUT):
+        self.store = store
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+
+    async def get_or_claim(self, key: str) -> Optional[str]:
+        """
+        Return the stored result of a key, waiting while another request computes it.
+
+        Args:
+            key: Idempotency key.
+
+        Returns:
+            The stored result, or None if the caller now owns the key.
+
+        Raises:
+            TimeoutError: If the owner has not finished within wait_timeout.
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        delay = 0.02
+        while True:
+            value = self.store.get(key)
+            if value is not None and value != PENDING:
+                return value
+            if value is None and self.store.claim(key, self.lock_ttl):
+                return None
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Request {key} is still being processed")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+    def complete(self, key: str, value: str) -> None:
+        """
+        Store the result of a claimed key for later retries.
+
+        Args:
+            key: Idempotency key.
+            value: Serialized result.
+        """
+        self.store.set(key, value, self.ttl)
+
+    def release(self, key: str) -> None:
+        """
+        Give up a claimed key after a failure, so the next retry does the work again.
+
+        Args:
+            key: Idempotency key.
+        """
+        self.store.delete(key)
+
+
+@lru_cache(maxsize=1)
+def get_submission_cache() -> IdempotencyCache:
+    """
+    Return the idempotency cache of feedback submissions.
+
+    Returns:
+        IdempotencyCache over a memory or Redis store depending on IDEMPOTENCY_BACKEND.
+    """
+    if IDEMPOTENCY_BACKEND == "redis":
+        return IdempotencyCache(RedisIdempotencyStore())
+    return IdempotencyCache(MemoryIdempotencyStore())
@@ -0,0 +1,150 @@
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+import atexit
+import copy
+import logging
+import os
+import queue
+import sys
+import orjson
+
+# Logging configuration (loaded from environment variables)
+LOG_FILE = os.getenv("LOG_FILE", "app.log")  # Empty logs to stderr
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json (one object per line) or text
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "100"))  # Keep 1 in N sampled records per call site
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Pass as extra= on per-item INFO/DEBUG logs in batch loops; warnings and errors are never dropped
+SAMPLED = {"sampled": True}
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "sampled"}
+
+_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects, including fields passed through extra=."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep one in ``every`` records marked with extra=SAMPLED, counted per call site.
+
+    Kept records carry ``sample_rate`` so totals can be scaled back up. Records above
+    INFO and unmarked records always pass.
+    """
+
+    def __init__(self, every: int = LOG_SAMPLE_EVERY):
+        super().__init__()
+        self.every = max(every, 1)
+        self._counts: Dict[Tuple[str, str], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or record.levelno > logging.INFO:
+            return True
+        key = (record.name, record.msg)
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1  # Unlocked: a race only skews the sample slightly
+        if count % self.every:
+            return False
+        record.sample_rate = self.every
+        return True
+
+
+class _ResolvingQueueHandler(QueueHandler):
+    """QueueHandler that only interpolates the message on the calling thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Arguments may be ORM objects bound to the caller's session, so interpolate here;
+        # JSON encoding and file I/O happen on the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _build_output_handler() -> logging.Handler:
+    handler = logging.FileHandler(LOG_FILE) if LOG_FILE else logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def _start_listener(output: logging.Handler) -> None:
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _handler.queue = log_queue
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_before_fork() -> None:
+    # Drain and park the writer so the child does not inherit a file buffer mid-write
+    if _listener is not None:
+        _listener.stop()
+
+
+def _restart_in_parent() -> None:
+    if _listener is not None:
+        _listener.start()
+
+
+def _restart_in_child() -> None:
+    # Threads do not survive fork; give the child its own queue and writer thread
+    if _listener is not None:
+        _start_listener(_listener.handlers[0])
+
+
+def configure_logging() -> None:
+    """
+    Route all application logging through a queue to a background writer thread.
+
+    Request threads only build the record and enqueue it; formatting (JSON by default)
+    and file writes happen on the listener thread. The queue is unbounded, so records
+    are never dropped, and it is drained at interpreter exit. Calling this again is a
+    no-op.
+    """
+    global _handler
+    if _handler is not None:
+        return
+    _handler = _ResolvingQueueHandler(queue.SimpleQueue())
+    _handler.addFilter(SamplingFilter())
+    _start_listener(_build_output_handler())
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_handler)
+    atexit.register(stop_logging)
+    os.register_at_fork(before=_stop_before_fork, after_in_parent=_restart_in_parent, after_in_child=_restart_in_child)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
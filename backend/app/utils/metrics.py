@@ -0,0 +1,318 @@
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+import threading
+import time
+
+# Number of most recent samples kept per recorder for percentile estimates
+DEFAULT_RESERVOIR_SIZE = 2048
+# Histogram bucket upper bounds (seconds) exported to Prometheus
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Request methods labelled as-is; anything else is "other" so arbitrary methods cannot create series
+HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+class LatencyRecorder:
+    """
+    Thread-safe recorder of operation latencies and outcomes.
+
+    Keeps running totals, histogram bucket counts, and a bounded window of recent
+    samples from which percentiles are computed on demand, so recording stays cheap
+    and all formatting work happens only when metrics are read.
+    """
+
+    def __init__(self, name: str, description: str = "", reservoir_size: int = DEFAULT_RESERVOIR_SIZE,
+                 labels: Optional[Dict[str, str]] = None, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = dict(labels or {})
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=reservoir_size)
+        self._bucket_counts = [0] * len(self.buckets)
+        self._count = 0
+        self._errors = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        """
+        Record one operation.
+
+        Args:
+            seconds: Duration of the operation.
+            error: Whether the operation failed.
+        """
+        bucket = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._samples.append(seconds)
+            if bucket < len(self._bucket_counts):
+                self._bucket_counts[bucket] += 1
+            self._count += 1
+            self._total += seconds
+            if error:
+                self._errors += 1
+            if seconds > self._max:
+                self._max = seconds
+
+    @contextmanager
+    def time(self):
+        """Time the enclosed block, counting it as an error if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe(time.perf_counter() - start, error=True)
+            raise
+        self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Return current totals and latency percentiles (in seconds).
+
+        Returns:
+            Dictionary with count, errors, total, mean, p50, p95, p99 and max.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+            count, errors, total, maximum = self._count, self._errors, self._total, self._max
+
+        def percentile(q: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+        return {
+            "count": count,
+            "errors": errors,
+            "total": total,
+            "mean": total / count if count else 0.0,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": maximum,
+        }
+
+    def histogram(self) -> Tuple[List[int], int, float, int]:
+        """
+        Return cumulative bucket counts, count, sum and errors.
+
+        Returns:
+            Tuple of (cumulative counts per bucket, count, total seconds, errors).
+        """
+        with self._lock:
+            counts, count, total, errors = list(self._bucket_counts), self._count, self._total, self._errors
+        cumulative, running = [], 0
+        for bucket_count in counts:
+            running += bucket_count
+            cumulative.append(running)
+        return cumulative, count, total, errors
+
+
+class Counter:
+    """Thread-safe monotonically increasing counter."""
+
+    def __init__(self, name: str, description: str = "", labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.description = description
+        self.labels = dict(labels or {})
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+_registry: Dict[Tuple[str, tuple], LatencyRecorder] = {}
+_counters: Dict[Tuple[str, tuple], Counter] = {}
+_registry_lock = threading.Lock()
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> tuple:
+    return tuple(sorted((labels or {}).items()))
+
+
+def get_recorder(name: str, description: str = "", reservoir_size: Optional[int] = None,
+                 labels: Optional[Dict[str, str]] = None) -> LatencyRecorder:
+    """
+    Return the process-wide recorder with the given name and labels, creating it if needed.
+
+    Args:
+        name: Metric name (e.g. 'twilio_request').
+        description: Human-readable description used when the recorder is created.
+        reservoir_size: Optional number of recent samples kept for percentiles.
+        labels: Optional label values distinguishing series of one metric (e.g. {'stage': 'tokenization'}).
+
+    Returns:
+        LatencyRecorder instance.
+    """
+    key = (name, _label_key(labels))
+    with _registry_lock:
+        recorder = _registry.get(key)
+        if recorder is None:
+            recorder = LatencyRecorder(name, description, reservoir_size or DEFAULT_RESERVOIR_SIZE, labels)
+            _registry[key] = recorder
+        return recorder
+
+
+def get_counter(name: str, description: str = "", labels: Optional[Dict[str, str]] = None) -> Counter:
+    """
+    Return the process-wide counter with the given name and labels, creating it if needed.
+
+    Args:
+        name: Metric name without the _total suffix (e.g. 'reminder_messages').
+        description: Human-readable description used when the counter is created.
+        labels: Optional label values.
+
+    Returns:
+        Counter instance.
+    """
+    key = (name, _label_key(labels))
+    with _registry_lock:
+        counter = _counters.get(key)
+        if counter is None:
+            counter = _counters[key] = Counter(name, description, labels)
+        return counter
+
+
+def snapshot_all() -> Dict[str, Dict[str, float]]:
+    """
+    Return snapshots of every registered recorder.
+
+    Returns:
+        Dictionary mapping recorder name (with labels, if any) to its snapshot.
+    """
+    with _registry_lock:
+        recorders = list(_registry.values())
+    return {recorder.name + _format_labels(recorder.labels): recorder.snapshot() for recorder in recorders}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def render_prometheus() -> str:
+    """
+    Render every recorder and counter in the Prometheus text exposition format.
+
+    Each recorder becomes a <name>_seconds histogram plus a <name>_errors_total counter;
+    each counter becomes <name>_total.
+
+    Returns:
+        Exposition text.
+    """
+    with _registry_lock:
+        recorders = sorted(_registry.values(), key=lambda r: r.name)
+        counters = sorted(_counters.values(), key=lambda c: c.name)
+
+    lines: List[str] = []
+    families: Dict[str, List[LatencyRecorder]] = {}
+    for recorder in recorders:
+        families.setdefault(recorder.name, []).append(recorder)
+    for name, members in families.items():
+        lines.append(f"# HELP {name}_seconds {_escape(members[0].description or name)}")
+        lines.append(f"# TYPE {name}_seconds histogram")
+        errors = []
+        for recorder in members:
+            cumulative, count, total, error_count = recorder.histogram()
+            for bound, bucket_count in zip(recorder.buckets, cumulative):
+                lines.append(f"{name}_seconds_bucket{_format_labels(recorder.labels, ('le', _format_bound(bound)))} {bucket_count}")
+            lines.append(f"{name}_seconds_bucket{_format_labels(recorder.labels, ('le', '+Inf'))} {count}")
+            lines.append(f"{name}_seconds_sum{_format_labels(recorder.labels)} {total}")
+            lines.append(f"{name}_seconds_count{_format_labels(recorder.labels)} {count}")
+            errors.append((recorder.labels, error_count))
+        lines.append(f"# HELP {name}_errors_total Failed operations counted by {name}_seconds")
+        lines.append(f"# TYPE {name}_errors_total counter")
+        lines.extend(f"{name}_errors_total{_format_labels(labels)} {count}" for labels, count in errors)
+
+    previous = None
+    for counter in counters:
+        if counter.name != previous:
+            lines.append(f"# HELP {counter.name}_total {_escape(counter.description or counter.name)}")
+            lines.append(f"# TYPE {counter.name}_total counter")
+            previous = counter.name
+        lines.append(f"{counter.name}_total{_format_labels(counter.labels)} {counter.value}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve render_prometheus() over HTTP from a daemon thread (for processes without an API, e.g. Celery workers).
+
+    Args:
+        port: TCP port to listen on.
+        host: Interface to bind.
+
+    Returns:
+        The running server.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name=f"metrics-{port}", daemon=True).start()
+    return server
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request per route template, method and status.
+
+    Requests that matched no route are grouped under 'unmatched', and non-standard
+    methods under 'other', so probing cannot create unbounded series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            method = scope["method"]
+            labels = {"route": getattr(route, "path", "unmatched"), "method": method if method in HTTP_METHODS else "other",
+                      "status": str(status)}
+            get_recorder("http_request", "HTTP request latency by route", labels=labels) \
+                .observe(time.perf_counter() - start, error=status >= 500)
@@ -3,23 +3,21 @@ import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from bertopic import BERTopic
 from sklearn.feature_extraction.text import CountVectorizer
-from langdetect import detect, LangdetectException
+from langdetect import detect, LangDetectException
 import re
 import logging
 from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
 from app.models import Feedback
 from app.schemas import FeedbackAnalysis
+from app.utils.embeddings import DEFAULT_ENCODER, encode_texts, hash_texts, load_encoder
+from app.utils.logging_config import SAMPLED
+from app.utils.metrics import get_recorder
 from uuid import UUID
 from functools import lru_cache
 import os
 
-# Configure logging
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-handler = logging.FileHandler("app.log")
-handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
-logger.addHandler(handler)
 
 # Valid languages
 VALID_LANGUAGES = {"english", "french", "bassa", "ewondo"}
@@ -30,12 +28,27 @@ DATASET_PATHS = {
     "eng_bassa": "datasets/eng_bassa.csv"
 }
 
+# Parallel corpora holding English translations of local-language feedback
+TRANSLATION_DATASETS = {"douala": "eng_douala", "bassa": "eng_bassa"}
+
 # Device configuration
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
+# Models (loaded from environment variables); the benchmarks' tiny config points these at offline models
+SENTIMENT_MODEL = os.getenv("NLP_SENTIMENT_MODEL", "nlptown/bert-base-multilingual-uncased-sentiment")
+# Sentence-transformers model for BERTopic and feedback embeddings; empty is DEFAULT_ENCODER, 'tfidf' needs no download
+TOPIC_EMBEDDING_MODEL = os.getenv("NLP_TOPIC_EMBEDDING_MODEL", "")
+# BERTopic's UMAP/HDBSCAN cannot cluster fewer texts than this; smaller batches get 'No theme'
+THEME_MIN_DOCUMENTS = int(os.getenv("NLP_THEME_MIN_DOCUMENTS", "16"))
+
+
+def stage_recorder(stage: str):
+    """Return the latency recorder of one NLP pipeline stage (exported as nlp_stage_seconds{stage=...})."""
+    return get_recorder("nlp_stage", "Latency of each NLP pipeline stage", labels={"stage": stage})
+
 
 @lru_cache(maxsize=1)
-def load_nlp_models(model_name: str = "nlptown/bert-base-multilingual-uncased-sentiment"):
+def load_nlp_models(model_name: str = SENTIMENT_MODEL):
     """
     Load and cache NLP models (tokenizer and sentiment model).
 
@@ -45,13 +58,51 @@ def load_nlp_models(model_name: str = "nlptown/bert-base-multilingual-uncased-se
     Returns:
         Tuple of (tokenizer, model).
     """
-    logger.info(f"Loading NLP models: {model_name}")
+    logger.info("Loading NLP models: %s", model_name)
     tokenizer = AutoTokenizer.from_pretrained(model_name)
     model = AutoModelForSequenceClassification.from_pretrained(model_name).to(device)
     model.eval()
     return tokenizer, model
 
 
+def load_topic_embedding_model(model_name: str = TOPIC_EMBEDDING_MODEL):
+    """
+    Return the embedding backend passed to BERTopic.
+
+    Args:
+        model_name: Sentence-transformers model name, 'tfidf' for a fresh TF-IDF + SVD
+            pipeline fitted on the texts being analyzed, or empty for DEFAULT_ENCODER.
+
+    Returns:
+        Embedding model accepted by BERTopic (the cached encoder shared with embed_texts).
+    """
+    if model_name == "tfidf":
+        from sklearn.decomposition import TruncatedSVD
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.pipeline import make_pipeline
+        return make_pipeline(TfidfVectorizer(), TruncatedSVD(n_components=32))
+    return load_encoder(model_name or DEFAULT_ENCODER)
+
+
+def embed_texts(texts: List[str], model_name: str = TOPIC_EMBEDDING_MODEL, user_id: Optional[UUID] = None):
+    """
+    Embed texts with the topic model's encoder, for feedback similarity search.
+
+    Args:
+        texts: Texts to embed.
+        model_name: Topic embedding model; 'tfidf' falls back to hashed character n-grams,
+            since a TF-IDF fitted per batch gives vectors that cannot be compared across batches.
+        user_id: ID of the user performing the action (for logging).
+
+    Returns:
+        Float32 array with one unit-length row per text, also accepted by extract_themes.
+    """
+    with stage_recorder("embedding").time():
+        embeddings = hash_texts(texts) if model_name == "tfidf" else encode_texts(texts, model_name or DEFAULT_ENCODER)
+    logger.info("Embedded %s texts by user %s", len(texts), user_id or 'unknown', extra=SAMPLED)
+    return embeddings
+
+
 def load_multilingual_dataset(dataset_name: str, user_id: Optional[UUID] = None) -> pd.DataFrame:
     """
     Load and preprocess the multilingual dataset with local languages and translations.
@@ -68,19 +119,19 @@ def load_multilingual_dataset(dataset_name: str, user_id: Optional[UUID] = None)
         FileNotFoundError: If dataset file is not found.
     """
     if dataset_name not in DATASET_PATHS:
-        logger.error(f"Invalid dataset name: {dataset_name} by user {user_id or 'unknown'}")
+        logger.error("Invalid dataset name: %s by user %s", dataset_name, user_id or 'unknown')
         raise ValueError(f"Invalid dataset name: {dataset_name}. Must be one of {list(DATASET_PATHS.keys())}")
 
     file_path = DATASET_PATHS[dataset_name]
     try:
         if not os.path.exists(file_path):
-            logger.error(f"Dataset file not found: {file_path} by user {user_id or 'unknown'}")
+            logger.error("Dataset file not found: %s by user %s", file_path, user_id or 'unknown')
             raise FileNotFoundError(f"Dataset file not found: {file_path}")
 
         df = pd.read_csv(file_path)
         required_columns = ['text', 'translation', 'department']
         if not all(col in df.columns for col in required_columns):
-            logger.error(f"Missing required columns in {file_path}: {required_columns} by user {user_id or 'unknown'}")
+            logger.error("Missing required columns in %s: %s by user %s", file_path, required_columns, user_id or 'unknown')
             raise ValueError(f"Dataset must contain 'text', 'translation', and 'department' columns.")
 
         # Clean text: remove extra spaces, special characters, handle missing values
@@ -89,13 +140,62 @@ def load_multilingual_dataset(dataset_name: str, user_id: Optional[UUID] = None)
         df['department'] = df['department'].fillna('General')
 
         logger.info(
-            f"Loaded and preprocessed dataset {dataset_name} with {len(df)} rows by user {user_id or 'unknown'}")
+            "Loaded and preprocessed dataset %s with %s rows by user %s", dataset_name, len(df), user_id or 'unknown')
         return df
     except Exception as e:
-        logger.error(f"Error loading dataset {dataset_name}: {str(e)} by user {user_id or 'unknown'}")
+        logger.error("Error loading dataset %s: %s by user %s", dataset_name, e, user_id or 'unknown')
         raise Exception(f"Error loading dataset: {str(e)}")
 
 
+def _normalize(text: str) -> str:
+    return re.sub(r'\s+', ' ', str(text).strip()).lower()
+
+
+@lru_cache(maxsize=len(TRANSLATION_DATASETS))
+def load_translation_table(language: str) -> Dict[str, str]:
+    """
+    Load and cache the local-language to English lookup table of a language.
+
+    Args:
+        language: Feedback language with a parallel corpus ('douala' or 'bassa').
+
+    Returns:
+        Dictionary from normalized local text to its English translation; empty if the
+        dataset is missing or unreadable.
+    """
+    try:
+        df = load_multilingual_dataset(TRANSLATION_DATASETS[language])
+    except Exception as e:
+        logger.warning("No translation table for %s: %s", language, e)
+        return {}
+    return {_normalize(text): translation for text, translation in zip(df['text'], df['translation']) if translation}
+
+
+def translate_to_english(text: str, language: str, user_id: Optional[UUID] = None) -> str:
+    """
+    Return the English text analyzed for a feedback.
+
+    Douala and Bassa feedback found in the parallel corpora is replaced by its translation.
+    Other text is returned as is: the sentiment model and the topic encoder are multilingual.
+
+    Args:
+        text: Feedback text.
+        language: Feedback language.
+        user_id: ID of the user performing the action (for logging).
+
+    Returns:
+        English translation, or the original text.
+    """
+    if language not in TRANSLATION_DATASETS:
+        return text
+    translation = load_translation_table(language).get(_normalize(text))
+    if translation is None:
+        logger.info("No %s translation for %s-character text by user %s; analyzing it as is", language, len(text),
+                    user_id or 'unknown', extra=SAMPLED)
+        return text
+    return translation
+
+
 def detect_language(text: str, user_id: Optional[UUID] = None) -> str:
     """
     Detect the language of a given text.
@@ -109,10 +209,11 @@ def detect_language(text: str, user_id: Optional[UUID] = None) -> str:
     """
     try:
         if not text.strip():
-            logger.warning(f"Empty text provided for language detection by user {user_id or 'unknown'}")
+            logger.warning("Empty text provided for language detection by user %s", user_id or 'unknown')
             return 'unknown'
 
-        lang = detect(text)
+        with stage_recorder("language_detection").time():
+            lang = detect(text)
         if lang == 'fr':
             lang = 'french'
         elif lang == 'en':
@@ -126,13 +227,14 @@ def detect_language(text: str, user_id: Optional[UUID] = None) -> str:
 
         if lang not in VALID_LANGUAGES:
             logger.warning(
-                f"Detected language {lang} not in valid languages {VALID_LANGUAGES} by user {user_id or 'unknown'}")
+                "Detected language %s not in valid languages %s by user %s", lang, VALID_LANGUAGES, user_id or 'unknown')
             return 'unknown'
 
-        logger.info(f"Detected language: {lang} for text: {text[:50]}... by user {user_id or 'unknown'}")
+        logger.info("Detected language: %s for %s-character text by user %s", lang, len(text), user_id or 'unknown',
+                    extra=SAMPLED)
         return lang
-    except LangdetectException as e:
-        logger.error(f"Language detection failed for text: {text[:50]}... by user {user_id or 'unknown'}: {str(e)}")
+    except LangDetectException as e:
+        logger.error("Language detection failed for %s-character text by user %s: %s", len(text), user_id or 'unknown', e)
         return 'unknown'
 
 
@@ -154,7 +256,7 @@ List[str]:
         ValueError: If lang is not in VALID_LANGUAGES.
     """
     if lang not in VALID_LANGUAGES:
-        logger.error(f"Invalid language for sentiment analysis: {lang} by user {user_id or 'unknown'}")
+        logger.error("Invalid language for sentiment analysis: %s by user %s", lang, user_id or 'unknown')
         raise ValueError(f"Invalid language: {lang}. Must be one of {VALID_LANGUAGES}")
 
     tokenizer, model = load_nlp_models()
@@ -163,22 +265,24 @@ List[str]:
     try:
         for i in range(0, len(texts), batch_size):
             batch_texts = texts[i:i + batch_size]
-            inputs = tokenizer(batch_texts, padding=True, truncation=True, max_length=512, return_tensors="pt")
-            inputs = {key: val.to(device) for key, val in inputs.items()}
-            with torch.no_grad():
+            with stage_recorder("tokenization").time():
+                inputs = tokenizer(batch_texts, padding=True, truncation=True, max_length=512, return_tensors="pt")
+                inputs = {key: val.to(device) for key, val in inputs.items()}
+            with stage_recorder("forward_pass").time(), torch.no_grad():
                 outputs = model(**inputs)
             scores = outputs.logits.argmax(dim=-1).cpu().numpy()
             sentiments.extend(
                 ['Positive' if score >= 3 else 'Negative' if score <= 1 else 'Neutral' for score in scores])
 
-        logger.info(f"Analyzed sentiment for {len(texts)} texts in {lang} by user {user_id or 'unknown'}")
+        logger.info("Analyzed sentiment for %s texts in %s by user %s", len(texts), lang, user_id or 'unknown', extra=SAMPLED)
         return sentiments
     except Exception as e:
-        logger.error(f"Sentiment analysis failed for {len(texts)} texts by user {user_id or 'unknown'}: {str(e)}")
+        logger.error("Sentiment analysis failed for %s texts by user %s: %s", len(texts), user_id or 'unknown', e)
         raise Exception(f"Sentiment analysis failed: {str(e)}")
 
 
-def extract_themes(texts: List[str], lang: str = 'english', user_id: Optional[UUID] = None) -> List[str]:
+def extract_themes(texts: List[str], lang: str = 'english', user_id: Optional[UUID] = None,
+                   embeddings=None) -> List[str]:
     """
     Extract themes from texts using BERTopic.
 
@@ -186,29 +290,35 @@ def extract_themes(texts: List[str], lang: str = 'english', user_id: Optional[UU
         texts: List of texts to analyze.
         lang: Language for stop words ('english' or 'french').
         user_id: ID of the user performing the action (for logging).
+        embeddings: Optional embeddings of the texts (embed_texts), so BERTopic does not encode them again.
 
     Returns:
-        List of extracted themes.
+        List of extracted themes ('No theme' for every text of a batch under THEME_MIN_DOCUMENTS).
 
     Raises:
         ValueError: If lang is not in VALID_LANGUAGES.
     """
     if lang not in VALID_LANGUAGES:
-        logger.error(f"Invalid language for theme extraction: {lang} by user {user_id or 'unknown'}")
+        logger.error("Invalid language for theme extraction: %s by user %s", lang, user_id or 'unknown')
         raise ValueError(f"Invalid language: {lang}. Must be one of {VALID_LANGUAGES}")
+    if len(texts) < THEME_MIN_DOCUMENTS:
+        # A single submitted feedback cannot form a topic; reanalysis batches assign its theme
+        return ['No theme'] * len(texts)
 
     try:
         vectorizer = CountVectorizer(stop_words='english' if lang == 'english' else 'french')
-        topic_model = BERTopic(vectorizer_model=vectorizer, language='english' if lang == 'english' else 'french')
-        topics, _ = topic_model.fit_transform(texts)
+        topic_model = BERTopic(vectorizer_model=vectorizer, language='english' if lang == 'english' else 'french',
+                               embedding_model=load_topic_embedding_model())
+        with stage_recorder("topic_model").time():
+            topics, _ = topic_model.fit_transform(texts, embeddings)
         themes = topic_model.get_document_info(texts)['Topic'].map(
             lambda x: topic_model.get_topic(x)[0][0] if x >= 0 else 'No theme'
         ).tolist()
 
-        logger.info(f"Extracted themes for {len(texts)} texts in {lang} by user {user_id or 'unknown'}")
+        logger.info("Extracted themes for %s texts in %s by user %s", len(texts), lang, user_id or 'unknown', extra=SAMPLED)
         return themes
     except Exception as e:
-        logger.error(f"Theme extraction failed for {len(texts)} texts by user {user_id or 'unknown'}: {str(e)}")
+        logger.error("Theme extraction failed for %s texts by user %s: %s", len(texts), user_id or 'unknown', e)
         raise Exception(f"Theme extraction failed: {str(e)}")
 
 
@@ -227,11 +337,12 @@ def detect_urgency(texts: List[str], user_id: Optional[UUID] = None) -> List[boo
                        'attente longue', 'problèmes de planification', 'confusion de facturation', 'laboratoire lent',
                        'urgence']
     try:
-        results = [any(keyword in text.lower() for keyword in urgent_keywords) for text in texts]
-        logger.info(f"Detected urgency for {len(texts)} texts by user {user_id or 'unknown'}")
+        with stage_recorder("urgency").time():
+            results = [any(keyword in text.lower() for keyword in urgent_keywords) for text in texts]
+        logger.info("Detected urgency for %s texts by user %s", len(texts), user_id or 'unknown', extra=SAMPLED)
         return results
     except Exception as e:
-        logger.error(f"Urgency detection failed for {len(texts)} texts by user {user_id or 'unknown'}: {str(e)}")
+        logger.error("Urgency detection failed for %s texts by user %s: %s", len(texts), user_id or 'unknown', e)
         raise Exception(f"Urgency detection failed: {str(e)}")
 
 
@@ -264,7 +375,7 @@ def process_multilingual_texts(dataset_name: str, db: Session, user_id: Optional
             translation_lang = detect_language(translation, user_id) if translation else 'english'
             if translation_lang not in ['english', 'french']:
                 logger.warning(
-                    f"Fallback to english for translation language: {translation_lang} by user {user_id or 'unknown'}")
+                    "Fallback to english for translation language: %s by user %s", translation_lang, user_id or 'unknown')
                 translation_lang = 'english'
 
             # Analyze using translation
@@ -301,11 +412,11 @@ def process_multilingual_texts(dataset_name: str, db: Session, user_id: Optional
             })
 
         db.commit()
-        logger.info(f"Processed {len(results)} feedback entries from {dataset_name} by user {user_id or 'unknown'}")
+        logger.info("Processed %s feedback entries from %s by user %s", len(results), dataset_name, user_id or 'unknown')
         return results
     except Exception as e:
         db.rollback()
-        logger.error(f"Failed to process dataset {dataset_name} by user {user_id or 'unknown'}: {str(e)}")
+        logger.error("Failed to process dataset %s by user %s: %s", dataset_name, user_id or 'unknown', e)
         raise Exception(f"Failed to process dataset: {str(e)}")
 
 
@@ -328,7 +439,7 @@ def analyze_single_feedback(feedback: Feedback, db: Session, user_id: Optional[U
         translation = feedback.text
         translation_lang = detect_language(translation, user_id) if translation else 'english'
         if translation_lang not in ['english', 'french']:
-            logger.warning(f"Fallback to english for feedback {feedback.feedback_id} by user {user_id or 'unknown'}")
+            logger.warning("Fallback to english for feedback %s by user %s", feedback.feedback_id, user_id or 'unknown')
             translation_lang = 'english'
 
         sentiment = analyze_sentiment([translation], lang=translation_lang, user_id=user_id)[0]
@@ -341,7 +452,7 @@ def analyze_single_feedback(feedback: Feedback, db: Session, user_id: Optional[U
         db.commit()
 
         logger.info(
-            f"Analyzed feedback {feedback.feedback_id}: sentiment={sentiment}, theme={theme}, urgent={urgent} by user {user_id or 'unknown'}")
+            "Analyzed feedback %s: sentiment=%s, theme=%s, urgent=%s by user %s", feedback.feedback_id, sentiment, theme, urgent, user_id or 'unknown')
         return FeedbackAnalysis(
             feedback_id=feedback.feedback_id,
             sentiment=sentiment,
@@ -350,5 +461,5 @@ def analyze_single_feedback(feedback: Feedback, db: Session, user_id: Optional[U
         )
     except Exception as e:
         db.rollback()
-        logger.error(f"Failed to analyze feedback {feedback.feedback_id} by user {user_id or 'unknown'}: {str(e)}")
+        logger.error("Failed to analyze feedback %s by user %s: %s", feedback.feedback_id, user_id or 'unknown', e)
         raise Exception(f"Failed to analyze feedback: {str(e)}")
\ No newline at end of file
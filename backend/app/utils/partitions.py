@@ -0,0 +1,102 @@
+from datetime import date
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from typing import List, Tuple
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Monthly feedback partitions are created this many months ahead of the current month
+FEEDBACK_PARTITION_MONTHS_AHEAD = int(os.getenv("FEEDBACK_PARTITION_MONTHS_AHEAD", "3"))
+
+
+def month_start(day: date, offset: int = 0) -> date:
+    """
+    Return the first day of the month offset months away from day's month.
+
+    Args:
+        day: Any date in the reference month.
+        offset: Number of months to move (may be negative).
+
+    Returns:
+        First day of the target month.
+    """
+    months = day.year * 12 + day.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def monthly_partitions(table: str, start: date, end: date) -> List[Tuple[str, date, date]]:
+    """
+    List the monthly partitions covering [start, end].
+
+    Args:
+        table: Parent table name.
+        start: First date to cover.
+        end: Last date to cover.
+
+    Returns:
+        List of (partition name, lower bound, upper bound) tuples, e.g. ('feedback_y2025m08', ...).
+    """
+    partitions = []
+    lower = month_start(start)
+    while lower <= end:
+        upper = month_start(lower, 1)
+        partitions.append((f"{table}_y{lower.year}m{lower.month:02d}", lower, upper))
+        lower = upper
+    return partitions
+
+
+def _create_partition(conn, name: str, lower: date, upper: date) -> None:
+    bounds = f"FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    in_range = f"submitted_at >= '{lower.isoformat()}' AND submitted_at < '{upper.isoformat()}'"
+    if conn.execute(text(f"SELECT 1 FROM feedback_default WHERE {in_range} LIMIT 1")).first() is None:
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF feedback FOR VALUES {bounds}"))
+        return
+    # Rows of that month already landed in feedback_default (e.g. beat was down longer than the
+    # lookahead): PARTITION OF would fail, so move them into a standalone table, then attach it
+    conn.execute(text(f"CREATE TABLE {name} (LIKE feedback INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(text(f"INSERT INTO {name} SELECT * FROM feedback_default WHERE {in_range}"))
+    conn.execute(text(f"DELETE FROM feedback_default WHERE {in_range}"))  # Also releases their feedback_keys
+    conn.execute(text(f"ALTER TABLE feedback ATTACH PARTITION {name} FOR VALUES {bounds}"))
+    conn.execute(text(f"INSERT INTO feedback_keys (feedback_id) SELECT feedback_id FROM {name} ON CONFLICT DO NOTHING"))
+    logger.warning("Moved feedback of %s out of feedback_default into %s", lower.isoformat(), name)
+
+
+def ensure_feedback_partitions(engine: Engine, months_ahead: int = FEEDBACK_PARTITION_MONTHS_AHEAD) -> int:
+    """
+    Create any missing monthly feedback partitions up to months_ahead months from now.
+
+    Does nothing unless the database is PostgreSQL and feedback is a partitioned table
+    (see migration 0003). Rows of a missing month found in feedback_default are moved into
+    its new partition. Each partition is created in its own transaction; a failure is logged
+    and the next months are still provisioned.
+
+    Args:
+        engine: SQLAlchemy engine.
+        months_ahead: Number of future months to provision.
+
+    Returns:
+        Number of partitions created.
+    """
+    if engine.dialect.name != "postgresql":
+        return 0
+    today = date.today()
+    created = 0
+    with engine.connect() as conn:
+        partitioned = conn.execute(text(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('feedback')"
+        )).first()
+    if not partitioned:
+        return 0
+    for name, lower, upper in monthly_partitions("feedback", today, month_start(today, months_ahead)):
+        try:
+            with engine.begin() as conn:
+                if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+                    _create_partition(conn, name, lower, upper)
+                    created += 1
+        except Exception:
+            logger.exception("Could not create feedback partition %s", name)
+    if created:
+        logger.info("Created %s feedback partitions up to %s months ahead", created, months_ahead)
+    return created
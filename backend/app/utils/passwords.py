@@ -0,0 +1,117 @@
+from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.metrics import get_recorder
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Password hashing configuration (loaded from environment variables)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))  # Queued + running verifications
+
+# Hashes whose cost differs from BCRYPT_ROUNDS are reported as needing an update on verify
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small thread pool verifies passwords in parallel off the event loop
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_pending = 0
+_rejected = 0
+
+wait_recorder = get_recorder("password_verify_wait", "Time login password checks spend queued for a worker")
+verify_recorder = get_recorder("password_verify", "Login password check latency, including queueing")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password checks are already queued."""
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password with the configured bcrypt cost.
+
+    Args:
+        password: Plain-text password.
+
+    Returns:
+        bcrypt hash.
+    """
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password synchronously (for scripts and worker code, not the event loop).
+
+    Args:
+        plain_password: Password supplied by the user.
+        hashed_password: Stored bcrypt hash.
+
+    Returns:
+        True if the password matches.
+    """
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the hashing pool without blocking the event loop.
+
+    Args:
+        plain_password: Password supplied by the user.
+        hashed_password: Stored bcrypt hash.
+
+    Returns:
+        Tuple of (password matches, replacement hash or None). A replacement hash is
+        returned when the stored hash uses a different bcrypt cost than BCRYPT_ROUNDS.
+
+    Raises:
+        PasswordHasherBusy: If PASSWORD_HASH_MAX_PENDING checks are already in flight.
+    """
+    global _pending, _rejected
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        _rejected += 1
+        logger.warning("Rejected password check: %s already pending", _pending)
+        raise PasswordHasherBusy()
+
+    submitted = time.perf_counter()
+
+    def run():
+        wait_recorder.observe(time.perf_counter() - submitted)
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, run)
+    finally:
+        _pending -= 1
+        verify_recorder.observe(time.perf_counter() - submitted)
+
+
+def get_password_pool_stats() -> Dict[str, object]:
+    """
+    Return sizing statistics for the password hashing pool.
+
+    Returns:
+        Dictionary with pool size, current and maximum pending checks, rejections,
+        and queue-wait and total latency snapshots.
+    """
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "pending": _pending,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "rejected": _rejected,
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "wait": wait_recorder.snapshot(),
+        "verify": verify_recorder.snapshot(),
+    }
@@ -0,0 +1,101 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+from uuid import UUID
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Principal cache configuration (loaded from environment variables)
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))  # Seconds a validated token is trusted
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+
+class PrincipalCache:
+    """
+    Bounded TTL cache of validated access tokens and the principals they resolve to.
+
+    An entry never outlives its token's expiry. Entries are evicted per patient when the
+    patient's role changes or the patient is deleted; other processes see such changes
+    after at most ``ttl`` seconds, when their entry expires and the token's version claim
+    is checked against the database again.
+    """
+
+    def __init__(self, ttl: float = PRINCIPAL_CACHE_TTL, max_size: int = PRINCIPAL_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_patient: Dict[UUID, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        """
+        Return the cached principal for a token, or None if absent or expired.
+
+        Args:
+            token: Raw JWT access token.
+
+        Returns:
+            Cached principal or None.
+        """
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+            return principal
+
+    def put(self, token: str, principal, token_expires_at: Optional[float] = None) -> None:
+        """
+        Cache a validated principal.
+
+        Args:
+            token: Raw JWT access token.
+            principal: Principal with a patient_id attribute.
+            token_expires_at: Token expiry as a UNIX timestamp (the 'exp' claim).
+        """
+        expires_at = time.monotonic() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, time.monotonic() + token_expires_at - time.time())
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = (principal, expires_at)
+            self._tokens_by_patient.setdefault(principal.patient_id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_patient(self, patient_id: UUID) -> None:
+        """
+        Drop every cached token of a patient (after a role change, revocation or deletion).
+
+        Args:
+            patient_id: ID of the patient.
+        """
+        with self._lock:
+            for token in self._tokens_by_patient.pop(patient_id, set()):
+                self._entries.pop(token, None)
+        logger.info("Invalidated cached principals for patient %s", patient_id)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_patient.clear()
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            tokens = self._tokens_by_patient.get(entry[0].patient_id)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._tokens_by_patient[entry[0].patient_id]
+
+
+principal_cache = PrincipalCache()
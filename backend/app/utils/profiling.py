@@ -0,0 +1,275 @@
+from collections import Counter
+from fastapi import HTTPException
+from starlette.responses import JSONResponse, Response
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Sampling profiler configuration (loaded from environment variables)
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))  # Seconds between stack samples
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))  # Longest worker profile accepted
+PROFILE_DIR = os.getenv("PROFILE_DIR", "")  # Where signal-triggered profiles are written; empty disables
+PROFILE_SIGNAL_SECONDS = float(os.getenv("PROFILE_SIGNAL_SECONDS", "10"))
+
+FORMAT_COLLAPSED, FORMAT_SPEEDSCOPE = "collapsed", "speedscope"
+PROFILE_FORMATS = {
+    FORMAT_COLLAPSED: "text/plain; charset=utf-8",  # flamegraph.pl / speedscope / inferno input
+    FORMAT_SPEEDSCOPE: "application/json",
+}
+
+# Innermost frames of threads parked on a lock, queue or selector; their samples are dropped
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("profiling.py", "profile_for"),
+}
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler sampling the Python stacks of every thread from a background thread.
+
+    Nothing is hooked into the interpreter: the target code runs at full speed and the
+    profiler thread wakes every ``interval`` seconds to read ``sys._current_frames()``.
+    Stacks are aggregated as they are taken, so memory is bounded by the number of
+    distinct stacks rather than the duration.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def __enter__(self) -> "SamplingProfiler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _walk(frame)
+                if (os.path.basename(stack[-1][1]), stack[-1][0]) in IDLE_FRAMES:
+                    continue
+                self.stacks[(names.get(thread_id, str(thread_id)),) + tuple(stack)] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """
+        Render the profile in the collapsed-stack format ('thread;outer;...;inner count').
+
+        Returns:
+            One line per distinct stack, heaviest first.
+        """
+        lines = []
+        for (thread, *frames), count in self.stacks.most_common():
+            lines.append(";".join([thread] + [_label(frame) for frame in frames]) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str = "profile") -> Dict[str, object]:
+        """
+        Render the profile as a speedscope document, one sampled profile per thread.
+
+        Args:
+            name: Profile name shown by speedscope.
+
+        Returns:
+            Speedscope JSON document (https://www.speedscope.app/file-format-schema.json).
+        """
+        frames: List[Dict[str, object]] = []
+        frame_index: Dict[Frame, int] = {}
+        profiles: Dict[str, Dict[str, object]] = {}
+        for (thread, *stack), count in self.stacks.most_common():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indexes.append(frame_index[frame])
+            profile = profiles.setdefault(thread, {
+                "type": "sampled", "name": thread, "unit": "seconds", "startValue": 0,
+                "endValue": 0.0, "samples": [], "weights": [],
+            })
+            profile["samples"].append(indexes)
+            profile["weights"].append(count * self.interval)
+            profile["endValue"] += count * self.interval
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "patient-feedback-profiler",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+        }
+
+    def render(self, fmt: str, name: str = "profile") -> bytes:
+        """
+        Render the profile in one of PROFILE_FORMATS.
+
+        Args:
+            fmt: 'collapsed' or 'speedscope'.
+            name: Profile name (speedscope only).
+
+        Returns:
+            Encoded profile.
+        """
+        if fmt == FORMAT_SPEEDSCOPE:
+            return orjson.dumps(self.speedscope(name))
+        return self.collapsed().encode()
+
+
+def _walk(frame) -> List[Frame]:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _label(frame: Frame) -> str:
+    # ';' separates frames and ' ' precedes the count in the collapsed format
+    return f"{frame[0]} ({os.path.basename(frame[1])}:{frame[2]})".replace(";", ":")
+
+
+def profile_for(seconds: float, interval: float = PROFILE_INTERVAL) -> SamplingProfiler:
+    """
+    Sample every thread of this process for a fixed duration (blocks the calling thread).
+
+    Args:
+        seconds: Sampling duration, capped at PROFILE_MAX_SECONDS.
+        interval: Seconds between samples.
+
+    Returns:
+        The stopped profiler.
+    """
+    with SamplingProfiler(interval) as profiler:
+        time.sleep(min(seconds, PROFILE_MAX_SECONDS))
+    return profiler
+
+
+def _profile_to_file(seconds: float) -> None:
+    profiler = profile_for(seconds)
+    path = os.path.join(PROFILE_DIR, f"profile-{os.getpid()}-{int(time.time())}.collapsed")
+    with open(path, "w") as f:
+        f.write(profiler.collapsed())
+    logger.info("Wrote %s samples of process %s to %s", profiler.samples, os.getpid(), path)
+
+
+def install_signal_trigger(signum: int = signal.SIGUSR2, seconds: float = PROFILE_SIGNAL_SECONDS) -> bool:
+    """
+    Profile this process for ``seconds`` whenever it receives ``signum`` (for workers without an HTTP API).
+
+    The collapsed profile is written to PROFILE_DIR. Does nothing unless PROFILE_DIR is set.
+
+    Args:
+        signum: Signal that triggers a profile.
+        seconds: Sampling duration per trigger.
+
+    Returns:
+        Whether the handler was installed.
+    """
+    if not PROFILE_DIR:
+        return False
+
+    def handler(received, frame):
+        threading.Thread(target=_profile_to_file, args=(seconds,), name="profile-trigger", daemon=True).start()
+
+    signal.signal(signum, handler)
+    return True
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling single requests that carry an ``X-Profile`` header.
+
+    The header names the output format ('collapsed' or 'speedscope'). The request runs
+    normally under a SamplingProfiler and the profile replaces the response body; the
+    original status is returned in ``X-Profile-Status``. Every thread is sampled, so
+    requests served concurrently on the same worker appear in the profile too.
+    ``authorize`` receives the bearer token and must raise HTTPException for anyone
+    not allowed to profile. Requests without the header only pay a header lookup.
+    """
+
+    def __init__(self, app, authorize: Callable[[str], Awaitable[object]], interval: float = PROFILE_INTERVAL):
+        self.app = app
+        self.authorize = authorize
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        fmt = None
+        authorization = ""
+        for key, value in scope["headers"]:
+            if key == b"x-profile":
+                fmt = value.decode("latin-1").strip().lower()
+            elif key == b"authorization":
+                authorization = value.decode("latin-1")
+        if fmt is None:
+            await self.app(scope, receive, send)
+            return
+
+        if fmt not in PROFILE_FORMATS:
+            response = JSONResponse({"detail": f"X-Profile must be one of {', '.join(PROFILE_FORMATS)}"}, status_code=400)
+            await response(scope, receive, send)
+            return
+        scheme, _, token = authorization.partition(" ")
+        try:
+            await self.authorize(token if scheme.lower() == "bearer" else "")
+        except HTTPException as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+            await response(scope, receive, send)
+            return
+
+        status = 500
+
+        async def discard(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        with SamplingProfiler(self.interval) as profiler:
+            await self.app(scope, receive, discard)
+        name = f"{scope['method']} {scope['path']}"
+        response = Response(profiler.render(fmt, name), media_type=PROFILE_FORMATS[fmt], headers={
+            "X-Profile-Status": str(status),
+            "X-Profile-Samples": str(profiler.samples),
+            "Cache-Control": "no-store",
+        })
+        await response(scope, receive, send)
@@ -0,0 +1,132 @@
+from typing import Dict, Iterable, List, Tuple
+from uuid import UUID
+import io
+import json
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ["patient_id", "patient_name", "phone_number", "appointment_reason", "language", "method",
+                    "scheduled_time"]
+OPTIONAL_COLUMNS = ["medication_list", "consultation_list"]
+
+# Column limits from models.Reminder
+MAX_LENGTHS = {"patient_name": 100, "appointment_reason": 255}
+
+CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"}
+
+
+def _parse_uuid(value: str):
+    try:
+        return UUID(value)
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+def parse_reminder_batch(payload: bytes, content_type: str) -> Tuple[pd.DataFrame, List[Dict]]:
+    """
+    Parse a CSV or NDJSON reminder export into a DataFrame of strings.
+
+    Args:
+        payload: Raw request body.
+        content_type: Media type of the body ('text/csv' or 'application/x-ndjson').
+
+    Returns:
+        Tuple of (DataFrame with one row per reminder, list of per-row parse errors).
+        The DataFrame index is the 1-based row number in the upload.
+
+    Raises:
+        ValueError: If the content type is unsupported or required columns are missing.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    errors = []
+    if media_type in CSV_CONTENT_TYPES:
+        df = pd.read_csv(io.BytesIO(payload), dtype=str, keep_default_na=False, skipinitialspace=True)
+    elif media_type in NDJSON_CONTENT_TYPES:
+        records, index = [], []
+        for row, line in enumerate(payload.decode("utf-8").splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as e:
+                errors.append({"row": row, "field": None, "error": f"Invalid JSON: {e}"})
+                continue
+            records.append({k: "" if v is None else str(v) for k, v in record.items()})
+            index.append(row)
+        df = pd.DataFrame.from_records(records, index=index)
+    else:
+        raise ValueError(f"Unsupported content type: {content_type}. Use text/csv or application/x-ndjson")
+
+    if df.empty:
+        return pd.DataFrame(columns=REQUIRED_COLUMNS + OPTIONAL_COLUMNS), errors
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+    for col in OPTIONAL_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
+    if media_type in CSV_CONTENT_TYPES:
+        df.index = pd.RangeIndex(1, len(df) + 1)
+    df = df[REQUIRED_COLUMNS + OPTIONAL_COLUMNS].fillna("").apply(lambda col: col.str.strip())
+    return df, errors
+
+
+def validate_reminder_batch(df: pd.DataFrame, valid_methods: Iterable[str],
+                            valid_languages: Iterable[str]) -> Tuple[pd.DataFrame, List[Dict]]:
+    """
+    Validate and normalize a whole batch of reminders with column-wise operations.
+
+    Applies the same rules as crud.create_reminder: phone numbers are normalized to
+    '+' followed by digits (11-15 characters), and method and language must be valid.
+
+    Args:
+        df: DataFrame returned by parse_reminder_batch.
+        valid_methods: Accepted reminder methods.
+        valid_languages: Accepted reminder languages.
+
+    Returns:
+        Tuple of (DataFrame of valid rows with typed columns, list of per-row errors).
+    """
+    checks = []
+
+    phone = df["phone_number"].str.replace(r"[^\d+]", "", regex=True)
+    bad_phone = (df["phone_number"] != "") & ~(phone.str.len().between(11, 15) & phone.str.startswith("+"))
+    checks.append((bad_phone, "phone_number", "Invalid phone number format"))
+
+    checks.append((~df["method"].isin(set(valid_methods)), "method",
+                   f"Invalid reminder method. Must be one of {set(valid_methods)}"))
+    checks.append((~df["language"].isin(set(valid_languages)), "language",
+                   f"Invalid language. Must be one of {set(valid_languages)}"))
+
+    patient_ids = df["patient_id"].map(_parse_uuid)
+    checks.append((patient_ids.isna(), "patient_id", "Invalid patient ID"))
+
+    scheduled = pd.to_datetime(df["scheduled_time"], errors="coerce", utc=True, format="ISO8601")
+    checks.append((scheduled.isna(), "scheduled_time", "Invalid scheduled time (expected ISO 8601)"))
+
+    for field in ("patient_name", "appointment_reason"):
+        checks.append((df[field] == "", field, f"{field} is required"))
+        checks.append((df[field].str.len() > MAX_LENGTHS[field], field,
+                       f"{field} exceeds {MAX_LENGTHS[field]} characters"))
+
+    invalid = pd.Series(False, index=df.index)
+    errors = []
+    for mask, field, message in checks:
+        for row in df.index[mask]:
+            errors.append({"row": int(row), "field": field, "error": message})
+        invalid |= mask
+
+    valid = df.loc[~invalid].copy()
+    valid["phone_number"] = phone[~invalid].where(phone[~invalid] != "", None)
+    valid["patient_id"] = patient_ids[~invalid]
+    valid["scheduled_time"] = scheduled[~invalid].dt.tz_convert(None)
+    for col in OPTIONAL_COLUMNS:
+        valid[col] = valid[col].where(valid[col] != "", None)
+    errors.sort(key=lambda e: e["row"])
+    return valid, errors
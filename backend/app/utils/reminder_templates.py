@@ -0,0 +1,229 @@
+from string import Formatter
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Directory holding one <language>.json template file per supported language
+TEMPLATE_DIR = os.getenv("REMINDER_TEMPLATE_DIR", os.path.join(os.path.dirname(__file__), "templates"))
+# Languages new reminders may use; douala and bassa only fall back to French wording until
+# translated templates exist, and are kept for reminders stored before
+REMINDER_LANGUAGES = ("english", "french")
+TEMPLATE_LANGUAGES = ("english", "french", "douala", "bassa")
+DEFAULT_LANGUAGE = "english"
+
+# Placeholders each template part may reference
+TEMPLATE_FIELDS = {
+    "header": {"patient_name", "appointment_reason"},
+    "medications": {"medication_list"},
+    "consultations": {"consultation_list"},
+    "combined_header": {"patient_name"},
+    "combined_item": {"appointment_reason"},
+}
+LINE_SEPARATOR = "\n"
+
+
+class ReminderTemplate:
+    """
+    Compiled reminder template for one language.
+
+    Each part is validated once at load time and kept as a bound ``str.format_map`` so
+    rendering is a dictionary lookup and a few string joins.
+    """
+
+    __slots__ = ("language", "voice_language", "_header", "_medications", "_consultations", "_combined_header",
+                 "_combined_item")
+
+    def __init__(self, language: str, voice_language: str, parts: Dict[str, str]):
+        self.language = language
+        self.voice_language = voice_language
+        self._header = parts["header"].format_map
+        self._medications = parts["medications"].format_map
+        self._consultations = parts["consultations"].format_map
+        self._combined_header = parts["combined_header"].format_map
+        self._combined_item = parts["combined_item"].format_map
+
+    def render(self, patient_name: str, appointment_reason: str, medication_list: Optional[str] = None,
+               consultation_list: Optional[str] = None) -> str:
+        """
+        Render a reminder message.
+
+        Args:
+            patient_name: Name of the patient.
+            appointment_reason: Reason for the appointment.
+            medication_list: Optional medications to list.
+            consultation_list: Optional consultations to list.
+
+        Returns:
+            Message text in the template's language.
+        """
+        lines = [self._header({"patient_name": patient_name, "appointment_reason": appointment_reason})]
+        if medication_list:
+            lines.append(self._medications({"medication_list": medication_list}))
+        if consultation_list:
+            lines.append(self._consultations({"consultation_list": consultation_list}))
+        return LINE_SEPARATOR.join(lines)
+
+    def render_combined(self, patient_name: str, items: Sequence) -> str:
+        """
+        Render one message covering several reminders for the same patient.
+
+        Args:
+            patient_name: Name of the patient.
+            items: Objects exposing appointment_reason, medication_list and consultation_list.
+
+        Returns:
+            Message text listing every item in the template's language.
+        """
+        lines = [self._combined_header({"patient_name": patient_name})]
+        for item in items:
+            lines.append(self._combined_item({"appointment_reason": item.appointment_reason}))
+            if item.medication_list:
+                lines.append(self._medications({"medication_list": item.medication_list}))
+            if item.consultation_list:
+                lines.append(self._consultations({"consultation_list": item.consultation_list}))
+        return LINE_SEPARATOR.join(lines)
+
+
+def _read_template_file(language: str) -> Dict[str, str]:
+    path = os.path.join(TEMPLATE_DIR, f"{language}.json")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _resolve_template(language: str, seen: Sequence[str] = ()) -> Dict[str, str]:
+    """Merge a language's template file over the file it falls back to."""
+    if language in seen:
+        raise ValueError(f"Circular template fallback: {' -> '.join([*seen, language])}")
+    raw = _read_template_file(language)
+    fallback = raw.pop("fallback", None)
+    if fallback:
+        merged = _resolve_template(fallback, [*seen, language])
+        merged.update(raw)
+        return merged
+    return raw
+
+
+def _compile_template(language: str, raw: Dict[str, str]) -> ReminderTemplate:
+    missing = [part for part in ("voice_language", *TEMPLATE_FIELDS) if part not in raw]
+    if missing:
+        raise ValueError(f"Template for {language} is missing {missing}")
+    for part, allowed in TEMPLATE_FIELDS.items():
+        fields = {name for _, name, _, _ in Formatter().parse(raw[part]) if name is not None}
+        unknown = fields - allowed
+        if unknown:
+            raise ValueError(f"Template {language}.{part} uses unknown fields {sorted(unknown)}; allowed: {sorted(allowed)}")
+    return ReminderTemplate(language, raw["voice_language"], raw)
+
+
+@lru_cache(maxsize=1)
+def load_templates() -> Dict[str, ReminderTemplate]:
+    """
+    Load and compile the reminder templates for every supported language.
+
+    Returns:
+        Dictionary mapping language to its compiled template.
+
+    Raises:
+        ValueError: If a template file is malformed or references unknown fields.
+    """
+    templates = {language: _compile_template(language, _resolve_template(language))
+                 for language in TEMPLATE_LANGUAGES}
+    logger.info("Loaded reminder templates for %s languages from %s", len(templates), TEMPLATE_DIR)
+    return templates
+
+
+def get_template(language: str) -> ReminderTemplate:
+    """
+    Return the compiled template for a language, falling back to English.
+
+    Args:
+        language: Reminder language.
+
+    Returns:
+        Compiled template.
+    """
+    templates = load_templates()
+    template = templates.get(language)
+    if template is None:
+        logger.warning("No reminder template for language %s, using %s", language, DEFAULT_LANGUAGE)
+        template = templates[DEFAULT_LANGUAGE]
+    return template
+
+
+def render_reminder(language: str, patient_name: str, appointment_reason: str,
+                    medication_list: Optional[str] = None, consultation_list: Optional[str] = None) -> str:
+    """
+    Render a reminder message in the given language.
+
+    Only the compiled templates are cached (per language, see load_templates): messages
+    are per patient and are not kept.
+
+    Args:
+        language: Reminder language.
+        patient_name: Name of the patient.
+        appointment_reason: Reason for the appointment.
+        medication_list: Optional medications to list.
+        consultation_list: Optional consultations to list.
+
+    Returns:
+        Message text.
+    """
+    return get_template(language).render(patient_name, appointment_reason, medication_list, consultation_list)
+
+
+def render_reminders(reminders: Sequence) -> List[str]:
+    """
+    Render messages for a batch of reminders, each in its own language.
+
+    Args:
+        reminders: Objects exposing language, patient_name, appointment_reason,
+            medication_list and consultation_list (e.g. models.Reminder rows).
+
+    Returns:
+        List of messages in the same order as the reminders.
+    """
+    return [
+        render_reminder(r.language, r.patient_name, r.appointment_reason, r.medication_list, r.consultation_list)
+        for r in reminders
+    ]
+
+
+def render_reminder_groups(groups: Sequence[Sequence]) -> List[str]:
+    """
+    Render one message per group of coalesced reminders.
+
+    Single-reminder groups render exactly like render_reminders; larger groups list
+    every reminder under one header in the language of the group's first reminder.
+
+    Args:
+        groups: Groups of reminders for the same patient, as built by coalesce_reminders.
+
+    Returns:
+        List of messages in the same order as the groups.
+    """
+    messages = []
+    for group in groups:
+        first = group[0]
+        if len(group) == 1:
+            messages.append(render_reminder(first.language, first.patient_name, first.appointment_reason,
+                                            first.medication_list, first.consultation_list))
+        else:
+            messages.append(get_template(first.language).render_combined(first.patient_name, group))
+    return messages
+
+
+def voice_language(language: str) -> str:
+    """
+    Return the Twilio <Say> language code for a reminder language.
+
+    Args:
+        language: Reminder language.
+
+    Returns:
+        Twilio voice language code (e.g. 'fr-FR').
+    """
+    return get_template(language).voice_language
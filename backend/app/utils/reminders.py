@@ -1,28 +1,77 @@
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioRestException
 from twilio.twiml.voice_response import VoiceResponse
+from twilio.request_validator import RequestValidator
+from app.utils.reminder_templates import TEMPLATE_LANGUAGES, voice_language
+from app.utils.twilio_transport import create_http_client
+from app.utils.logging_config import SAMPLED
+from collections import OrderedDict
+from datetime import timedelta
+import hashlib
+import threading
 import os
 import logging
-from typing import Optional
+from typing import List, Optional, Sequence
 from uuid import UUID
 
-# Configure logging
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-handler = logging.FileHandler("app.log")
-handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
-logger.addHandler(handler)
 
 # Valid languages
-VALID_LANGUAGES = {"english", "french"}
+VALID_LANGUAGES = set(TEMPLATE_LANGUAGES)
 
 # Twilio configuration (loaded from environment variables)
 TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID", "your-account-sid")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN", "your-auth-token")
 TWILIO_WHATSAPP_NUMBER = os.getenv("TWILIO_WHATSAPP_NUMBER", "whatsapp:+14155238886")
 TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER", "+14155238886")
+TWILIO_STATUS_CALLBACK_URL = os.getenv("TWILIO_STATUS_CALLBACK_URL")  # Public URL of /reminders/status-callback
 
-client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+# Twilio message and call statuses ordered by progress; a receipt never overrides a later stage
+STATUS_RANK = {
+    "accepted": 0, "scheduled": 0, "queued": 1, "initiated": 1, "sending": 2, "ringing": 2,
+    "sent": 3, "in-progress": 3, "answered": 3,
+    "delivered": 4, "undelivered": 4, "failed": 4, "canceled": 4,
+    "completed": 4, "busy": 4, "no-answer": 4,
+    "read": 5,
+}
+
+# SID returned for voice calls simulated in development mode
+SIMULATED_CALL_SID = "CA_SIMULATED"
+
+# Shared client over a pooled keep-alive transport (see app.utils.twilio_transport)
+client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, http_client=create_http_client())
+
+# Generated TwiML documents keyed by content hash
+TWIML_CACHE_SIZE = int(os.getenv("TWIML_CACHE_SIZE", "1024"))
+_twiml_cache: "OrderedDict[str, str]" = OrderedDict()
+_twiml_cache_lock = threading.Lock()
+
+
+def coalesce_reminders(reminders: Sequence, window: timedelta) -> List[list]:
+    """
+    Group due reminders that can be delivered as one message.
+
+    Reminders are grouped by patient, phone number, method and language; a group holds
+    the reminders scheduled within ``window`` of its earliest reminder.
+
+    Args:
+        reminders: Reminders exposing patient_id, phone_number, method, language and scheduled_time.
+        window: Maximum spread of scheduled times within one group.
+
+    Returns:
+        List of groups, each a list of reminders ordered by scheduled time.
+    """
+    groups = []
+    open_groups = {}
+    for reminder in sorted(reminders, key=lambda r: r.scheduled_time):
+        key = (reminder.patient_id, reminder.phone_number, reminder.method, reminder.language)
+        group = open_groups.get(key)
+        if group is None or reminder.scheduled_time - group[0].scheduled_time > window:
+            group = []
+            open_groups[key] = group
+            groups.append(group)
+        group.append(reminder)
+    return groups
 
 
 def validate_phone_number(phone_number: str) -> Optional[str]:
@@ -44,13 +93,65 @@ def validate_phone_number(phone_number: str) -> Optional[str]:
 
     # Basic validation: starts with + followed by 10-14 digits
     if len(cleaned) < 11 or len(cleaned) > 15 or not cleaned.startswith('+'):
-        logger.error(f"Invalid phone number format: {phone_number}")
+        logger.error("Invalid phone number format: %s", phone_number)
         return None
 
     return cleaned
 
 
-def send_whatsapp(phone_number: str, message: str, language: str, user_id: Optional[UUID] = None) -> bool:
+request_validator = RequestValidator(TWILIO_AUTH_TOKEN)
+
+
+def validate_status_callback(url: str, params: dict, signature: str) -> bool:
+    """
+    Check the X-Twilio-Signature of a status callback request.
+
+    Args:
+        url: Full public URL Twilio posted to.
+        params: Form parameters of the callback.
+        signature: Value of the X-Twilio-Signature header.
+
+    Returns:
+        True if the signature is valid.
+    """
+    return request_validator.validate(url, params, signature)
+
+
+def _status_callback_params() -> dict:
+    return {"status_callback": TWILIO_STATUS_CALLBACK_URL} if TWILIO_STATUS_CALLBACK_URL else {}
+
+
+def build_twiml(message: str, language: str) -> str:
+    """
+    Build the TwiML document that voices a message, reusing cached documents.
+
+    Args:
+        message: Message content to be voiced.
+        language: Language of the message.
+
+    Returns:
+        TwiML document as a string.
+    """
+    twilio_language = voice_language(language)
+    key = hashlib.sha256(f"{twilio_language}\0{message}".encode()).hexdigest()
+    with _twiml_cache_lock:
+        twiml = _twiml_cache.get(key)
+        if twiml is not None:
+            _twiml_cache.move_to_end(key)
+            return twiml
+
+    response = VoiceResponse()
+    response.say(message, language=twilio_language)
+    twiml = str(response)
+
+    with _twiml_cache_lock:
+        _twiml_cache[key] = twiml
+        if len(_twiml_cache) > TWIML_CACHE_SIZE:
+            _twiml_cache.popitem(last=False)
+    return twiml
+
+
+def send_whatsapp(phone_number: str, message: str, language: str, user_id: Optional[UUID] = None) -> Optional[str]:
     """
     Send a WhatsApp message to the specified phone number.
 
@@ -61,35 +162,37 @@ def send_whatsapp(phone_number: str, message: str, language: str, user_id: Optio
         user_id: ID of the user performing the action (for logging).
 
     Returns:
-        True if message was sent successfully, False otherwise.
+        Twilio message SID if the message was sent successfully, None otherwise.
 
     Raises:
         ValueError: If language is invalid.
     """
     if language not in VALID_LANGUAGES:
-        logger.error(f"Invalid language: {language} for WhatsApp message by user {user_id or 'unknown'}")
+        logger.error("Invalid language: %s for WhatsApp message by user %s", language, user_id or 'unknown')
         raise ValueError(f"Invalid language: {language}. Must be one of {VALID_LANGUAGES}")
 
     try:
         validated_number = validate_phone_number(phone_number)
         if not validated_number:
-            logger.error(f"Invalid phone number: {phone_number} for WhatsApp message by user {user_id or 'unknown'}")
-            return False
+            logger.error("Invalid phone number: %s for WhatsApp message by user %s", phone_number, user_id or 'unknown')
+            return None
 
         to_number = f"whatsapp:{validated_number}"
-        client.messages.create(
+        sent = client.messages.create(
             from_=TWILIO_WHATSAPP_NUMBER,
             body=message,
-            to=to_number
+            to=to_number,
+            **_status_callback_params()
         )
-        logger.info(f"Sent WhatsApp to {validated_number} in {language} by user {user_id or 'unknown'}: {message}")
-        return True
+        logger.info("Sent WhatsApp to %s in %s (%s characters, SID %s) by user %s", validated_number, language,
+                    len(message), sent.sid, user_id or 'unknown', extra=SAMPLED)
+        return sent.sid
     except TwilioRestException as e:
-        logger.error(f"Failed to send WhatsApp to {phone_number} by user {user_id or 'unknown'}: {e}")
-        return False
+        logger.error("Failed to send WhatsApp to %s by user %s: %s", phone_number, user_id or 'unknown', e)
+        return None
 
 
-def send_sms(phone_number: str, message: str, language: str, user_id: Optional[UUID] = None) -> bool:
+def send_sms(phone_number: str, message: str, language: str, user_id: Optional[UUID] = None) -> Optional[str]:
     """
     Send an SMS to the specified phone number.
 
@@ -100,34 +203,36 @@ def send_sms(phone_number: str, message: str, language: str, user_id: Optional[U
         user_id: ID of the user performing the action (for logging).
 
     Returns:
-        True if message was sent successfully, False otherwise.
+        Twilio message SID if the message was sent successfully, None otherwise.
 
     Raises:
         ValueError: If language is invalid.
     """
     if language not in VALID_LANGUAGES:
-        logger.error(f"Invalid language: {language} for SMS by user {user_id or 'unknown'}")
+        logger.error("Invalid language: %s for SMS by user %s", language, user_id or 'unknown')
         raise ValueError(f"Invalid language: {language}. Must be one of {VALID_LANGUAGES}")
 
     try:
         validated_number = validate_phone_number(phone_number)
         if not validated_number:
-            logger.error(f"Invalid phone number: {phone_number} for SMS by user {user_id or 'unknown'}")
-            return False
+            logger.error("Invalid phone number: %s for SMS by user %s", phone_number, user_id or 'unknown')
+            return None
 
-        client.messages.create(
+        sent = client.messages.create(
             from_=TWILIO_PHONE_NUMBER,
             body=message,
-            to=validated_number
+            to=validated_number,
+            **_status_callback_params()
         )
-        logger.info(f"Sent SMS to {validated_number} in {language} by user {user_id or 'unknown'}: {message}")
-        return True
+        logger.info("Sent SMS to %s in %s (%s characters, SID %s) by user %s", validated_number, language,
+                    len(message), sent.sid, user_id or 'unknown', extra=SAMPLED)
+        return sent.sid
     except TwilioRestException as e:
-        logger.error(f"Failed to send SMS to {phone_number} by user {user_id or 'unknown'}: {e}")
-        return False
+        logger.error("Failed to send SMS to %s by user %s: %s", phone_number, user_id or 'unknown', e)
+        return None
 
 
-def send_call(phone_number: str, message: str, language: str, user_id: Optional[UUID] = None) -> bool:
+def send_call(phone_number: str, message: str, language: str, user_id: Optional[UUID] = None) -> Optional[str]:
     """
     Send a voice call to the specified phone number using Twilio Voice API.
 
@@ -138,46 +243,41 @@ def send_call(phone_number: str, message: str, language: str, user_id: Optional[
         user_id: ID of the user performing the action (for logging).
 
     Returns:
-        True if call was successfully initiated, False otherwise.
+        Twilio call SID (SIMULATED_CALL_SID in development mode) if the call was
+        successfully initiated, None otherwise.
 
     Raises:
         ValueError: If language is invalid.
     """
     if language not in VALID_LANGUAGES:
-        logger.error(f"Invalid language: {language} for voice call by user {user_id or 'unknown'}")
+        logger.error("Invalid language: %s for voice call by user %s", language, user_id or 'unknown')
         raise ValueError(f"Invalid language: {language}. Must be one of {VALID_LANGUAGES}")
 
     try:
         validated_number = validate_phone_number(phone_number)
         if not validated_number:
-            logger.error(f"Invalid phone number: {phone_number} for voice call by user {user_id or 'unknown'}")
-            return False
-
-        # Map language to Twilio Voice language code
-        twilio_language = "en-US" if language == "english" else "fr-FR"
-
-        # Generate TwiML for voice call
-        twiml = VoiceResponse()
-        twiml.say(message, language=twilio_language)
+            logger.error("Invalid phone number: %s for voice call by user %s", phone_number, user_id or 'unknown')
+            return None
 
         # Simulate call in development mode (if environment variable is set)
         if os.getenv("ENV", "development") == "development":
-            logger.info(
-                f"Simulated voice call to {validated_number} in {language} by user {user_id or 'unknown'}: {message}")
-            return True
+            logger.info("Simulated voice call to %s in %s (%s characters) by user %s", validated_number, language,
+                        len(message), user_id or 'unknown', extra=SAMPLED)
+            return SIMULATED_CALL_SID
 
         # Actual Twilio Voice API call
         call = client.calls.create(
-            twiml=str(twiml),
+            twiml=build_twiml(message, language),
             from_=TWILIO_PHONE_NUMBER,
-            to=validated_number
+            to=validated_number,
+            **_status_callback_params()
         )
-        logger.info(
-            f"Initiated voice call to {validated_number} in {language} with SID {call.sid} by user {user_id or 'unknown'}")
-        return True
+        logger.info("Initiated voice call to %s in %s with SID %s by user %s", validated_number, language, call.sid,
+                    user_id or 'unknown', extra=SAMPLED)
+        return call.sid
 
     except TwilioRestException as e:
-        logger.error(f"Failed to initiate voice call to {phone_number} by user {user_id or 'unknown'}: {e}")
-        return False
+        logger.error("Failed to initiate voice call to %s by user %s: %s", phone_number, user_id or 'unknown', e)
+        return None
 
 
@@ -0,0 +1,130 @@
+from sqlalchemy import text, table, column, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query
+from app import models
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Reminder text columns covered by search
+SEARCH_COLUMNS = ("appointment_reason", "medication_list", "consultation_list")
+
+# FTS5 trigram tokens are three characters wide; shorter terms cannot use the index
+MIN_TRIGRAM_TERM_LENGTH = 3
+
+# PostgreSQL search document and text search configuration. These strings are used
+# verbatim both in the index definitions (migration 0009) and in queries so the planner can match them.
+PG_SEARCH_DOCUMENT = (
+    "(coalesce(appointment_reason, '') || ' ' || "
+    "coalesce(medication_list, '') || ' ' || "
+    "coalesce(consultation_list, ''))"
+)
+PG_SEARCH_CONFIG = (
+    "CASE language WHEN 'english' THEN 'english'::regconfig "
+    "WHEN 'french' THEN 'french'::regconfig ELSE 'simple'::regconfig END"
+)
+PG_SEARCH_VECTOR = f"to_tsvector({PG_SEARCH_CONFIG}, {PG_SEARCH_DOCUMENT})"
+PG_SEARCH_QUERY = (
+    "(websearch_to_tsquery('english', :search_term) || "
+    "websearch_to_tsquery('french', :search_term) || "
+    "websearch_to_tsquery('simple', :search_term))"
+)
+
+# SQLite FTS5 external-content table kept in sync with reminders by triggers
+SQLITE_FTS_TABLE = "reminders_fts"
+SQLITE_SEARCH_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+    "appointment_reason, medication_list, consultation_list, "
+    "content='reminders', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS reminders_fts_ai AFTER INSERT ON reminders BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, appointment_reason, medication_list, consultation_list) "
+    "VALUES (new.id, new.appointment_reason, new.medication_list, new.consultation_list); END",
+    f"CREATE TRIGGER IF NOT EXISTS reminders_fts_ad AFTER DELETE ON reminders BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, appointment_reason, medication_list, "
+    "consultation_list) VALUES ('delete', old.id, old.appointment_reason, old.medication_list, "
+    "old.consultation_list); END",
+    f"CREATE TRIGGER IF NOT EXISTS reminders_fts_au AFTER UPDATE OF appointment_reason, medication_list, "
+    f"consultation_list ON reminders BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, appointment_reason, medication_list, "
+    "consultation_list) VALUES ('delete', old.id, old.appointment_reason, old.medication_list, "
+    "old.consultation_list); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, appointment_reason, medication_list, consultation_list) "
+    "VALUES (new.id, new.appointment_reason, new.medication_list, new.consultation_list); END",
+]
+
+reminders_fts = table(SQLITE_FTS_TABLE, column("rowid"))
+
+
+def create_search_indexes(engine: Engine) -> None:
+    """
+    Create the reminder search indexes of an embedded SQLite database.
+
+    SQLite gets an FTS5 trigram table maintained by triggers. PostgreSQL's pg_trgm and
+    tsvector GIN indexes are built by Alembic (migration 0009), never at startup. Other
+    databases fall back to unindexed ILIKE matching.
+
+    Args:
+        engine: SQLAlchemy engine whose reminders table should be indexed.
+    """
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        return
+    if dialect != "sqlite":
+        logger.warning("No search index support for dialect %s; falling back to ILIKE scans", dialect)
+        return
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SQLITE_FTS_TABLE}
+        ).first()
+        for statement in SQLITE_SEARCH_DDL:
+            conn.execute(text(statement))
+        if not exists:
+            # Index rows that were inserted before the FTS table existed
+            conn.execute(text(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"))
+    logger.info("Created reminder search indexes for dialect %s", dialect)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def apply_text_search(query: Query, term: str, dialect: str) -> Query:
+    """
+    Restrict a reminders query to rows matching a search term and order them by relevance.
+
+    The term is matched as a substring and as full text against the appointment reason,
+    medication list and consultation list.
+
+    Args:
+        query: Query over models.Reminder.
+        term: Search term entered by the user.
+        dialect: Name of the database dialect ('postgresql', 'sqlite', ...).
+
+    Returns:
+        Query filtered by the term and ordered by rank (best match first).
+    """
+    term = term.strip()
+    pattern = f"%{_escape_like(term)}%"
+
+    if dialect == "postgresql":
+        return query.filter(
+            text(f"({PG_SEARCH_VECTOR} @@ {PG_SEARCH_QUERY} OR {PG_SEARCH_DOCUMENT} ILIKE :search_pattern)")
+        ).order_by(
+            text(f"ts_rank({PG_SEARCH_VECTOR}, {PG_SEARCH_QUERY}) + "
+                 f"word_similarity(:search_term, {PG_SEARCH_DOCUMENT}) DESC"),
+            models.Reminder.id
+        ).params(search_term=term, search_pattern=pattern)
+
+    if dialect == "sqlite" and len(term) >= MIN_TRIGRAM_TERM_LENGTH:
+        match = '"' + term.replace('"', '""') + '"'
+        return query.join(reminders_fts, reminders_fts.c.rowid == models.Reminder.id).filter(
+            text(f"{SQLITE_FTS_TABLE} MATCH :search_match")
+        ).order_by(
+            text(f"bm25({SQLITE_FTS_TABLE})"),
+            models.Reminder.id
+        ).params(search_match=match)
+
+    return query.filter(
+        or_(*(getattr(models.Reminder, name).ilike(pattern, escape="\\") for name in SEARCH_COLUMNS))
+    ).order_by(models.Reminder.id)
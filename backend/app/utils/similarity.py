@@ -0,0 +1,106 @@
+from datetime import datetime
+from sqlalchemy import Float, text
+from sqlalchemy.orm import Session
+from typing import List, Optional, Sequence, Tuple
+from app import models
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Similar-feedback search configuration (loaded from environment variables)
+SIMILAR_FEEDBACK_MAX_K = int(os.getenv("SIMILAR_FEEDBACK_MAX_K", "100"))
+# HNSW candidate list per query: higher is more accurate and slower; must be at least k
+HNSW_EF_SEARCH = int(os.getenv("FEEDBACK_HNSW_EF_SEARCH", "100"))
+
+
+def save_feedback_embeddings(db: Session, feedbacks: Sequence[models.Feedback], embeddings: np.ndarray) -> None:
+    """
+    Store (or replace) the embeddings of analyzed feedback; the caller commits.
+
+    Args:
+        db: Database session.
+        feedbacks: Feedback rows, already flushed so they have an id.
+        embeddings: One unit-length row per feedback (nlp.embed_texts).
+    """
+    ids = [feedback.id for feedback in feedbacks]
+    db.query(models.FeedbackEmbedding).filter(models.FeedbackEmbedding.id.in_(ids)).delete(synchronize_session=False)
+    db.add_all([
+        models.FeedbackEmbedding(id=feedback.id, department=feedback.department, submitted_at=feedback.submitted_at,
+                                 embedding=embedding)
+        for feedback, embedding in zip(feedbacks, embeddings)
+    ])
+
+
+def _filtered(query, exclude_id: int, department: Optional[str], start: Optional[datetime], end: Optional[datetime]):
+    query = query.filter(models.FeedbackEmbedding.id != exclude_id)
+    if department:
+        query = query.filter(models.FeedbackEmbedding.department == department)
+    if start is not None:
+        query = query.filter(models.FeedbackEmbedding.submitted_at >= start)
+    if end is not None:
+        query = query.filter(models.FeedbackEmbedding.submitted_at < end)
+    return query
+
+
+def _nearest_postgresql(db: Session, query, target: np.ndarray, k: int) -> List[Tuple[int, datetime, float]]:
+    # HNSW index scan on cosine distance; iterative scans (pgvector 0.8) keep searching the graph
+    # until k rows pass the department/date filters instead of returning fewer
+    db.execute(text(f"SET LOCAL hnsw.ef_search = {max(HNSW_EF_SEARCH, k)}"))
+    db.execute(text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+    distance = models.FeedbackEmbedding.embedding.op("<=>", return_type=Float)(target)
+    rows = query.with_entities(models.FeedbackEmbedding.id, models.FeedbackEmbedding.submitted_at, distance) \
+        .order_by(distance).limit(k).all()
+    # relaxed_order may return neighbours slightly out of order
+    return sorted(((id_, submitted_at, 1.0 - distance) for id_, submitted_at, distance in rows), key=lambda row: -row[2])
+
+
+def _nearest_exact(query, target: np.ndarray, k: int) -> List[Tuple[int, datetime, float]]:
+    # Other databases (development, tests): exact scan of the filtered float16 vectors
+    rows = query.with_entities(models.FeedbackEmbedding.id, models.FeedbackEmbedding.submitted_at,
+                               models.FeedbackEmbedding.embedding).all()
+    if not rows:
+        return []
+    scores = np.stack([row.embedding for row in rows]) @ target
+    return [(rows[i].id, rows[i].submitted_at, float(scores[i])) for i in np.argsort(-scores)[:k]]
+
+
+def find_similar_feedback(db: Session, feedback: models.Feedback, k: int = 10, department: Optional[str] = None,
+                          start: Optional[datetime] = None,
+                          end: Optional[datetime] = None) -> Optional[List[Tuple[models.Feedback, float]]]:
+    """
+    Find the feedback whose text is closest to a given feedback.
+
+    Args:
+        db: Database session.
+        feedback: Feedback to find neighbours of.
+        k: Maximum number of neighbours.
+        department: Optional department the neighbours must belong to.
+        start: Optional lower bound on the neighbours' submitted_at (inclusive).
+        end: Optional upper bound on the neighbours' submitted_at (exclusive).
+
+    Returns:
+        (feedback, cosine similarity) pairs, most similar first, or None if the feedback has
+        not been embedded yet (analysis pending, or analyzed before embeddings existed).
+    """
+    target = db.get(models.FeedbackEmbedding, feedback.id)
+    if target is None:
+        return None
+    query = _filtered(db.query(models.FeedbackEmbedding), feedback.id, department, start, end)
+    if db.get_bind().dialect.name == "postgresql":
+        nearest = _nearest_postgresql(db, query, target.embedding, k)
+    else:
+        nearest = _nearest_exact(query, target.embedding, k)
+    if not nearest:
+        return []
+
+    submitted = [submitted_at for _, submitted_at, _ in nearest]
+    # Bounds on submitted_at let PostgreSQL prune the monthly feedback partitions
+    rows = db.query(models.Feedback).filter(
+        models.Feedback.id.in_([id_ for id_, _, _ in nearest]),
+        models.Feedback.submitted_at.between(min(submitted), max(submitted)),
+    )
+    by_id = {row.id: row for row in rows}
+    logger.info("Found %s feedbacks similar to %s", len(by_id), feedback.feedback_id)
+    return [(by_id[id_], similarity) for id_, _, similarity in nearest if id_ in by_id]
@@ -0,0 +1,373 @@
+from fastapi.concurrency import run_in_threadpool
+from app import models
+from app.database import SessionLocal
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import base64
+import gzip
+import io
+import json
+import logging
+import os
+import socket
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Upstream sync of an offline clinic node (loaded from environment variables)
+SYNC_UPSTREAM_URL = os.getenv("SYNC_UPSTREAM_URL", "")  # Central API base URL; empty disables pushing
+SYNC_TOKEN = os.getenv("SYNC_TOKEN", "")  # Shared secret; the central API rejects ingest when unset
+SYNC_NODE_ID = os.getenv("SYNC_NODE_ID", socket.gethostname())
+SYNC_NODE_ID_MAX_LENGTH = 100  # Size of reminders.origin_node
+SYNC_INTERVAL = float(os.getenv("SYNC_INTERVAL", "60"))  # Seconds between sync attempts
+SYNC_BATCH_SIZE = int(os.getenv("SYNC_BATCH_SIZE", "500"))  # Feedback rows, reminders and deletions per batch
+SYNC_TIMEOUT = float(os.getenv("SYNC_TIMEOUT", "30"))
+SYNC_INGEST_PATH = "/sync/ingest"
+SYNC_MAX_BODY = int(os.getenv("SYNC_MAX_BODY", str(50 * 1024 * 1024)))  # Decompressed bytes accepted per batch
+
+# Patient delta sync (GET /reminders/changes)
+# Changes are only served once this many seconds old, so a transaction that set updated_at but
+# has not committed yet cannot be skipped by a cursor; must exceed the longest reminder write
+REMINDER_SYNC_SETTLE = float(os.getenv("REMINDER_SYNC_SETTLE", "10"))
+REMINDER_SYNC_PAGE = int(os.getenv("REMINDER_SYNC_PAGE", "200"))  # Default changes per page
+# Tombstones older than this are pruned; clients with an older cursor get a full resync
+REMINDER_TOMBSTONE_DAYS = int(os.getenv("REMINDER_TOMBSTONE_DAYS", "90"))
+
+# Fields carried per record type, with the parser applied on ingest
+_uuid, _datetime = UUID, datetime.fromisoformat
+SYNC_FIELDS = {
+    "patient": {"patient_id": _uuid, "name": str, "hashed_password": str, "phone_number": str, "role": str},
+    "feedback": {"feedback_id": str, "patient_id": _uuid, "text": str, "rating": int, "language": str,
+                 "sentiment": str, "theme": str, "urgent": bool, "department": str, "submitted_at": _datetime},
+    "reminder": {"uid": _uuid, "patient_id": _uuid, "patient_name": str, "phone_number": str,
+                 "appointment_reason": str, "medication_list": str, "consultation_list": str, "language": str,
+                 "method": str, "scheduled_time": _datetime, "sent": bool, "sent_at": _datetime,
+                 "message_sid": str, "delivery_status": str, "delivery_updated_at": _datetime, "version": int},
+    "reminder_deleted": {"uid": _uuid},
+}
+
+_session = requests.Session()
+
+
+def _to_record(kind: str, row) -> Dict[str, object]:
+    record = {"type": kind}
+    for field in SYNC_FIELDS[kind]:
+        value = getattr(row, field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, UUID):
+            value = str(value)
+        record[field] = value
+    return record
+
+
+def encode_records(records: List[Dict[str, object]]) -> bytes:
+    """
+    Serialize sync records as gzip-compressed NDJSON.
+
+    Args:
+        records: Records built by collect_changes.
+
+    Returns:
+        Compressed request body.
+    """
+    lines = "\n".join(json.dumps(record, separators=(",", ":"), ensure_ascii=False) for record in records)
+    return gzip.compress(lines.encode("utf-8"), compresslevel=6)
+
+
+def decode_records(body: bytes, content_encoding: Optional[str] = None) -> List[Dict[str, object]]:
+    """
+    Parse a (possibly gzip-compressed) NDJSON sync batch into typed records.
+
+    Args:
+        body: Request body.
+        content_encoding: Value of the Content-Encoding header.
+
+    Returns:
+        Records with UUID and datetime fields parsed; unknown fields are dropped.
+
+    Raises:
+        ValueError: If the body is malformed or too large.
+    """
+    if content_encoding == "gzip":
+        with gzip.GzipFile(fileobj=io.BytesIO(body)) as f:
+            body = f.read(SYNC_MAX_BODY + 1)
+    if len(body) > SYNC_MAX_BODY:
+        raise ValueError("Sync batch too large")
+    records = []
+    for number, line in enumerate(body.decode("utf-8").splitlines(), start=1):
+        if not line.strip():
+            continue
+        raw = json.loads(line)
+        fields = SYNC_FIELDS.get(raw.get("type"))
+        if fields is None:
+            raise ValueError(f"Line {number}: unknown record type {raw.get('type')!r}")
+        record = {"type": raw["type"]}
+        for field, parse in fields.items():
+            value = raw.get(field)
+            record[field] = parse(value) if value is not None else None
+        records.append(record)
+    return records
+
+
+def _get_state(db, name: str) -> models.SyncState:
+    state = db.get(models.SyncState, name)
+    if state is None:
+        state = models.SyncState(name=name, last_id=0)
+        db.add(state)
+        db.flush()  # Sessions do not autoflush; make the row visible to the next lookup
+    return state
+
+
+def collect_changes(db, batch_size: int = SYNC_BATCH_SIZE) -> Tuple[List[Dict[str, object]], Dict[str, Tuple[int, Optional[datetime]]]]:
+    """
+    Collect feedback, reminder and reminder deletion changes made since the last successful push.
+
+    New feedback is tracked by its local id; reminders by (updated_at, id), so sends,
+    delivery receipts and edits are pushed as well as new rows; deletions by the
+    (deleted_at, id) of their tombstones. SQLite has a single writer, so rows become visible
+    in watermark order, all stamped by this node's clock. Patients referenced by the batch
+    are included so the central foreign keys resolve.
+
+    Args:
+        db: Database session.
+        batch_size: Maximum feedback rows, reminders and deletions per batch.
+
+    Returns:
+        Tuple of (records, new watermarks keyed by sync state name).
+    """
+    feedback_state, reminder_state = _get_state(db, "feedback"), _get_state(db, "reminders")
+    tombstone_state = _get_state(db, "reminder_tombstones")
+    feedbacks = db.query(models.Feedback).filter(models.Feedback.id > feedback_state.last_id) \
+        .order_by(models.Feedback.id).limit(batch_size).all()
+    query = db.query(models.Reminder)
+    if reminder_state.last_updated_at is not None:
+        after = reminder_state.last_updated_at
+        query = query.filter((models.Reminder.updated_at > after) |
+                             ((models.Reminder.updated_at == after) & (models.Reminder.id > reminder_state.last_id)))
+    reminders = query.order_by(models.Reminder.updated_at, models.Reminder.id).limit(batch_size).all()
+    query = db.query(models.ReminderTombstone)
+    if tombstone_state.last_updated_at is not None:
+        after = tombstone_state.last_updated_at
+        query = query.filter((models.ReminderTombstone.deleted_at > after) |
+                             ((models.ReminderTombstone.deleted_at == after) &
+                              (models.ReminderTombstone.id > tombstone_state.last_id)))
+    tombstones = query.order_by(models.ReminderTombstone.deleted_at, models.ReminderTombstone.id).limit(batch_size).all()
+    # A reminder moved to another patient leaves a tombstone too, but still exists
+    uids = {row.uid for row in tombstones}
+    live = {row[0] for row in db.query(models.Reminder.uid).filter(models.Reminder.uid.in_(uids))} if uids else set()
+
+    patient_ids = {row.patient_id for row in feedbacks} | {row.patient_id for row in reminders}
+    patients = db.query(models.Patient).filter(models.Patient.patient_id.in_(patient_ids)).all() if patient_ids else []
+
+    records = [_to_record("patient", row) for row in patients]
+    records += [_to_record("feedback", row) for row in feedbacks]
+    records += [_to_record("reminder", row) for row in reminders]
+    records += [_to_record("reminder_deleted", row) for row in tombstones if row.uid not in live]
+    watermarks = {}
+    if feedbacks:
+        watermarks["feedback"] = (feedbacks[-1].id, None)
+    if reminders:
+        watermarks["reminders"] = (reminders[-1].id, reminders[-1].updated_at)
+    if tombstones:
+        watermarks["reminder_tombstones"] = (tombstones[-1].id, tombstones[-1].deleted_at)
+    return records, watermarks
+
+
+Position = Optional[Tuple[datetime, Optional[int]]]
+
+
+def encode_cursor(reminders: Position, tombstones: Position) -> str:
+    """
+    Encode delta sync positions as an opaque URL-safe cursor.
+
+    Args:
+        reminders: (updated_at, id) of the last reminder sent; id None means everything up to updated_at.
+        tombstones: (deleted_at, id) of the last tombstone sent, same convention.
+
+    Returns:
+        Cursor string.
+    """
+    positions = [[position[0].isoformat(), position[1]] if position else None for position in (reminders, tombstones)]
+    return base64.urlsafe_b64encode(json.dumps(positions, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Position, Position]:
+    """
+    Decode a cursor made by encode_cursor.
+
+    Args:
+        cursor: Cursor string.
+
+    Returns:
+        Tuple of (reminders position, tombstones position).
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        reminders, tombstones = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return tuple((datetime.fromisoformat(position[0]), position[1]) if position else None
+                     for position in (reminders, tombstones))
+    except (TypeError, ValueError, IndexError) as e:
+        raise ValueError(f"Invalid sync cursor: {cursor}") from e
+
+
+def _after(query, at_column, id_column, position: Position):
+    # Keyset continuation on (at, id); served by the (patient_id, at, id) indexes
+    if position is None:
+        return query
+    at, row_id = position
+    if row_id is None:
+        return query.filter(at_column > at)
+    return query.filter((at_column > at) | ((at_column == at) & (id_column > row_id)))
+
+
+def _page(query, at_column, id_column, position: Position, until: datetime, limit: int):
+    # One page of rows changed after position and up to until, and the position to resume from
+    rows = _after(query, at_column, id_column, position).filter(at_column <= until) \
+        .order_by(at_column, id_column).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, (getattr(last, at_column.key), last.id), True
+    # Caught up: everything up to until has been sent
+    return rows, (until, None), False
+
+
+def collect_reminder_changes(db, patient_id: UUID, cursor: Optional[str] = None, limit: int = REMINDER_SYNC_PAGE,
+                             now: Optional[datetime] = None, columns: Optional[list] = None) -> Dict[str, object]:
+    """
+    Collect a patient's reminders created, updated, sent or deleted since a cursor.
+
+    Without a cursor, or with one older than the tombstone retention, every current reminder
+    is sent (``full`` is true: the client replaces its copy) and tombstones start from now.
+
+    Args:
+        db: Database session.
+        patient_id: Patient whose reminders are synced.
+        cursor: Cursor returned by the previous call.
+        limit: Maximum reminders, and maximum tombstones, per page.
+        now: Current UTC time (for tests).
+        columns: Optional Reminder columns to select instead of whole entities.
+
+    Returns:
+        Dict with 'reminders' (models.Reminder, or rows of the columns, oldest change first), 'deleted' (reminder IDs),
+        'cursor', 'has_more' and 'full'.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    now = now or datetime.utcnow()
+    until = now - timedelta(seconds=REMINDER_SYNC_SETTLE)
+    reminder_position, tombstone_position = decode_cursor(cursor) if cursor else (None, None)
+    full = tombstone_position is None or tombstone_position[0] < now - timedelta(days=REMINDER_TOMBSTONE_DAYS)
+    if full:
+        reminder_position, tombstone_position = None, (until, None)
+
+    # The cursor needs updated_at and id on every row, whichever columns were asked for
+    entities = [models.Reminder]
+    if columns:
+        selected = {column.key for column in columns}
+        entities = [*columns] + [c for c in (models.Reminder.updated_at, models.Reminder.id) if c.key not in selected]
+    reminders, reminder_position, more_reminders = _page(
+        db.query(*entities).filter(models.Reminder.patient_id == patient_id),
+        models.Reminder.updated_at, models.Reminder.id, reminder_position, until, limit)
+    tombstones, tombstone_position, more_tombstones = _page(
+        db.query(models.ReminderTombstone).filter(models.ReminderTombstone.patient_id == patient_id),
+        models.ReminderTombstone.deleted_at, models.ReminderTombstone.id, tombstone_position, until, limit)
+    return {
+        "reminders": reminders,
+        "deleted": [tombstone.reminder_id for tombstone in tombstones],
+        "cursor": encode_cursor(reminder_position, tombstone_position),
+        "has_more": more_reminders or more_tombstones,
+        "full": full,
+    }
+
+
+def push_records(records: List[Dict[str, object]]) -> Dict[str, object]:
+    """
+    Send one batch of records to the central API.
+
+    Args:
+        records: Records built by collect_changes.
+
+    Returns:
+        Ingest counts and skipped records returned by the central API.
+
+    Raises:
+        requests.RequestException: If the upstream is unreachable or rejects the batch.
+    """
+    response = _session.post(
+        SYNC_UPSTREAM_URL.rstrip("/") + SYNC_INGEST_PATH,
+        data=encode_records(records),
+        headers={
+            "Content-Type": "application/x-ndjson",
+            "Content-Encoding": "gzip",
+            "X-Sync-Token": SYNC_TOKEN,
+            "X-Sync-Node": SYNC_NODE_ID,
+        },
+        timeout=SYNC_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def sync_upstream_once(batch_size: int = SYNC_BATCH_SIZE) -> int:
+    """
+    Push all pending changes upstream, one batch at a time.
+
+    Watermarks only advance after the central API acknowledges a batch, so a dropped
+    link resends the batch on the next attempt; ingest is idempotent.
+
+    Args:
+        batch_size: Maximum feedback rows, reminders and deletions per batch.
+
+    Returns:
+        Number of records pushed.
+    """
+    pushed = 0
+    while True:
+        db = SessionLocal()
+        try:
+            records, watermarks = collect_changes(db, batch_size)
+            if not watermarks:
+                db.commit()
+                return pushed
+            # A batch of moved-reminder tombstones only has watermarks to advance
+            try:
+                counts = push_records(records) if records else {}
+            except requests.RequestException as e:
+                logger.warning("Upstream sync to %s failed, will retry: %s", SYNC_UPSTREAM_URL, e)
+                db.rollback()
+                return pushed
+            now = datetime.utcnow()
+            for name, (last_id, last_updated_at) in watermarks.items():
+                state = _get_state(db, name)
+                state.last_id, state.last_updated_at, state.synced_at = last_id, last_updated_at, now
+            db.commit()
+            pushed += len(records)
+            skipped = counts.pop("skipped", [])
+            logger.info("Pushed %s records upstream: %s", len(records), counts)
+            if skipped:
+                # Not resent: the conflict needs fixing on one side, then the record edited again
+                logger.warning("Upstream skipped %s records: %s", len(skipped), skipped)
+        finally:
+            db.close()
+
+
+async def run_upstream_sync(interval: float = SYNC_INTERVAL) -> None:
+    """
+    Periodically push local changes to the central API until cancelled.
+
+    Args:
+        interval: Seconds to wait between sync attempts.
+    """
+    while True:
+        try:
+            await run_in_threadpool(sync_upstream_once)
+        except Exception as e:
+            logger.error("Upstream sync failed: %s", e)
+        await asyncio.sleep(interval)
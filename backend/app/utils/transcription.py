@@ -0,0 +1,149 @@
+from functools import lru_cache
+from typing import AsyncIterator, Tuple
+from uuid import uuid4
+from fastapi.concurrency import run_in_threadpool
+from app.utils.nlp import stage_recorder
+import json
+import logging
+import mimetypes
+import os
+import shutil
+import subprocess
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Audio feedback is stored here until transcribed; must be shared by the API and the analysis workers
+AUDIO_DIR = os.getenv("AUDIO_DIR", os.path.join(tempfile.gettempdir(), "feedback-audio"))
+AUDIO_MAX_BYTES = int(os.getenv("AUDIO_MAX_BYTES", str(25 * 1024 * 1024)))  # Larger uploads are rejected
+AUDIO_SPOOL_MEMORY = int(os.getenv("AUDIO_SPOOL_MEMORY", str(1024 * 1024)))  # Uploads above this spill to disk
+AUDIO_SAMPLE_RATE = 16000  # Vosk models expect 16 kHz mono
+AUDIO_CHUNK_BYTES = 64 * 1024
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+# One Vosk model directory per language (e.g. /app/models/vosk/french); languages without one use the fallback
+VOSK_MODEL_DIR = os.getenv("VOSK_MODEL_DIR", "/app/models/vosk")
+VOSK_FALLBACK_LANGUAGE = os.getenv("VOSK_FALLBACK_LANGUAGE", "french")
+
+
+async def spool_upload(chunks: AsyncIterator[bytes], max_bytes: int = AUDIO_MAX_BYTES) -> Tuple[tempfile.SpooledTemporaryFile, int]:
+    """
+    Copy a streamed upload into a temporary file that stays in memory only while small.
+
+    Args:
+        chunks: Body chunks, e.g. ``request.stream()``.
+        max_bytes: Largest accepted upload.
+
+    Returns:
+        Tuple of (file positioned at the start, size in bytes).
+
+    Raises:
+        ValueError: If the upload exceeds max_bytes; the partial file is discarded.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=AUDIO_SPOOL_MEMORY)
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError(f"Audio upload exceeds {max_bytes} bytes")
+            # Once rolled over to disk, writes would block the event loop
+            if getattr(spool, "_rolled", True):
+                await run_in_threadpool(spool.write, chunk)
+            else:
+                spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, size
+
+
+def store_audio(spool, content_type: str = None) -> str:
+    """
+    Move a spooled upload into AUDIO_DIR under a generated name.
+
+    Args:
+        spool: File returned by spool_upload; closed afterwards.
+        content_type: Upload media type, used only for the file extension.
+
+    Returns:
+        Path of the stored file.
+    """
+    os.makedirs(AUDIO_DIR, exist_ok=True)
+    suffix = mimetypes.guess_extension((content_type or "").split(";")[0].strip()) or ".bin"
+    path = os.path.join(AUDIO_DIR, f"{uuid4().hex}{suffix}")
+    try:
+        with open(path, "wb") as f:
+            shutil.copyfileobj(spool, f, AUDIO_CHUNK_BYTES)
+    finally:
+        spool.close()
+    return path
+
+
+@lru_cache(maxsize=None)
+def load_vosk_model(language: str):
+    """
+    Load and cache the Vosk model of a language.
+
+    Args:
+        language: Feedback language; falls back to VOSK_FALLBACK_LANGUAGE without a model of its own.
+
+    Returns:
+        The vosk.Model.
+    """
+    from vosk import Model, SetLogLevel
+
+    SetLogLevel(-1)
+    path = os.path.join(VOSK_MODEL_DIR, language)
+    if not os.path.isdir(path):
+        path = os.path.join(VOSK_MODEL_DIR, VOSK_FALLBACK_LANGUAGE)
+    logger.info("Loading Vosk model for %s: %s", language, path)
+    return Model(path)
+
+
+def preload_transcription_models() -> None:
+    """Load the Vosk model of every language with a directory under VOSK_MODEL_DIR."""
+    if not os.path.isdir(VOSK_MODEL_DIR):
+        return
+    for language in sorted(os.listdir(VOSK_MODEL_DIR)):
+        if os.path.isdir(os.path.join(VOSK_MODEL_DIR, language)):
+            load_vosk_model(language)
+
+
+def transcribe_audio(path: str, language: str) -> str:
+    """
+    Transcribe an audio file offline with Vosk.
+
+    ffmpeg decodes and resamples any input format to 16 kHz mono PCM, which is fed to the
+    recognizer chunk by chunk, so memory use does not grow with the recording's length.
+
+    Args:
+        path: Audio file.
+        language: Feedback language, selecting the Vosk model.
+
+    Returns:
+        The transcript (empty if nothing was recognized).
+
+    Raises:
+        RuntimeError: If ffmpeg cannot decode the file.
+    """
+    from vosk import KaldiRecognizer
+
+    recognizer = KaldiRecognizer(load_vosk_model(language), AUDIO_SAMPLE_RATE)
+    parts = []
+    command = [FFMPEG_BINARY, "-nostdin", "-loglevel", "error", "-i", path,
+               "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE), "-f", "s16le", "-"]
+    with stage_recorder("transcription").time():
+        with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as process:
+            while True:
+                chunk = process.stdout.read(AUDIO_CHUNK_BYTES)
+                if not chunk:
+                    break
+                if recognizer.AcceptWaveform(chunk):
+                    parts.append(json.loads(recognizer.Result())["text"])
+            parts.append(json.loads(recognizer.FinalResult())["text"])
+            errors = process.stderr.read().decode(errors="replace").strip()
+        if process.returncode:
+            logger.error("ffmpeg failed on %s: %s", path, errors)
+            raise RuntimeError(f"Could not decode audio: {errors}")
+    return " ".join(part for part in parts if part)
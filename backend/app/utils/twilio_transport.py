@@ -0,0 +1,124 @@
+from twilio.http.http_client import TwilioHttpClient
+from twilio.http.response import Response
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.utils.metrics import get_recorder, LatencyRecorder
+from typing import Dict, Optional, Tuple
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Transport configuration (loaded from environment variables)
+TWILIO_API_BASE_URL = os.getenv("TWILIO_API_BASE_URL")  # e.g. http://localhost:8081 for a local stand-in
+TWILIO_POOL_CONNECTIONS = int(os.getenv("TWILIO_POOL_CONNECTIONS", "4"))  # Number of host pools
+TWILIO_POOL_MAXSIZE = int(os.getenv("TWILIO_POOL_MAXSIZE", "16"))  # Keep-alive connections per host
+TWILIO_CONNECT_TIMEOUT = float(os.getenv("TWILIO_CONNECT_TIMEOUT", "10"))
+TWILIO_READ_TIMEOUT = float(os.getenv("TWILIO_READ_TIMEOUT", "30"))
+TWILIO_MAX_RETRIES = int(os.getenv("TWILIO_MAX_RETRIES", "3"))
+TWILIO_RETRY_BACKOFF = float(os.getenv("TWILIO_RETRY_BACKOFF", "0.5"))
+
+TWILIO_DEFAULT_DOMAIN = "twilio.com"
+
+# Statuses for which Twilio guarantees the request was not processed, so POSTs are safe to retry.
+# Read timeouts are never retried: the message may already have been accepted.
+RETRY_STATUSES = (429, 503)
+
+
+class PooledTwilioHttpClient(TwilioHttpClient):
+    """
+    Twilio HTTP client with a tuned keep-alive connection pool, retries and latency metrics.
+
+    Connections are reused across sends so a dispatch burst pays TCP/TLS setup once per
+    pooled connection instead of once per message. When ``base_url`` is set, every Twilio
+    API URL is rewritten to that origin so a local stand-in server can replace Twilio.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = TWILIO_POOL_CONNECTIONS,
+        pool_maxsize: int = TWILIO_POOL_MAXSIZE,
+        connect_timeout: float = TWILIO_CONNECT_TIMEOUT,
+        read_timeout: float = TWILIO_READ_TIMEOUT,
+        max_retries: int = TWILIO_MAX_RETRIES,
+        backoff_factor: float = TWILIO_RETRY_BACKOFF,
+        base_url: Optional[str] = TWILIO_API_BASE_URL,
+        recorder: Optional[LatencyRecorder] = None,
+    ):
+        super().__init__(pool_connections=True)
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.pool_maxsize = pool_maxsize
+        self.recorder = recorder or get_recorder("twilio_request", "Twilio API request latency")
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "POST", "DELETE"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _rewrite_url(self, url: str) -> str:
+        """Point a Twilio API URL at the configured base URL, keeping its path and query."""
+        scheme_end = url.find("://")
+        path_start = url.find("/", scheme_end + 3)
+        host = url[scheme_end + 3:path_start if path_start != -1 else len(url)]
+        if not host.endswith(TWILIO_DEFAULT_DOMAIN):
+            return url
+        return self.base_url + (url[path_start:] if path_start != -1 else "")
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, object]] = None,
+        data: Optional[Dict[str, object]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        timeout: Optional[float] = None,
+        allow_redirects: bool = False,
+    ) -> Response:
+        """
+        Send a Twilio API request through the pooled session and record its latency.
+
+        Returns:
+            Twilio HTTP response.
+        """
+        if self.base_url:
+            url = self._rewrite_url(url)
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, params=params, data=data, headers=headers, auth=auth,
+                                       timeout=timeout, allow_redirects=allow_redirects)
+        except Exception:
+            self.recorder.observe(time.perf_counter() - start, error=True)
+            raise
+        self.recorder.observe(time.perf_counter() - start, error=response.status_code >= 400)
+        return response
+
+
+def create_http_client(**overrides) -> PooledTwilioHttpClient:
+    """
+    Create the pooled Twilio HTTP transport from environment configuration.
+
+    Args:
+        **overrides: Keyword arguments overriding PooledTwilioHttpClient defaults
+            (pool_maxsize, read_timeout, base_url, ...).
+
+    Returns:
+        Configured PooledTwilioHttpClient.
+    """
+    http_client = PooledTwilioHttpClient(**overrides)
+    logger.info("Created Twilio transport: pool_maxsize=%s, timeout=%s, base_url=%s",
+                http_client.pool_maxsize, http_client.timeout, http_client.base_url or 'default')
+    return http_client
+
@@ -0,0 +1,146 @@
+from typing import Dict, List, Sequence
+import math
+import random
+
+LANGUAGES = ("english", "french", "douala", "bassa")
+
+# Length distributions of feedback texts, in words: lognormal (median, sigma) clamped to [min, max]
+LENGTH_PROFILES = {
+    "short": (8, 0.4, 2, 30),  # SMS-style ratings comments
+    "mixed": (20, 0.8, 2, 200),  # What /feedback/submit receives in practice
+    "long": (80, 0.5, 20, 400),  # Transcribed voice notes, truncated at 512 tokens by the model
+}
+
+_ENGLISH = {
+    "subjects": ["the nurse", "the doctor", "the reception", "the pharmacy", "the lab", "the waiting room",
+                 "the billing office", "the cardiology team", "the maternity ward", "my appointment"],
+    "verbs": ["was", "seemed", "has been", "felt", "remained"],
+    "adjectives": ["very kind", "slow", "helpful", "rude", "clean", "crowded", "professional", "confusing",
+                   "excellent", "disorganised", "fast", "attentive"],
+    "tails": ["today", "this morning", "during my visit", "as usual", "for my mother", "after two hours",
+              "compared to last time", "and I am grateful", "but the staff explained everything"],
+    "urgent": ["long wait", "scheduling issues", "billing confusion", "slow lab", "urgent", "emergency"],
+}
+
+_FRENCH = {
+    "subjects": ["l'infirmière", "le médecin", "l'accueil", "la pharmacie", "le laboratoire", "la salle d'attente",
+                 "le service de facturation", "l'équipe de cardiologie", "la maternité", "mon rendez-vous"],
+    "verbs": ["était", "semblait", "a été", "restait"],
+    "adjectives": ["très aimable", "lent", "serviable", "impoli", "propre", "bondé", "professionnel", "déroutant",
+                   "excellent", "désorganisé", "rapide", "attentionné"],
+    "tails": ["aujourd'hui", "ce matin", "pendant ma visite", "comme d'habitude", "pour ma mère",
+              "après deux heures", "par rapport à la dernière fois", "et je suis reconnaissant"],
+    "urgent": ["attente longue", "problèmes de planification", "confusion de facturation", "laboratoire lent",
+               "urgence"],
+}
+
+# Douala and Bassa texts are pseudo-words built from each orthography's letters and tone marks,
+# so tokenizers see realistic subword fragmentation; they are not meaningful sentences
+_SYLLABLES = {
+    "douala": {
+        "onsets": ["b", "d", "k", "m", "n", "ny", "ŋ", "s", "t", "w", "y", "mb", "nd", "ŋg", "l"],
+        "vowels": ["a", "á", "à", "e", "é", "ɛ", "ɛ́", "i", "í", "o", "ó", "ɔ", "ɔ́", "u", "ú"],
+    },
+    "bassa": {
+        "onsets": ["b", "c", "g", "h", "j", "k", "l", "m", "n", "ny", "ŋ", "s", "t", "y", "hy", "mb", "nj"],
+        "vowels": ["a", "á", "â", "ǎ", "e", "é", "ɛ", "ɛ̂", "i", "í", "o", "ɔ", "ɔ́", "u", "ú"],
+    },
+}
+# Clinic vocabulary code-switched into local-language feedback
+_LOAN_WORDS = ["docteur", "hôpital", "pharmacie", "infirmière", "rendez-vous", "laboratoire", "facture"]
+
+
+def _word_count(rng: random.Random, profile: str) -> int:
+    median, sigma, low, high = LENGTH_PROFILES[profile]
+    return max(low, min(high, int(round(rng.lognormvariate(math.log(median), sigma)))))
+
+
+def _template_text(rng: random.Random, vocab: Dict[str, List[str]], words: int, urgent_rate: float) -> str:
+    clauses = []
+    count = 0
+    while count < words:
+        clause = f"{rng.choice(vocab['subjects'])} {rng.choice(vocab['verbs'])} {rng.choice(vocab['adjectives'])}"
+        if rng.random() < 0.5:
+            clause += f" {rng.choice(vocab['tails'])}"
+        clauses.append(clause)
+        count += len(clause.split())
+    sentences = " ".join(". ".join(clauses).split()[:words]).split(". ")
+    if rng.random() < urgent_rate:
+        sentences.insert(rng.randrange(len(sentences) + 1), rng.choice(vocab["urgent"]))
+    return ". ".join(sentence[0].upper() + sentence[1:] for sentence in sentences) + "."
+
+
+def _syllable_text(rng: random.Random, language: str, words: int, urgent_rate: float) -> str:
+    inventory = _SYLLABLES[language]
+    tokens = []
+    for _ in range(words):
+        if rng.random() < 0.08:
+            tokens.append(rng.choice(_LOAN_WORDS))
+            continue
+        syllables = rng.choice((1, 2, 2, 3))
+        tokens.append("".join(rng.choice(inventory["onsets"]) + rng.choice(inventory["vowels"])
+                              for _ in range(syllables)))
+    if rng.random() < urgent_rate:
+        tokens.insert(rng.randrange(len(tokens) + 1), "urgence")
+    return " ".join(tokens).capitalize() + "."
+
+
+def generate_corpus(language: str, size: int, profile: str = "mixed", seed: int = 0,
+                    urgent_rate: float = 0.1) -> List[str]:
+    """
+    Generate a reproducible synthetic feedback corpus.
+
+    The same arguments always produce the same texts, on any machine.
+
+    Args:
+        language: One of LANGUAGES.
+        size: Number of texts.
+        profile: Length distribution, a key of LENGTH_PROFILES.
+        seed: Random seed.
+        urgent_rate: Share of texts containing an urgency keyword.
+
+    Returns:
+        List of feedback texts.
+
+    Raises:
+        ValueError: If language or profile is unknown.
+    """
+    if language not in LANGUAGES:
+        raise ValueError(f"Unknown language: {language}. Must be one of {', '.join(LANGUAGES)}")
+    if profile not in LENGTH_PROFILES:
+        raise ValueError(f"Unknown length profile: {profile}. Must be one of {', '.join(LENGTH_PROFILES)}")
+    rng = random.Random(f"{language}:{profile}:{seed}")
+    texts = []
+    for _ in range(size):
+        words = _word_count(rng, profile)
+        if language == "english":
+            texts.append(_template_text(rng, _ENGLISH, words, urgent_rate))
+        elif language == "french":
+            texts.append(_template_text(rng, _FRENCH, words, urgent_rate))
+        else:
+            texts.append(_syllable_text(rng, language, words, urgent_rate))
+    return texts
+
+
+def corpus_stats(texts: Sequence[str]) -> Dict[str, float]:
+    """
+    Summarize a corpus for the benchmark report.
+
+    Args:
+        texts: Corpus texts.
+
+    Returns:
+        Dictionary with the text count and mean, p50 and max length in words and characters.
+    """
+    words = sorted(len(text.split()) for text in texts)
+    chars = sorted(len(text) for text in texts)
+    if not texts:
+        return {"texts": 0}
+    return {
+        "texts": len(texts),
+        "mean_words": sum(words) / len(words),
+        "p50_words": words[len(words) // 2],
+        "max_words": words[-1],
+        "mean_chars": sum(chars) / len(chars),
+        "max_chars": chars[-1],
+    }
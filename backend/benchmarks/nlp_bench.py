@@ -0,0 +1,271 @@
+"""
+Benchmark the NLP hot paths on synthetic multilingual corpora.
+
+    python -m benchmarks.nlp_bench --config tiny --size 200 --output results.json
+    python -m benchmarks.nlp_bench --config tiny --baseline results.json --fail-on-regression
+
+The tiny config builds a small randomly initialised BERT and uses TF-IDF topic embeddings,
+so it runs offline in a few minutes on a CI CPU; its absolute numbers only compare with
+other tiny runs. The full config uses the production models (downloaded on first use).
+"""
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+from benchmarks.corpus import LANGUAGES, LENGTH_PROFILES, corpus_stats, generate_corpus
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+FUNCTIONS = ("detect_language", "detect_urgency", "analyze_sentiment", "extract_themes")
+DEFAULT_BATCH_SIZES = (1, 8, 32)
+# BERTopic cannot cluster a handful of texts (UMAP needs more documents than neighbours)
+DEFAULT_THEME_BATCH_SIZES = (64, 256)
+DEFAULT_THRESHOLD = 0.2  # Relative change counted as a regression
+TINY_MODEL_DIR = os.path.join(os.path.dirname(__file__), ".cache", "tiny-sentiment")
+
+
+def build_tiny_sentiment_model(path: str = TINY_MODEL_DIR, seed: int = 0) -> str:
+    """
+    Create (once) a small random BERT sentiment classifier with the production label count.
+
+    The vocabulary is built from the synthetic corpora, so tokenization cost is realistic
+    without downloading anything.
+
+    Args:
+        path: Directory to save the model and tokenizer in.
+        seed: Seed for the corpus vocabulary and the weights.
+
+    Returns:
+        The model directory, usable as NLP_SENTIMENT_MODEL.
+    """
+    if os.path.exists(os.path.join(path, "config.json")):
+        return path
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    words = set()
+    for language in LANGUAGES:
+        for text in generate_corpus(language, 500, seed=seed):
+            words.update(text.lower().replace(".", " ").split())
+    characters = sorted({character for word in words for character in word})
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "."] + characters \
+        + [f"##{character}" for character in characters] + sorted(words)
+    os.makedirs(path, exist_ok=True)
+    vocab_file = os.path.join(path, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(vocab) + "\n")
+
+    torch.manual_seed(seed)
+    config = BertConfig(vocab_size=len(vocab), hidden_size=64, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=128, max_position_embeddings=512, num_labels=5)
+    BertForSequenceClassification(config).save_pretrained(path)
+    BertTokenizerFast(vocab_file=vocab_file, do_lower_case=True, strip_accents=False).save_pretrained(path)
+    return path
+
+
+def configure_models(config: str) -> None:
+    """
+    Point app.utils.nlp at the models of a benchmark config; must run before it is imported.
+
+    Args:
+        config: 'tiny' or 'full'.
+    """
+    if config == "tiny":
+        os.environ["NLP_SENTIMENT_MODEL"] = build_tiny_sentiment_model()
+        os.environ["NLP_TOPIC_EMBEDDING_MODEL"] = "tfidf"
+        os.environ["HF_HUB_OFFLINE"] = "1"
+
+
+def _analysis_language(language: str) -> str:
+    # Douala and Bassa feedback is analyzed with the English settings, as in analyze_single_feedback
+    return language if language in ("english", "french") else "english"
+
+
+def _call(nlp, function: str, batch: List[str], language: str) -> None:
+    if function == "detect_language":
+        for text in batch:
+            nlp.detect_language(text)
+    elif function == "detect_urgency":
+        nlp.detect_urgency(batch)
+    elif function == "analyze_sentiment":
+        nlp.analyze_sentiment(batch, batch_size=len(batch), lang=_analysis_language(language))
+    else:
+        nlp.extract_themes(batch, lang=_analysis_language(language))
+
+
+def run_case(nlp, function: str, texts: Sequence[str], language: str, batch_size: int,
+             min_seconds: float = 0.0) -> Dict[str, object]:
+    """
+    Time one function on one corpus, a batch at a time.
+
+    One warm-up batch is run first. The corpus is replayed until at least ``min_seconds``
+    have been measured, so fast functions get stable percentiles.
+
+    Args:
+        nlp: The app.utils.nlp module.
+        function: One of FUNCTIONS.
+        texts: Corpus texts.
+        language: Corpus language.
+        batch_size: Texts per call.
+        min_seconds: Minimum measured time.
+
+    Returns:
+        Result with texts/second and p50/p99/mean batch latency in milliseconds, or an error.
+    """
+    from app.utils.metrics import LatencyRecorder
+
+    batches = [list(texts[i:i + batch_size]) for i in range(0, len(texts) - batch_size + 1, batch_size)]
+    result = {"function": function, "language": language, "batch_size": batch_size}
+    if not batches:
+        return {**result, "error": f"corpus smaller than batch size {batch_size}"}
+    recorder = LatencyRecorder(function, reservoir_size=100_000)
+    measured_texts = 0
+    try:
+        _call(nlp, function, batches[0], language)
+        started = time.perf_counter()
+        while True:
+            for batch in batches:
+                with recorder.time():
+                    _call(nlp, function, batch, language)
+                measured_texts += len(batch)
+            if time.perf_counter() - started >= min_seconds:
+                break
+    except Exception as e:
+        return {**result, "error": str(e)}
+    snapshot = recorder.snapshot()
+    return {
+        **result,
+        "texts": measured_texts,
+        "calls": snapshot["count"],
+        "texts_per_second": measured_texts / snapshot["total"] if snapshot["total"] else 0.0,
+        "p50_ms": snapshot["p50"] * 1000,
+        "p99_ms": snapshot["p99"] * 1000,
+        "mean_ms": snapshot["mean"] * 1000,
+    }
+
+
+def compare(results: List[Dict[str, object]], baseline: List[Dict[str, object]],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, object]]:
+    """
+    Compare results with a baseline run, case by case.
+
+    Args:
+        results: Results of this run.
+        baseline: Results of the baseline run.
+        threshold: Relative throughput drop or p99 increase counted as a regression.
+
+    Returns:
+        One entry per case present in both runs, with throughput and p99 ratios
+        (this run / baseline) and a regression flag.
+    """
+    def key(entry):
+        return entry["function"], entry["language"], entry["batch_size"]
+
+    previous = {key(entry): entry for entry in baseline if "error" not in entry}
+    comparisons = []
+    for entry in results:
+        before = previous.get(key(entry))
+        if before is None or "error" in entry:
+            continue
+        throughput = entry["texts_per_second"] / before["texts_per_second"] if before["texts_per_second"] else 1.0
+        p99 = entry["p99_ms"] / before["p99_ms"] if before["p99_ms"] else 1.0
+        comparisons.append({
+            "function": entry["function"], "language": entry["language"], "batch_size": entry["batch_size"],
+            "throughput_ratio": throughput, "p99_ratio": p99,
+            "regression": throughput < 1 - threshold or p99 > 1 + threshold,
+        })
+    return comparisons
+
+
+def _print_table(results: List[Dict[str, object]], comparisons: List[Dict[str, object]]) -> None:
+    ratios = {(c["function"], c["language"], c["batch_size"]): c for c in comparisons}
+    print(f"{'function':<18} {'language':<8} {'batch':>5} {'texts/s':>10} {'p50 ms':>9} {'p99 ms':>9}  vs baseline")
+    for entry in results:
+        if "error" in entry:
+            print(f"{entry['function']:<18} {entry['language']:<8} {entry['batch_size']:>5}  error: {entry['error']}")
+            continue
+        line = (f"{entry['function']:<18} {entry['language']:<8} {entry['batch_size']:>5} "
+                f"{entry['texts_per_second']:>10.1f} {entry['p50_ms']:>9.2f} {entry['p99_ms']:>9.2f}")
+        comparison = ratios.get((entry["function"], entry["language"], entry["batch_size"]))
+        if comparison:
+            line += f"  x{comparison['throughput_ratio']:.2f} texts/s, x{comparison['p99_ratio']:.2f} p99"
+            line += "  REGRESSION" if comparison["regression"] else ""
+        print(line)
+
+
+def _sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(",") if size.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the NLP hot paths on synthetic corpora.")
+    parser.add_argument("--config", choices=("tiny", "full"), default="tiny")
+    parser.add_argument("--languages", default=",".join(LANGUAGES))
+    parser.add_argument("--functions", default=",".join(FUNCTIONS))
+    parser.add_argument("--size", type=int, default=256, help="Texts per corpus")
+    parser.add_argument("--profile", choices=sorted(LENGTH_PROFILES), default="mixed", help="Length distribution")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-sizes", type=_sizes, default=list(DEFAULT_BATCH_SIZES))
+    parser.add_argument("--theme-batch-sizes", type=_sizes, default=list(DEFAULT_THEME_BATCH_SIZES))
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="Minimum measured time per case")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare with the JSON results of an earlier run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on a regression")
+    args = parser.parse_args(argv)
+
+    configure_models(args.config)
+    import torch
+    from app.utils import nlp
+
+    languages = [language for language in args.languages.split(",") if language]
+    functions = [function for function in args.functions.split(",") if function]
+    corpora = {language: generate_corpus(language, args.size, args.profile, args.seed) for language in languages}
+    results = []
+    for function in functions:
+        if function not in FUNCTIONS:
+            parser.error(f"Unknown function: {function}")
+        batch_sizes = [1] if function == "detect_language" else \
+            args.theme_batch_sizes if function == "extract_themes" else args.batch_sizes
+        for language in languages:
+            for batch_size in batch_sizes:
+                min_seconds = 0.0 if function == "extract_themes" else args.min_seconds
+                results.append(run_case(nlp, function, corpora[language], language, batch_size, min_seconds))
+                print(".", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+
+    comparisons = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for setting in ("config", "profile", "seed", "size"):
+            if baseline["meta"].get(setting) != getattr(args, setting):
+                print(f"warning: baseline {setting} is {baseline['meta'].get(setting)!r}, not {getattr(args, setting)!r}",
+                      file=sys.stderr)
+        comparisons = compare(results, baseline["results"], args.threshold)
+    _print_table(results, comparisons)
+
+    if args.output:
+        report = {
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "config": args.config,
+                "sentiment_model": nlp.SENTIMENT_MODEL if args.config == "full" else "tiny",
+                "profile": args.profile, "seed": args.seed, "size": args.size,
+                "python": platform.python_version(), "torch": torch.__version__,
+                "torch_threads": torch.get_num_threads(), "device": str(nlp.device),
+                "machine": platform.machine(), "cpus": os.cpu_count(),
+            },
+            "corpora": {language: corpus_stats(texts) for language, texts in corpora.items()},
+            "results": results,
+            "comparison": comparisons,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if args.fail_on_regression and any(c["regression"] for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
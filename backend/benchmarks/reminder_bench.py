@@ -0,0 +1,200 @@
+"""
+Benchmark loading and serializing pages of reminders, as the reminder list and search routes do.
+
+    python -m benchmarks.reminder_bench --rows 5000 --page-size 100 --output results.json
+
+Two paths are compared on an in-memory SQLite database, each page in a fresh session:
+
+* ``orm``: whole Reminder entities (decrypting phone numbers, filling the identity map), copied
+  field by field into schemas.Reminder and encoded as FastAPI does for a ``response_model``
+  (dump, validate again, dump to JSON, json.dumps).
+* ``projected``: only the schema's columns (schema_columns), validated straight from the rows
+  with a TypeAdapter and encoded once by pydantic (models_response).
+
+Absolute numbers depend on the machine and SQLite; compare the two paths of one run.
+"""
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+PATHS = ("orm", "projected")
+DEFAULT_PAGE_SIZE = 100
+
+
+def seed_reminders(session_factory, rows: int) -> object:
+    """
+    Create one patient with ``rows`` reminders carrying realistic, long-ish texts.
+
+    Args:
+        session_factory: Session factory bound to an empty database.
+        rows: Number of reminders.
+
+    Returns:
+        The patient ID.
+    """
+    from app import models
+
+    db = session_factory()
+    try:
+        patient = models.Patient(name="Jane Doe", hashed_password="hash", phone_number="+237987654321", role="patient")
+        db.add(patient)
+        db.flush()
+        scheduled = datetime(2025, 8, 4, 9, 0)
+        for offset in range(rows):
+            db.add(models.Reminder(
+                patient_id=patient.patient_id, patient_name=patient.name, phone_number=patient.phone_number,
+                appointment_reason=f"Follow-up consultation #{offset} for hypertension and diabetes",
+                medication_list="Metformin 500 mg twice a day with meals; Amlodipine 5 mg every morning",
+                consultation_list="Cardiology review; HbA1c blood test; Eye examination",
+                language="french", method="sms", scheduled_time=scheduled + timedelta(hours=offset),
+                sent=offset % 3 == 0, sent_at=scheduled if offset % 3 == 0 else None,
+            ))
+        db.commit()
+        return patient.patient_id
+    finally:
+        db.close()
+
+
+def _orm_page(db, patient_id, skip: int, limit: int) -> bytes:
+    from fastapi.responses import JSONResponse
+    from app import models, schemas
+
+    reminders = db.query(models.Reminder).filter(models.Reminder.patient_id == patient_id) \
+        .order_by(models.Reminder.scheduled_time).offset(skip).limit(limit).all()
+    content = [
+        schemas.Reminder(
+            id=r.id, patient_id=r.patient_id, patient_name=r.patient_name, appointment_reason=r.appointment_reason,
+            language=r.language, method=r.method, scheduled_time=r.scheduled_time, sent=r.sent, sent_at=r.sent_at,
+        ).model_dump() for r in reminders
+    ]
+    # What FastAPI does with a response_model: validate the returned content, dump it, then json.dumps
+    adapter = _reminder_list()
+    return JSONResponse(adapter.dump_python(adapter.validate_python(content), mode="json")).body
+
+
+def _projected_page(db, patient_id, skip: int, limit: int) -> bytes:
+    from app import models, schemas
+    from app.utils.encoding import models_response, schema_columns
+
+    rows = db.query(*schema_columns(models.Reminder, schemas.Reminder)).filter(models.Reminder.patient_id == patient_id) \
+        .order_by(models.Reminder.scheduled_time).offset(skip).limit(limit).all()
+    return models_response(_reminder_list(), rows).body
+
+
+@lru_cache(maxsize=1)
+def _reminder_list():
+    # Same adapter as app.routers.reminders.REMINDER_LIST, built once
+    from pydantic import TypeAdapter
+    from app import schemas
+
+    return TypeAdapter(List[schemas.Reminder])
+
+
+def run_case(session_factory, path: str, patient_id, rows: int, page_size: int,
+             min_seconds: float = 0.0) -> Dict[str, object]:
+    """
+    Time one path over every page of the patient's reminders.
+
+    Args:
+        session_factory: Session factory of the seeded database.
+        path: One of PATHS.
+        patient_id: Patient whose reminders are paged.
+        rows: Number of seeded reminders.
+        page_size: Reminders per page.
+        min_seconds: Minimum measured time.
+
+    Returns:
+        Result with rows/second, p50/p99/mean page latency in milliseconds and the page size in bytes.
+    """
+    from app.utils.metrics import LatencyRecorder
+
+    load = _orm_page if path == "orm" else _projected_page
+    recorder = LatencyRecorder(path, reservoir_size=100_000)
+    measured_rows = 0
+    page_bytes = 0
+    started = time.perf_counter()
+    while True:
+        for skip in range(0, rows - page_size + 1, page_size):
+            db = session_factory()
+            try:
+                with recorder.time():
+                    body = load(db, patient_id, skip, page_size)
+            finally:
+                db.close()
+            measured_rows += page_size
+            page_bytes = len(body)
+        if time.perf_counter() - started >= min_seconds:
+            break
+    snapshot = recorder.snapshot()
+    return {
+        "path": path,
+        "page_size": page_size,
+        "rows": measured_rows,
+        "pages": snapshot["count"],
+        "rows_per_second": measured_rows / snapshot["total"] if snapshot["total"] else 0.0,
+        "p50_ms": snapshot["p50"] * 1000,
+        "p99_ms": snapshot["p99"] * 1000,
+        "mean_ms": snapshot["mean"] * 1000,
+        "page_bytes": page_bytes,
+    }
+
+
+def _print_table(results: List[Dict[str, object]]) -> None:
+    print(f"{'path':<10} {'page':>5} {'rows/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'bytes':>8}")
+    for entry in results:
+        print(f"{entry['path']:<10} {entry['page_size']:>5} {entry['rows_per_second']:>10.0f} "
+              f"{entry['p50_ms']:>9.2f} {entry['p99_ms']:>9.2f} {entry['page_bytes']:>8}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark loading and serializing pages of reminders.")
+    parser.add_argument("--rows", type=int, default=5000, help="Seeded reminders")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--min-seconds", type=float, default=2.0, help="Minimum measured time per path")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+    if args.page_size > args.rows:
+        parser.error("--page-size is larger than --rows")
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    import pydantic
+    import sqlalchemy
+    from app import models
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    patient_id = seed_reminders(session_factory, args.rows)
+
+    results = []
+    for path in PATHS:
+        # One unmeasured page first, so imports and statement compilation are not timed
+        run_case(session_factory, path, patient_id, args.page_size, args.page_size)
+        results.append(run_case(session_factory, path, patient_id, args.rows, args.page_size, args.min_seconds))
+    _print_table(results)
+
+    if args.output:
+        report = {
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "rows": args.rows, "page_size": args.page_size,
+                "python": platform.python_version(), "sqlalchemy": sqlalchemy.__version__,
+                "pydantic": pydantic.VERSION, "machine": platform.machine(), "cpus": os.cpu_count(),
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Drive a mixed workload against the API at a target request rate.
+
+    python -m loadtest.run --rps 50 --duration 60 --output loadtest.json
+    python -m loadtest.run --url http://staging:8000 --rps 20 --max-error-rate 0.01 --max-p99-ms 500
+
+Without --url, the API is started with loadtest.serve (local stand-ins) in a subprocess.
+Requests are sent open-loop on a fixed schedule, and latency is measured from each
+request's scheduled time, so a slow server shows up as latency instead of silently
+lowering the offered load.
+"""
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from app.utils.metrics import LatencyRecorder
+from loadtest.scenarios import ADMIN_NAME, PATIENT_NAME, SCENARIOS, Session, login
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import httpx
+
+DEFAULT_RPS = 20.0
+DEFAULT_DURATION = 30.0
+DEFAULT_MAX_IN_FLIGHT = 256  # Requests beyond this are counted as dropped by the generator
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """
+    Parse a scenario mix such as 'reminder_list=50,submit=10'; omitted scenarios are not run.
+
+    Args:
+        value: Comma-separated name=weight pairs.
+
+    Returns:
+        Weights keyed by scenario name.
+
+    Raises:
+        ValueError: If a scenario is unknown or a weight is not a non-negative integer.
+    """
+    weights = {}
+    for item in value.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {name}. Must be one of {', '.join(SCENARIOS)}")
+        weights[name] = int(weight)
+        if weights[name] < 0:
+            raise ValueError(f"Negative weight for {name}")
+    return weights
+
+
+class Results:
+    """Per-scenario latency recorders and status counts."""
+
+    def __init__(self, scenarios, expected: int):
+        self.recorders = {name: LatencyRecorder(name, reservoir_size=max(expected, 1)) for name in scenarios}
+        self.statuses = {name: collections.Counter() for name in scenarios}
+        self.dropped = collections.Counter()
+
+    def record(self, name: str, seconds: float, status: str) -> None:
+        self.recorders[name].observe(seconds, error=not status.startswith("2"))
+        self.statuses[name][status] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Dict[str, object]]:
+        report = {}
+        for name, recorder in self.recorders.items():
+            snapshot = recorder.snapshot()
+            if not snapshot["count"] and not self.dropped[name]:
+                continue
+            report[name] = {
+                "requests": snapshot["count"],
+                "throughput_rps": snapshot["count"] / elapsed if elapsed else 0.0,
+                "error_rate": snapshot["errors"] / snapshot["count"] if snapshot["count"] else 0.0,
+                "p50_ms": snapshot["p50"] * 1000,
+                "p95_ms": snapshot["p95"] * 1000,
+                "p99_ms": snapshot["p99"] * 1000,
+                "max_ms": snapshot["max"] * 1000,
+                "statuses": dict(self.statuses[name]),
+                "dropped": self.dropped[name],
+            }
+        return report
+
+
+async def _send(client: httpx.AsyncClient, session: Session, name: str, scheduled: float, results: Results) -> None:
+    request, _ = SCENARIOS[name]
+    try:
+        response = await request(client, session)
+        status = str(response.status_code)
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    results.record(name, time.perf_counter() - scheduled, status)
+
+
+async def drive(url: str, rps: float, duration: float, mix: Dict[str, int], patients: int,
+                max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, seed: int = 0) -> Dict[str, object]:
+    """
+    Log in as the seeded users, then send the scenario mix at ``rps`` for ``duration`` seconds.
+
+    Args:
+        url: API base URL.
+        rps: Target requests per second.
+        duration: Seconds of load.
+        mix: Scenario weights.
+        patients: Number of seeded patient accounts to act as.
+        max_in_flight: Outstanding requests above which new ones are dropped.
+        seed: Random seed for scenario choice and request parameters.
+
+    Returns:
+        Report with overall and per-scenario results.
+    """
+    from benchmarks.corpus import generate_corpus
+
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        admin_token = await login(client, ADMIN_NAME)
+        identities = []
+        for index in range(patients):
+            name = PATIENT_NAME.format(index)
+            token = await login(client, name)
+            identities.append((_patient_id(token), name, token))
+        session = Session(admin_token, identities, rng)
+        session.texts = [("french", text) for text in generate_corpus("french", 100, seed=seed)] + \
+            [("english", text) for text in generate_corpus("english", 100, seed=seed)]
+
+        names = [name for name, weight in mix.items() if weight]
+        weights = [mix[name] for name in names]
+        total = int(rps * duration)
+        results = Results(names, total)
+        in_flight = set()
+        started = time.perf_counter()
+        for number in range(total):
+            scheduled = started + number / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = rng.choices(names, weights)[0]
+            if len(in_flight) >= max_in_flight:
+                results.dropped[name] += 1
+                continue
+            task = asyncio.create_task(_send(client, session, name, scheduled, results))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.wait(in_flight)
+        elapsed = time.perf_counter() - started
+
+    scenarios = results.summary(elapsed)
+    requests = sum(entry["requests"] for entry in scenarios.values())
+    errors = sum(entry["requests"] * entry["error_rate"] for entry in scenarios.values())
+    return {
+        "target_rps": rps,
+        "duration": duration,
+        "elapsed": elapsed,
+        "requests": requests,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+        "error_rate": errors / requests if requests else 0.0,
+        "dropped": sum(results.dropped.values()),
+        "scenarios": scenarios,
+    }
+
+
+def _patient_id(token: str) -> str:
+    from jose import jwt
+    return jwt.get_unverified_claims(token)["pid"]
+
+
+def _print_report(report: Dict[str, object]) -> None:
+    print(f"{'scenario':<16} {'requests':>8} {'rps':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'max ms':>9}  statuses")
+    for name, entry in report["scenarios"].items():
+        statuses = " ".join(f"{status}:{count}" for status, count in sorted(entry["statuses"].items()))
+        if entry["dropped"]:
+            statuses += f" dropped:{entry['dropped']}"
+        print(f"{name:<16} {entry['requests']:>8} {entry['throughput_rps']:>7.1f} {entry['error_rate']:>7.1%} "
+              f"{entry['p50_ms']:>9.1f} {entry['p95_ms']:>9.1f} {entry['p99_ms']:>9.1f} {entry['max_ms']:>9.1f}  {statuses}")
+    print(f"total: {report['requests']} requests, {report['throughput_rps']:.1f} req/s "
+          f"(target {report['target_rps']:.1f}), {report['error_rate']:.1%} errors, {report['dropped']} dropped")
+
+
+def _start_server(port: int, patients: int, extra: List[str], log_path: str) -> subprocess.Popen:
+    # Server errors (tracebacks of 500s) go to log_path rather than interleaving with the report
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "loadtest.serve", "--port", str(port), "--patients", str(patients), *extra],
+            cwd=backend, stdout=subprocess.PIPE, stderr=log, text=True,
+        )
+    for line in process.stdout:
+        if line.strip() == "ready":
+            return process
+    raise RuntimeError(f"loadtest.serve exited with status {process.wait()}, see {log_path}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the API with a mixed scenario workload.")
+    parser.add_argument("--url", help="API to load; default starts loadtest.serve locally")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the local server")
+    parser.add_argument("--serve-args", default="", help="Extra loadtest.serve arguments, e.g. '--database-url ...'")
+    parser.add_argument("--server-log", default="loadtest-server.log", help="Standard error of the local server")
+    parser.add_argument("--rps", type=float, default=DEFAULT_RPS)
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION)
+    parser.add_argument("--mix", type=parse_mix, default={name: weight for name, (_, weight) in SCENARIOS.items()},
+                        help="Scenario weights, e.g. 'reminder_list=50,reminder_search=40,submit=10'")
+    parser.add_argument("--patients", type=int, default=20, help="Seeded patient accounts to act as")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--max-error-rate", type=float, help="Exit with status 1 above this overall error rate")
+    parser.add_argument("--max-p99-ms", type=float, help="Exit with status 1 if a scenario's p99 exceeds this")
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url
+    if url is None:
+        server = _start_server(args.port, args.patients, args.serve_args.split(), args.server_log)
+        url = f"http://127.0.0.1:{args.port}"
+    try:
+        report = asyncio.run(drive(url, args.rps, args.duration, args.mix, args.patients, args.max_in_flight, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report["created_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    report["url"] = url if args.url else "local stand-ins"
+    _print_report(report)
+    if server is not None:
+        print(f"server log: {args.server_log}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failed = args.max_error_rate is not None and report["error_rate"] > args.max_error_rate
+    if args.max_p99_ms is not None:
+        failed |= any(entry["p99_ms"] > args.max_p99_ms for entry in report["scenarios"].values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
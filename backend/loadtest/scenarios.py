@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Tuple
+from uuid import uuid4
+import random
+import httpx
+
+ADMIN_NAME = "loadtest-admin"
+PASSWORD = "loadtest-password"
+PATIENT_NAME = "loadtest-patient-{:04d}"
+
+APPOINTMENT_REASONS = ["Visite de suivi", "Consultation prénatale", "Contrôle de tension", "Vaccination",
+                       "Follow-up visit", "Diabetes check", "Résultats de laboratoire", "Dental check-up"]
+MEDICATIONS = ["Aspirine", "Paracétamol", "Metformine", "Amoxicilline", None]
+CONSULTATIONS = ["Cardiologie", "Pédiatrie", "Maternité", "Médecine générale", None]
+SEARCH_TERMS = ["suivi", "tension", "cardiologie", "vaccination", "diabetes", "laboratoire", "aspirine"]
+DEPARTMENTS = ["Cardiology", "Pediatrics", "Maternity", "General", "Laboratory"]
+THEMES = ["Wait time", "Staff attitude", "Cleanliness", "Billing", "No theme"]
+
+
+def seed(db, patients: int = 20, reminders_per_patient: int = 100, feedback_per_patient: int = 100,
+         due_reminders: int = 50, seed_value: int = 0) -> None:
+    """
+    Fill an empty database with an admin, patients, reminders and analyzed feedback.
+
+    Args:
+        db: Database session.
+        patients: Number of patient accounts (all share PASSWORD).
+        reminders_per_patient: Reminders per patient, spread over the next 30 days.
+        feedback_per_patient: Feedback rows per patient, spread over the last 90 days.
+        due_reminders: Reminders already due, for the trigger scenario.
+        seed_value: Random seed.
+    """
+    from app import crud, models
+    from benchmarks.corpus import generate_corpus
+
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    crud.create_patient(db, name=ADMIN_NAME, password=PASSWORD, role="admin", phone_number="+237600000000")
+    texts = generate_corpus("french", 200, seed=seed_value) + generate_corpus("english", 200, seed=seed_value)
+    for index in range(patients):
+        phone = f"+2376{index:08d}"
+        patient = crud.create_patient(db, name=PATIENT_NAME.format(index), password=PASSWORD, role="patient",
+                                      phone_number=phone)
+        rows = []
+        for number in range(reminders_per_patient):
+            rows.append(models.Reminder(
+                patient_id=patient.patient_id, patient_name=patient.name, phone_number=phone,
+                appointment_reason=rng.choice(APPOINTMENT_REASONS), medication_list=rng.choice(MEDICATIONS),
+                consultation_list=rng.choice(CONSULTATIONS), language=rng.choice(("french", "english")),
+                method=rng.choice(("whatsapp", "sms", "call")),
+                scheduled_time=now + timedelta(minutes=rng.randint(60, 30 * 24 * 60)),
+            ))
+        for number in range(feedback_per_patient):
+            text = rng.choice(texts)
+            rows.append(models.Feedback(
+                feedback_id=f"LT-SEED-{index}-{number}", patient_id=patient.patient_id, text=text,
+                rating=rng.randint(1, 5), language="french" if text in texts[:200] else "english",
+                sentiment=rng.choice(("Positive", "Negative", "Neutral")), theme=rng.choice(THEMES),
+                urgent=rng.random() < 0.1, department=rng.choice(DEPARTMENTS),
+                submitted_at=now - timedelta(minutes=rng.randint(0, 90 * 24 * 60)),
+            ))
+        db.add_all(rows)
+        db.commit()
+    due = db.query(models.Reminder).limit(due_reminders).all()
+    for reminder in due:
+        reminder.scheduled_time = now - timedelta(minutes=rng.randint(1, 60))
+    db.commit()
+
+
+class Session:
+    """Tokens and identities the scenarios act as."""
+
+    def __init__(self, admin_token: str, patients: List[Tuple[str, str, str]], rng: random.Random):
+        self.admin_token = admin_token
+        self.patients = patients  # (patient_id, name, token)
+        self.rng = rng
+        self.texts: List[Tuple[str, str]] = []
+
+    def admin(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.admin_token}"}
+
+    def patient(self) -> Tuple[str, str, Dict[str, str]]:
+        patient_id, name, token = self.rng.choice(self.patients)
+        return patient_id, name, {"Authorization": f"Bearer {token}"}
+
+
+async def login(client: httpx.AsyncClient, name: str) -> str:
+    response = await client.post("/auth/token", data={"username": name, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def _login(client: httpx.AsyncClient, session: Session) -> httpx.Response:
+    _, name, _ = session.patient()
+    return await client.post("/auth/token", data={"username": name, "password": PASSWORD})
+
+
+async def _submit(client: httpx.AsyncClient, session: Session) -> httpx.Response:
+    patient_id, _, headers = session.patient()
+    language, text = session.rng.choice(session.texts)
+    return await client.post("/feedback/submit", headers=headers, json={
+        "feedback_id": f"LT-{uuid4().hex[:16]}", "text": text, "rating": session.rng.randint(1, 5),
+        "language": language, "department": session.rng.choice(DEPARTMENTS), "patient_id": patient_id,
+    })
+
+
+async def _dashboard(client: httpx.AsyncClient, session: Session) -> httpx.Response:
+    return await client.get("/feedback/dashboard/metrics", headers=session.admin())
+
+
+async def _reminder_list(client: httpx.AsyncClient, session: Session) -> httpx.Response:
+    patient_id, _, headers = session.patient()
+    return await client.get("/reminders/list", headers=headers,
+                            params={"patient_id": patient_id, "skip": session.rng.randint(0, 50), "limit": 20})
+
+
+async def _reminder_search(client: httpx.AsyncClient, session: Session) -> httpx.Response:
+    patient_id, _, headers = session.patient()
+    return await client.get("/reminders/search", headers=headers,
+                            params={"patient_id": patient_id, "q": session.rng.choice(SEARCH_TERMS), "limit": 20})
+
+
+async def _trigger(client: httpx.AsyncClient, session: Session) -> httpx.Response:
+    return await client.post("/reminders/trigger", headers=session.admin())
+
+
+# Scenario name -> (request, default weight in the mix)
+SCENARIOS: Dict[str, Tuple[Callable[[httpx.AsyncClient, Session], Awaitable[httpx.Response]], int]] = {
+    "login": (_login, 5),
+    "submit": (_submit, 10),
+    "dashboard": (_dashboard, 5),
+    "reminder_list": (_reminder_list, 40),
+    "reminder_search": (_reminder_search, 38),
+    "trigger": (_trigger, 2),
+}
@@ -0,0 +1,80 @@
+"""
+Boot the API against local stand-ins for load testing.
+
+    python -m loadtest.serve --port 8765
+
+Uses a fresh SQLite database (or an empty PostgreSQL database given with --database-url,
+migrated with Alembic), fakeredis instead of Redis, a fake Twilio HTTP server, and the
+benchmarks' tiny offline NLP models, then seeds it with loadtest.scenarios.seed.
+Prints 'ready' once the server accepts requests.
+"""
+from typing import List, Optional
+from loadtest.standins import FAKE_TWILIO_LATENCY, start_fake_twilio, use_fakeredis
+import argparse
+import os
+import secrets
+import sys
+import tempfile
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the API against local stand-ins.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database-url", help="Empty PostgreSQL database; default is a temporary SQLite file")
+    parser.add_argument("--redis", choices=("fake", "real"), default="fake",
+                        help="'real' uses DELIVERY_REDIS_URL / CELERY_BROKER_URL")
+    parser.add_argument("--nlp", choices=("tiny", "full"), default="tiny")
+    parser.add_argument("--twilio-latency", type=float, default=FAKE_TWILIO_LATENCY)
+    parser.add_argument("--patients", type=int, default=20)
+    parser.add_argument("--reminders-per-patient", type=int, default=100)
+    parser.add_argument("--feedback-per-patient", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    twilio = start_fake_twilio(args.twilio_latency)
+    os.environ.update({
+        "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(workdir, 'loadtest.db')}",
+        "ENV": "development",
+        "JWT_SECRET_KEY": secrets.token_hex(32),
+        "TWILIO_ACCOUNT_SID": "AC" + "0" * 32,
+        "TWILIO_API_BASE_URL": f"http://127.0.0.1:{twilio.server_port}",
+        "LOG_FILE": os.path.join(workdir, "app.log"),
+    })
+    if args.redis == "fake":
+        os.environ["DELIVERY_BUFFER_BACKEND"] = os.environ["IDEMPOTENCY_BACKEND"] = "redis"
+        use_fakeredis()
+    from benchmarks.nlp_bench import configure_models
+    configure_models(args.nlp)
+
+    if args.database_url:
+        from alembic import command
+        from alembic.config import Config
+        command.upgrade(Config(os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic.ini")), "head")
+
+    import uvicorn
+    from app.database import SessionLocal
+    from app.main import app
+    from loadtest.scenarios import seed
+
+    db = SessionLocal()
+    try:
+        seed(db, args.patients, args.reminders_per_patient, args.feedback_per_patient)
+    finally:
+        db.close()
+
+    config = uvicorn.Config(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+    server = uvicorn.Server(config)
+    original_startup = server.startup
+
+    async def startup(sockets=None):
+        await original_startup(sockets)
+        print("ready", flush=True)
+
+    server.startup = startup
+    server.run()
+    sys.exit(0 if server.started else 1)
+
+
+if __name__ == "__main__":
+    main()
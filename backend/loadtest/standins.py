@@ -0,0 +1,72 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import itertools
+import json
+import threading
+import time
+
+# Latency of the fake Twilio API, close to what the real API shows from Cameroon
+FAKE_TWILIO_LATENCY = 0.15
+
+
+class _FakeTwilioHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    sids = itertools.count(1)
+    latency = FAKE_TWILIO_LATENCY
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+        prefix = "CA" if self.path.endswith("/Calls.json") else "SM"
+        body = json.dumps({"sid": f"{prefix}{next(self.sids):032d}", "status": "queued"}).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_twilio(latency: float = FAKE_TWILIO_LATENCY, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """
+    Serve a stand-in for the Twilio Messages and Calls APIs from a daemon thread.
+
+    Every POST is accepted after ``latency`` seconds and answered with a fresh SID; point
+    TWILIO_API_BASE_URL at the returned server to use it.
+
+    Args:
+        latency: Seconds to wait before answering each request.
+        host: Interface to bind.
+        port: Port to bind (0 picks a free one).
+
+    Returns:
+        The running server; its URL is http://<host>:<server.server_port>.
+    """
+    handler = type("FakeTwilioHandler", (_FakeTwilioHandler,), {"latency": latency})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="fake-twilio", daemon=True).start()
+    return server
+
+
+def use_fakeredis() -> None:
+    """
+    Replace redis.Redis with fakeredis in this process, so Redis-backed features run without a server.
+
+    Must run before the app is imported. All clients share one in-memory server.
+    """
+    import fakeredis
+    import redis
+
+    server = fakeredis.FakeServer()
+
+    class SharedFakeRedis(fakeredis.FakeRedis):
+        def __init__(self, *args, **kwargs):
+            kwargs.pop("connection_pool", None)
+            super().__init__(*args, server=server, **kwargs)
+
+        @classmethod
+        def from_url(cls, url, **kwargs):
+            return cls(**kwargs)
+
+    redis.Redis = redis.StrictRedis = SharedFakeRedis
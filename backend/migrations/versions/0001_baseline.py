@@ -0,0 +1,73 @@
+"""Baseline schema, as previously created by Base.metadata.create_all
+
+Databases created before migrations were introduced already have these tables:
+mark them with `alembic stamp 0001` and then run `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-08-04
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "patients",
+        sa.Column("patient_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("phone_number", sa.String(20), nullable=True),
+        sa.Column("role", sa.String(20), nullable=False),
+        comment="Stores patient and admin user data with encrypted phone numbers.",
+    )
+    op.create_index("ix_patients_patient_id", "patients", ["patient_id"])
+    op.create_index("ix_patients_name", "patients", ["name"], unique=True)
+
+    op.create_table(
+        "feedback",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("feedback_id", sa.String(50), nullable=False),
+        sa.Column("patient_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("patients.patient_id"), nullable=False),
+        sa.Column("text", sa.Text, nullable=False),
+        sa.Column("rating", sa.Integer, nullable=False),
+        sa.Column("language", sa.String(20), nullable=False),
+        sa.Column("sentiment", sa.String(20), nullable=True),
+        sa.Column("theme", sa.String(100), nullable=True),
+        sa.Column("urgent", sa.Boolean, nullable=False),
+        sa.Column("department", sa.String(50), nullable=False),
+        sa.Column("submitted_at", sa.DateTime, nullable=False),
+        comment="Stores patient feedback with sentiment analysis and urgency flags.",
+    )
+    op.create_index("ix_feedback_id", "feedback", ["id"])
+    op.create_index("ix_feedback_feedback_id", "feedback", ["feedback_id"], unique=True)
+
+    op.create_table(
+        "reminders",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("patient_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("patients.patient_id"), nullable=False),
+        sa.Column("patient_name", sa.String(100), nullable=False),
+        sa.Column("phone_number", sa.String(20), nullable=True),
+        sa.Column("appointment_reason", sa.String(255), nullable=False),
+        sa.Column("medication_list", sa.Text, nullable=True),
+        sa.Column("consultation_list", sa.Text, nullable=True),
+        sa.Column("language", sa.String(20), nullable=False),
+        sa.Column("method", sa.String(20), nullable=False),
+        sa.Column("scheduled_time", sa.DateTime, nullable=False),
+        sa.Column("sent", sa.Boolean, nullable=False),
+        sa.Column("sent_at", sa.DateTime, nullable=True),
+        comment="Stores reminders for patients with encrypted phone numbers.",
+    )
+    op.create_index("ix_reminders_id", "reminders", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("reminders")
+    op.drop_table("feedback")
+    op.drop_table("patients")
@@ -0,0 +1,42 @@
+"""Delivery receipts, token versions and encrypted phone number columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-08-04
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("patients", sa.Column("token_version", sa.Integer, nullable=False, server_default="0"))
+    op.add_column("reminders", sa.Column("message_sid", sa.String(64), nullable=True))
+    op.add_column("reminders", sa.Column("delivery_status", sa.String(20), nullable=True))
+    op.add_column("reminders", sa.Column("delivery_updated_at", sa.DateTime, nullable=True))
+    op.create_index("ix_reminders_message_sid", "reminders", ["message_sid"])
+    for table in ("patients", "reminders"):
+        # Fernet tokens are far longer than the plaintext numbers (batch mode for SQLite)
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column("phone_number", type_=sa.String(255), existing_type=sa.String(20), existing_nullable=True)
+        op.add_column(table, sa.Column("phone_number_index", sa.String(64), nullable=True))
+        op.create_index(f"ix_{table}_phone_number_index", table, ["phone_number_index"])
+
+
+def downgrade() -> None:
+    for table in ("patients", "reminders"):
+        op.drop_index(f"ix_{table}_phone_number_index", table_name=table)
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("phone_number_index")
+            batch.alter_column("phone_number", type_=sa.String(20), existing_type=sa.String(255), existing_nullable=True)
+    op.drop_index("ix_reminders_message_sid", table_name="reminders")
+    with op.batch_alter_table("reminders") as batch:
+        batch.drop_column("delivery_updated_at")
+        batch.drop_column("delivery_status")
+        batch.drop_column("message_sid")
+    with op.batch_alter_table("patients") as batch:
+        batch.drop_column("token_version")
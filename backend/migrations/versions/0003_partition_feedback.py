@@ -0,0 +1,150 @@
+"""Partition feedback by month on submitted_at and add analytics indexes
+
+PostgreSQL requires primary keys and unique constraints of a partitioned table to
+include the partition key, so the primary key becomes (id, submitted_at) and the
+unique index on feedback_id becomes a plain index. Uniqueness of feedback_id is kept by
+triggers claiming each ID in feedback_keys (primary key feedback_id) in the inserting
+transaction, so a duplicate insert fails with a unique violation. Partitions cover every
+month holding existing rows plus the coming months; app.utils.partitions.ensure_feedback_partitions
+keeps creating new ones. Rows outside every partition land in feedback_default.
+
+Other databases keep the plain table from 0001, with its unique feedback_id index, and
+get the same analytics index.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-08-04
+"""
+from datetime import date
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+COLUMNS = ("id, feedback_id, patient_id, text, rating, language, sentiment, theme, urgent, department, "
+           "submitted_at")
+
+
+def _month_start(day: date, offset: int = 0) -> date:
+    months = day.year * 12 + day.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+# Keep feedback_keys in step with feedback; a duplicate ID makes the INSERT fail with unique_violation
+FEEDBACK_KEY_DDL = [
+    """
+    CREATE FUNCTION feedback_claim_key() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO feedback_keys (feedback_id) VALUES (NEW.feedback_id);
+        ELSIF TG_OP = 'DELETE' THEN
+            DELETE FROM feedback_keys WHERE feedback_id = OLD.feedback_id;
+        ELSIF NEW.feedback_id <> OLD.feedback_id THEN
+            DELETE FROM feedback_keys WHERE feedback_id = OLD.feedback_id;
+            INSERT INTO feedback_keys (feedback_id) VALUES (NEW.feedback_id);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "CREATE TRIGGER feedback_claim_key AFTER INSERT OR DELETE OR UPDATE OF feedback_id ON feedback "
+    "FOR EACH ROW EXECUTE FUNCTION feedback_claim_key()",
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index("ix_feedback_department_submitted_at", "feedback", ["department", "submitted_at"])
+        return
+
+    # Keep the id sequence alive when the old table is dropped
+    op.execute("ALTER SEQUENCE feedback_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE feedback RENAME TO feedback_unpartitioned")
+    op.execute("ALTER TABLE feedback_unpartitioned RENAME CONSTRAINT feedback_pkey TO feedback_unpartitioned_pkey")
+    op.execute("ALTER INDEX ix_feedback_id RENAME TO ix_feedback_unpartitioned_id")
+    op.execute("ALTER INDEX ix_feedback_feedback_id RENAME TO ix_feedback_unpartitioned_feedback_id")
+
+    op.execute("""
+        CREATE TABLE feedback (
+            id INTEGER NOT NULL DEFAULT nextval('feedback_id_seq'),
+            feedback_id VARCHAR(50) NOT NULL,
+            patient_id UUID NOT NULL REFERENCES patients (patient_id),
+            text TEXT NOT NULL,
+            rating INTEGER NOT NULL,
+            language VARCHAR(20) NOT NULL,
+            sentiment VARCHAR(20),
+            theme VARCHAR(100),
+            urgent BOOLEAN NOT NULL,
+            department VARCHAR(50) NOT NULL,
+            submitted_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT feedback_pkey PRIMARY KEY (id, submitted_at)
+        ) PARTITION BY RANGE (submitted_at)
+    """)
+    op.execute("COMMENT ON TABLE feedback IS 'Stores patient feedback with sentiment analysis and urgency flags.'")
+    op.execute("ALTER SEQUENCE feedback_id_seq OWNED BY feedback.id")
+
+    # Offline (--sql) runs cannot look at the data: older rows then go to feedback_default
+    first = None
+    if not context.is_offline_mode():
+        first = op.get_bind().execute(sa.text("SELECT min(submitted_at) FROM feedback_unpartitioned")).scalar()
+    today = date.today()
+    lower = _month_start(first.date() if first else today)
+    while lower <= _month_start(today, MONTHS_AHEAD):
+        upper = _month_start(lower, 1)
+        op.execute(f"CREATE TABLE feedback_y{lower.year}m{lower.month:02d} PARTITION OF feedback "
+                   f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')")
+        lower = upper
+    op.execute("CREATE TABLE feedback_default PARTITION OF feedback DEFAULT")
+
+    op.execute(f"INSERT INTO feedback ({COLUMNS}) SELECT {COLUMNS} FROM feedback_unpartitioned")
+    op.execute("DROP TABLE feedback_unpartitioned")
+
+    # Indexes on the parent are created on every partition
+    op.execute("CREATE INDEX ix_feedback_feedback_id ON feedback (feedback_id)")
+    op.execute("CREATE INDEX ix_feedback_department_submitted_at ON feedback (department, submitted_at)")
+    op.execute("SELECT setval('feedback_id_seq', coalesce((SELECT max(id) FROM feedback), 0) + 1, false)")
+
+    op.execute("CREATE TABLE feedback_keys (feedback_id VARCHAR(50) PRIMARY KEY)")
+    op.execute("COMMENT ON TABLE feedback_keys IS 'Claimed feedback IDs: the unique constraint partitioned feedback cannot have.'")
+    op.execute("INSERT INTO feedback_keys (feedback_id) SELECT feedback_id FROM feedback")
+    for statement in FEEDBACK_KEY_DDL:
+        op.execute(statement)
+    op.execute("ANALYZE feedback")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        op.drop_index("ix_feedback_department_submitted_at", table_name="feedback")
+        return
+
+    op.execute("DROP TRIGGER feedback_claim_key ON feedback")
+    op.execute("DROP FUNCTION feedback_claim_key()")
+    op.execute("DROP TABLE feedback_keys")
+    op.execute("ALTER SEQUENCE feedback_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE feedback RENAME TO feedback_partitioned")
+    op.execute("ALTER TABLE feedback_partitioned RENAME CONSTRAINT feedback_pkey TO feedback_partitioned_pkey")
+    op.execute("ALTER INDEX ix_feedback_feedback_id RENAME TO ix_feedback_partitioned_feedback_id")
+    op.execute("""
+        CREATE TABLE feedback (
+            id INTEGER NOT NULL DEFAULT nextval('feedback_id_seq') PRIMARY KEY,
+            feedback_id VARCHAR(50) NOT NULL,
+            patient_id UUID NOT NULL REFERENCES patients (patient_id),
+            text TEXT NOT NULL,
+            rating INTEGER NOT NULL,
+            language VARCHAR(20) NOT NULL,
+            sentiment VARCHAR(20),
+            theme VARCHAR(100),
+            urgent BOOLEAN NOT NULL,
+            department VARCHAR(50) NOT NULL,
+            submitted_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        )
+    """)
+    op.execute("ALTER SEQUENCE feedback_id_seq OWNED BY feedback.id")
+    op.execute(f"INSERT INTO feedback ({COLUMNS}) SELECT {COLUMNS} FROM feedback_partitioned")
+    op.execute("DROP TABLE feedback_partitioned CASCADE")
+    op.create_index("ix_feedback_id", "feedback", ["id"])
+    op.create_index("ix_feedback_feedback_id", "feedback", ["feedback_id"], unique=True)
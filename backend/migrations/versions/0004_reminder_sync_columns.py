@@ -0,0 +1,51 @@
+"""Reminder uid and updated_at for upstream sync, and sync_state watermarks
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-08-04
+"""
+from alembic import context, op
+import sqlalchemy as sa
+import uuid
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Batch mode: SQLite cannot add a column with a non-constant default in place
+    with op.batch_alter_table("reminders") as batch:
+        batch.add_column(sa.Column("uid", sa.Uuid, nullable=True))
+        batch.add_column(sa.Column("updated_at", sa.DateTime, nullable=False, server_default=sa.func.now()))
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("UPDATE reminders SET uid = gen_random_uuid()")
+    elif not context.is_offline_mode():
+        ids = [row[0] for row in bind.execute(sa.text("SELECT id FROM reminders"))]
+        reminders = sa.table("reminders", sa.column("id", sa.Integer), sa.column("uid", sa.Uuid))
+        for reminder_id in ids:
+            bind.execute(reminders.update().where(reminders.c.id == reminder_id).values(uid=uuid.uuid4()))
+    with op.batch_alter_table("reminders") as batch:
+        batch.alter_column("uid", existing_type=sa.Uuid, nullable=False)
+        batch.create_unique_constraint("uq_reminders_uid", ["uid"])
+    op.create_index("ix_reminders_updated_at_id", "reminders", ["updated_at", "id"])
+
+    op.create_table(
+        "sync_state",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("last_id", sa.Integer, nullable=False),
+        sa.Column("last_updated_at", sa.DateTime, nullable=True),
+        sa.Column("synced_at", sa.DateTime, nullable=True),
+        comment="Upstream sync watermarks of an offline clinic node.",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sync_state")
+    op.drop_index("ix_reminders_updated_at_id", table_name="reminders")
+    with op.batch_alter_table("reminders") as batch:
+        batch.drop_constraint("uq_reminders_uid", type_="unique")
+        batch.drop_column("updated_at")
+        batch.drop_column("uid")
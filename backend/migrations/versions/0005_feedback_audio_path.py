@@ -0,0 +1,23 @@
+"""Feedback audio_path for transcribed voice notes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-08-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # On PostgreSQL the column is added to every monthly partition of feedback
+    op.add_column("feedback", sa.Column("audio_path", sa.String(255), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("feedback") as batch:
+        batch.drop_column("audio_path")
@@ -0,0 +1,34 @@
+"""Reminder tombstones and per-patient change index for delta sync
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-08-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_reminders_patient_id_updated_at_id", "reminders", ["patient_id", "updated_at", "id"])
+    op.create_table(
+        "reminder_tombstones",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("reminder_id", sa.Integer, nullable=False),
+        sa.Column("uid", sa.Uuid, nullable=False),
+        sa.Column("patient_id", sa.Uuid, nullable=False),
+        sa.Column("deleted_at", sa.DateTime, nullable=False),
+        comment="Reminders deleted from (or moved away from) a patient, for delta sync; pruned after REMINDER_TOMBSTONE_DAYS.",
+    )
+    op.create_index("ix_reminder_tombstones_patient_id_deleted_at_id", "reminder_tombstones",
+                    ["patient_id", "deleted_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reminder_tombstones_patient_id_deleted_at_id", table_name="reminder_tombstones")
+    op.drop_table("reminder_tombstones")
+    op.drop_index("ix_reminders_patient_id_updated_at_id", table_name="reminders")
@@ -0,0 +1,57 @@
+"""Feedback embeddings with an HNSW index for similar-feedback search
+
+On PostgreSQL embeddings are pgvector halfvec columns (float16, pgvector 0.8 or later for
+iterative index scans) indexed with HNSW on cosine distance. Other databases store the
+float16 bytes and search them exactly.
+
+Existing feedback gets its embedding when reanalyzed (POST /admin/feedback/reanalyze).
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-08-25
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.embeddings import EMBEDDING_DIM
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# HNSW graph degree and build-time candidate list: pgvector's defaults, good recall up to millions of rows
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+
+
+def upgrade() -> None:
+    comment = "Feedback text embeddings for similar-feedback search (HNSW-indexed on PostgreSQL)."
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_table(
+            "feedback_embeddings",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=False),
+            sa.Column("department", sa.String(50), nullable=False),
+            sa.Column("submitted_at", sa.DateTime, nullable=False),
+            sa.Column("embedding", sa.LargeBinary, nullable=False),
+            comment=comment,
+        )
+    else:
+        op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        op.execute(f"""
+            CREATE TABLE feedback_embeddings (
+                id INTEGER PRIMARY KEY,
+                department VARCHAR(50) NOT NULL,
+                submitted_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                embedding halfvec({EMBEDDING_DIM}) NOT NULL
+            )
+        """)
+        op.execute(f"COMMENT ON TABLE feedback_embeddings IS '{comment}'")
+        op.execute(f"CREATE INDEX ix_feedback_embeddings_embedding_hnsw ON feedback_embeddings "
+                   f"USING hnsw (embedding halfvec_cosine_ops) WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION})")
+    op.create_index("ix_feedback_embeddings_department_submitted_at", "feedback_embeddings",
+                    ["department", "submitted_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_feedback_embeddings_department_submitted_at", table_name="feedback_embeddings")
+    op.drop_table("feedback_embeddings")
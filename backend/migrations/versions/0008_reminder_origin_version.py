@@ -0,0 +1,32 @@
+"""Reminder origin node and version counter for upstream sync
+
+Reminders pushed by a clinic node record the node that dispatches them, and the node's
+version of the row last merged; every update of a reminder increments its version.
+
+Reminders ingested before this revision have no origin and stay dispatched centrally.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-09-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("reminders") as batch:
+        batch.add_column(sa.Column("origin_node", sa.String(100), nullable=True))
+        batch.add_column(sa.Column("origin_version", sa.Integer, nullable=True))
+        batch.add_column(sa.Column("version", sa.Integer, nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("reminders") as batch:
+        batch.drop_column("version")
+        batch.drop_column("origin_version")
+        batch.drop_column("origin_node")
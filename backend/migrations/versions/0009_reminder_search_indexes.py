@@ -0,0 +1,45 @@
+"""Reminder search indexes on PostgreSQL
+
+pg_trgm GIN indexes for substring matching and a GIN index over the per-language tsvector
+for ranked full-text search. They are built CONCURRENTLY, outside the migration transaction,
+so reminders stay writable while they build. Databases that already have them (created at
+startup by earlier versions) are left as they are. SQLite's FTS5 table is still created at
+startup (app.utils.search.create_search_indexes).
+
+A concurrent build that fails leaves an INVALID index behind: drop it and run the upgrade again.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-09-02
+"""
+from alembic import op
+from app.utils.search import PG_SEARCH_DOCUMENT, PG_SEARCH_VECTOR
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# The expressions must match app.utils.search verbatim for the planner to use the indexes
+INDEXES = {
+    "ix_reminders_search_trgm": f"USING gin ({PG_SEARCH_DOCUMENT} gin_trgm_ops)",
+    "ix_reminders_search_fts": f"USING gin (({PG_SEARCH_VECTOR}))",
+    "ix_reminders_appointment_reason_trgm": "USING gin (appointment_reason gin_trgm_ops)",
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON reminders {definition}")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
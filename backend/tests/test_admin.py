@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app import models, schemas
+from app.dependencies import create_access_token, get_current_user, get_db
+from app.routers import admin
+from datetime import datetime
+
+engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        models.Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def patient(db):
+    patient = models.Patient(name="Jane Doe", hashed_password="hash", role="patient")
+    db.add(patient)
+    db.commit()
+    return patient
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(admin.router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: client.user
+    client = TestClient(app)
+    client.user = schemas.Patient(patient_id="00000000-0000-0000-0000-000000000001", name="Admin", role="admin")
+    return client
+
+
+def authenticate(db, claims):
+    return asyncio.run(get_current_user(create_access_token(claims), db))
+
+
+def test_role_change_revokes_issued_tokens(client, db, patient):
+    claims = {"sub": patient.name, "role": "patient", "pid": str(patient.patient_id), "ver": 0}
+    assert authenticate(db, claims).role == "patient"
+
+    response = client.put(f"/admin/patients/{patient.patient_id}/role", params={"role": "admin"})
+    assert (response.status_code, response.json()["role"]) == (200, "admin")
+    with pytest.raises(HTTPException):
+        authenticate(db, claims)
+    assert authenticate(db, {**claims, "role": "admin", "ver": 1}).role == "admin"
+
+    assert client.put(f"/admin/patients/{patient.patient_id}/role", params={"role": "root"}).status_code == 422
+
+
+def test_patient_with_records_is_not_deleted(client, db, patient):
+    db.add(models.Feedback(feedback_id="FB-1", patient_id=patient.patient_id, text="", rating=3, language="english",
+                           department="Cardiology", submitted_at=datetime.utcnow()))
+    db.commit()
+    assert client.delete(f"/admin/patients/{patient.patient_id}").status_code == 409
+    assert db.query(models.Patient).count() == 1
+
+    db.query(models.Feedback).delete()
+    db.commit()
+    assert client.delete(f"/admin/patients/{patient.patient_id}").status_code == 200
+    assert client.delete(f"/admin/patients/{patient.patient_id}").status_code == 404
+
+
+def test_patient_endpoints_require_an_admin(client, patient):
+    client.user = schemas.Patient(patient_id=patient.patient_id, name=patient.name, role="patient")
+    assert client.put(f"/admin/patients/{patient.patient_id}/role", params={"role": "admin"}).status_code == 403
+    assert client.delete(f"/admin/patients/{patient.patient_id}").status_code == 403
+
+
+def test_tokens_without_a_version_are_rejected(db, patient):
+    with pytest.raises(HTTPException):
+        authenticate(db, {"sub": patient.name, "role": "patient"})
+    with pytest.raises(HTTPException):
+        authenticate(db, {"sub": patient.name, "role": "patient", "pid": str(patient.patient_id)})
@@ -0,0 +1,27 @@
+from benchmarks.corpus import LANGUAGES, corpus_stats, generate_corpus
+from benchmarks.nlp_bench import compare
+
+
+def test_corpora_are_reproducible_and_follow_length_profiles():
+    for language in LANGUAGES:
+        assert generate_corpus(language, 50, seed=3) == generate_corpus(language, 50, seed=3)
+        assert generate_corpus(language, 50, seed=3) != generate_corpus(language, 50, seed=4)
+    short = corpus_stats(generate_corpus("french", 300, profile="short"))
+    long = corpus_stats(generate_corpus("french", 300, profile="long"))
+    assert short["max_words"] <= 31 <= long["mean_words"]
+
+
+def test_compare_flags_throughput_and_tail_latency_regressions():
+    baseline = [
+        {"function": "analyze_sentiment", "language": "english", "batch_size": 8, "texts_per_second": 100.0, "p99_ms": 50.0},
+        {"function": "detect_urgency", "language": "english", "batch_size": 8, "texts_per_second": 100.0, "p99_ms": 1.0},
+    ]
+    results = [
+        {"function": "analyze_sentiment", "language": "english", "batch_size": 8, "texts_per_second": 95.0, "p99_ms": 80.0},
+        {"function": "detect_urgency", "language": "english", "batch_size": 8, "texts_per_second": 110.0, "p99_ms": 1.0},
+        {"function": "extract_themes", "language": "english", "batch_size": 64, "error": "failed"},
+    ]
+    comparisons = compare(results, baseline, threshold=0.2)
+    assert [(c["function"], c["regression"]) for c in comparisons] == [
+        ("analyze_sentiment", True), ("detect_urgency", False),
+    ]
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+from app import celery_app as celery_module
+from app.celery_app import celery_app, tune_worker_for_queues
+
+
+def test_tasks_are_routed_to_their_queue():
+    router = celery_app.amqp.router
+    queues = {
+        "app.tasks.trigger_reminders_task": "dispatch",
+        "app.tasks.analyze_feedback_task": "analysis",
+        "app.tasks.transcribe_feedback_task": "analysis",
+        "app.tasks.reanalyze_feedback_task": "analysis",
+        "app.tasks.export_feedback_csv_task": "exports",
+        "app.tasks.ensure_feedback_partitions_task": "default",
+    }
+    for name, queue in queues.items():
+        assert router.route({}, name)["queue"].name == queue
+
+
+def test_worker_prefetch_follows_its_queues(monkeypatch):
+    monkeypatch.setattr(celery_module, "worker_queues", set(celery_module.QUEUE_PREFETCH))
+    conf = SimpleNamespace()
+    tune_worker_for_queues(conf=conf, options={"queues": "dispatch,default"})
+    assert conf.worker_prefetch_multiplier == 4
+    assert celery_module.worker_queues == {"dispatch", "default"}
+
+    tune_worker_for_queues(conf=conf, options={"queues": ["analysis"]})
+    assert conf.worker_prefetch_multiplier == 1
+
+    # Without -Q the worker consumes every queue, and takes the most conservative prefetch
+    monkeypatch.setattr(celery_module, "worker_queues", set(celery_module.QUEUE_PREFETCH))
+    tune_worker_for_queues(conf=conf, options={})
+    assert conf.worker_prefetch_multiplier == 1
+
+
+def test_reanalysis_runs_one_task_per_batch(monkeypatch):
+    from app import tasks
+
+    batches = {0: (2, 7), 7: (2, 9), 9: (1, 12)}
+    queued = []
+    monkeypatch.setattr(tasks, "SessionLocal", lambda: SimpleNamespace(rollback=lambda: None, close=lambda: None))
+    monkeypatch.setattr(tasks, "reanalyze_feedback_batch",
+                        lambda db, start, end, after_id, batch_size: batches[after_id])
+    monkeypatch.setattr(tasks.reanalyze_feedback_task, "delay", lambda *args: queued.append(args))
+
+    tasks.reanalyze_feedback_task("2025-08-01T00:00:00", None, 2)
+    assert queued == [("2025-08-01T00:00:00", None, 2, 7)]
+    tasks.reanalyze_feedback_task(*queued[-1])
+    assert queued[-1] == ("2025-08-01T00:00:00", None, 2, 9)
+    # A short batch is the last one
+    tasks.reanalyze_feedback_task(*queued[-1])
+    assert len(queued) == 2
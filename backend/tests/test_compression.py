@@ -0,0 +1,55 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.utils.compression import CompressedBodyCache, CompressionMiddleware, choose_encoding
+
+PAYLOAD = {"themes": ["Temps d'attente", "Accueil"] * 200}
+
+
+def make_client():
+    cache = CompressedBodyCache(max_bytes=1024 * 1024)
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, cache=cache)
+
+    @app.get("/metrics")
+    def metrics():
+        return PAYLOAD
+
+    return TestClient(app), cache
+
+
+def test_choose_encoding_respects_weights_and_server_preference():
+    assert choose_encoding("gzip, deflate, br, zstd") == "br"
+    assert choose_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert choose_encoding("br;q=0, *") == "zstd"
+    assert choose_encoding("identity") is None
+
+
+def test_repeated_responses_are_compressed_once_and_revalidated():
+    client, cache = make_client()
+    first = client.get("/metrics", headers={"Accept-Encoding": "br"})
+    second = client.get("/metrics", headers={"Accept-Encoding": "br"})
+    assert first.headers["content-encoding"] == "br" and first.json() == PAYLOAD
+    assert first.headers["etag"] == second.headers["etag"]
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    revalidated = client.get("/metrics", headers={"Accept-Encoding": "br", "If-None-Match": first.headers["etag"]})
+    assert revalidated.status_code == 304 and revalidated.content == b""
+
+
+def test_cache_is_bounded_in_bytes():
+    cache = CompressedBodyCache(max_bytes=10)
+    cache.put('"a"', "br", b"123456")
+    cache.put('"b"', "br", b"123456")
+    assert cache.get('"a"', "br") is None
+    assert cache.get('"b"', "br") == b"123456"
+    assert cache.size == 6
+
+
+def test_bodies_decode_with_each_encoding():
+    client, _ = make_client()
+    for encoding in ("br", "zstd", "gzip"):
+        response = client.get("/metrics", headers={"Accept-Encoding": encoding})
+        assert response.headers["content-encoding"] == encoding
+        assert response.json() == PAYLOAD
+    plain = client.get("/metrics", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.headers["vary"] == "Accept-Encoding"
@@ -0,0 +1,135 @@
+import asyncio
+import pytest
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from twilio.request_validator import RequestValidator
+from app import crud, models
+from app.routers import reminders as reminders_router
+from app.utils import delivery
+from app.utils.reminders import TWILIO_AUTH_TOKEN
+from datetime import datetime, timedelta
+
+engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+T0 = datetime(2025, 8, 1, 9, 0)
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        models.Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def reminder(db):
+    patient = models.Patient(name="Jane Doe", hashed_password="hash", role="patient")
+    db.add(patient)
+    db.flush()
+    reminder = models.Reminder(patient_id=patient.patient_id, patient_name=patient.name, appointment_reason="Checkup",
+                               language="english", method="sms", scheduled_time=T0, sent=True, sent_at=T0,
+                               message_sid="SM1")
+    db.add(reminder)
+    db.commit()
+    return reminder
+
+
+def test_coalesce_keeps_the_most_advanced_status_per_sid():
+    receipts = [
+        ("SM1", "delivered", T0 + timedelta(seconds=2)),
+        ("SM1", "sent", T0 + timedelta(seconds=3)),  # Out of order: must not undo 'delivered'
+        ("SM2", "queued", T0),
+        ("SM2", "failed", T0 + timedelta(seconds=1)),
+        ("SM3", "read", T0),
+    ]
+    assert delivery.coalesce_receipts(receipts) == {
+        "SM1": ("delivered", T0 + timedelta(seconds=2)),
+        "SM2": ("failed", T0 + timedelta(seconds=1)),
+        "SM3": ("read", T0),
+    }
+
+
+def test_apply_never_moves_a_status_backwards(db, reminder):
+    assert crud.apply_delivery_receipts(db, {"SM1": ("delivered", T0 + timedelta(seconds=2))}) == 1
+    # A late 'sent' from a previous flush arrives after 'delivered' was stored
+    assert crud.apply_delivery_receipts(db, {"SM1": ("sent", T0 + timedelta(seconds=3))}) == 0
+    db.refresh(reminder)
+    assert (reminder.delivery_status, reminder.delivery_updated_at) == ("delivered", T0 + timedelta(seconds=2))
+
+    assert crud.apply_delivery_receipts(db, {"SM1": ("read", T0 + timedelta(seconds=4)), "SM9": ("sent", T0)}) == 1
+    db.refresh(reminder)
+    assert reminder.delivery_status == "read"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    buffer = delivery.MemoryReceiptBuffer()
+    monkeypatch.setattr(delivery, "get_receipt_buffer", lambda: buffer)
+    monkeypatch.setenv("ENV", "production")
+    app = FastAPI()
+    app.include_router(reminders_router.router)
+    client = TestClient(app)
+    client.buffer = buffer
+    return client
+
+
+def test_status_callback_rejects_an_invalid_signature(client):
+    params = {"MessageSid": "SM1", "MessageStatus": "delivered"}
+    response = client.post("/reminders/status-callback", data=params, headers={"X-Twilio-Signature": "forged"})
+    assert response.status_code == 403
+    assert client.buffer.drain(10) == []
+
+
+def test_status_callback_buffers_a_signed_receipt(client):
+    params = {"MessageSid": "SM1", "MessageStatus": "Delivered"}
+    url = "http://testserver/reminders/status-callback"
+    signature = RequestValidator(TWILIO_AUTH_TOKEN).compute_signature(url, params)
+    response = client.post("/reminders/status-callback", data=params, headers={"X-Twilio-Signature": signature})
+    assert response.status_code == 204
+    assert [receipt[:2] for receipt in client.buffer.drain(10)] == [("SM1", "delivered")]
+
+
+def test_shutdown_waits_for_the_running_flush_and_caps_the_passes(monkeypatch):
+    buffer, calls = delivery.MemoryReceiptBuffer(), []
+    for i in range(5):
+        buffer.append((f"SM{i}", "delivered", T0))
+
+    def slow_apply(db, receipts):
+        calls.append("start")
+        time.sleep(0.05)
+        calls.append("end")
+
+    async def shutdown():
+        flusher = asyncio.create_task(delivery.run_delivery_flusher(interval=0))
+        await asyncio.sleep(0.01)  # The flusher is inside its first flush
+        return await delivery.stop_delivery_flusher(flusher, max_passes=3)
+
+    flush = delivery.flush_delivery_receipts
+    monkeypatch.setattr(delivery, "get_receipt_buffer", lambda: buffer)
+    monkeypatch.setattr(delivery, "flush_delivery_receipts", lambda: flush(max_items=1))
+    monkeypatch.setattr(crud, "apply_delivery_receipts", slow_apply)
+    assert asyncio.run(shutdown()) == 3
+    assert calls == ["start", "end"] * 4  # Never two flushes at once
+    assert len(buffer.drain(10)) == 1
+
+
+def test_shutdown_flush_failure_is_logged_not_raised(monkeypatch, caplog):
+    def failing_flush(max_items=delivery.DELIVERY_FLUSH_BATCH):
+        raise RuntimeError("database is down")
+
+    async def shutdown():
+        flusher = asyncio.create_task(asyncio.sleep(3600))
+        return await delivery.stop_delivery_flusher(flusher)
+
+    monkeypatch.setattr(delivery, "flush_delivery_receipts", failing_flush)
+    assert asyncio.run(shutdown()) == 0
+    assert "leaving receipts buffered" in caplog.text
@@ -0,0 +1,31 @@
+import msgpack
+import orjson
+import pytest
+from app.utils.encoding import negotiate_format, rows_response, select_fields
+from datetime import datetime
+from uuid import uuid4
+
+FIELDS = ("id", "patient_id", "scheduled_time", "sent")
+
+
+def test_negotiate_format_uses_first_supported_type():
+    assert negotiate_format("application/msgpack, application/json") == "msgpack"
+    assert negotiate_format("application/vnd.compact+json;q=0.9") == "compact"
+    assert negotiate_format("text/html, */*") == "json"
+    assert negotiate_format(None) == "json"
+
+
+def test_select_fields_validates_and_keeps_request_order():
+    assert select_fields("sent, id,sent", FIELDS) == ["sent", "id"]
+    assert select_fields(None, FIELDS) == list(FIELDS)
+    with pytest.raises(ValueError):
+        select_fields("id,phone_number", FIELDS)
+
+
+def test_rows_response_encodings():
+    patient_id = uuid4()
+    rows = [(1, patient_id, datetime(2025, 8, 4, 9, 0), False)]
+    packed = msgpack.unpackb(rows_response(FIELDS, rows, "msgpack").body)
+    assert packed == {"fields": list(FIELDS), "rows": [[1, str(patient_id), "2025-08-04T09:00:00", False]]}
+    assert orjson.loads(rows_response(FIELDS, rows, "compact").body)["rows"] == packed["rows"]
+    assert orjson.loads(rows_response(FIELDS, rows, "json").body) == [dict(zip(FIELDS, packed["rows"][0]))]
@@ -0,0 +1,113 @@
+import pytest
+from cryptography.fernet import Fernet, MultiFernet
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app import crud, models, schemas
+from app.database import InstrumentedSession
+from app.dependencies import get_current_user, get_db
+from app.routers import reminders as reminders_router
+from app.utils import encryption
+from app.utils.encryption import EncryptedString, blind_index, decrypt_value, encrypt_many, encrypt_value
+from datetime import datetime
+
+engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=InstrumentedSession)
+
+
+@pytest.fixture
+def keys(monkeypatch):
+    # What ENCRYPTION_KEY configures at import
+    monkeypatch.setattr(encryption, "FIELD_ENCRYPTION_ENABLED", True)
+    monkeypatch.setattr(encryption, "cipher", MultiFernet([Fernet(Fernet.generate_key())]))
+    monkeypatch.setattr(encryption, "_blind_index_key", b"test-blind-index-key")
+    monkeypatch.setattr(crud, "BLIND_INDEX_ENABLED", True)
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        models.Base.metadata.drop_all(bind=engine)
+
+
+def test_encrypted_string_round_trip(keys):
+    column = EncryptedString(255)
+    stored = column.process_bind_param("+237612345678", None)
+    assert stored.startswith(encryption.FERNET_TOKEN_PREFIX)
+    assert len(stored) <= 255
+    assert column.process_result_value(stored, None) == "+237612345678"
+    assert column.process_bind_param(None, None) is None
+
+
+def test_legacy_plaintext_is_read_as_is(keys):
+    assert decrypt_value("+237612345678") == "+237612345678"
+    assert encrypt_value(encrypt_value("+237612345678")).startswith(encryption.FERNET_TOKEN_PREFIX)
+
+
+def test_encrypt_many_shares_one_token_per_distinct_value(keys):
+    first, second, missing, other = encrypt_many(["+237612345678", "+237612345678", None, "+237699999999"])
+    assert first == second and first != other and missing is None
+    assert [decrypt_value(token) for token in (first, other)] == ["+237612345678", "+237699999999"]
+
+
+def test_blind_index_is_deterministic_and_keyed(keys):
+    assert blind_index("+237612345678") == blind_index("+237612345678")
+    assert blind_index("+237612345678") != blind_index("+237699999999")
+    assert blind_index(None) is None
+
+
+def test_without_a_key_nothing_is_indexed_or_decryptable(monkeypatch):
+    monkeypatch.setattr(encryption, "cipher", None)
+    monkeypatch.setattr(encryption, "_blind_index_key", None)
+    assert blind_index("+237612345678") is None
+    with pytest.raises(ValueError, match="ENCRYPTION_KEY is not set"):
+        decrypt_value(encryption.FERNET_TOKEN_PREFIX + "x")
+
+
+def add_reminder(db, phone_number):
+    patient = models.Patient(name="Jane Doe", hashed_password="hash", role="patient")
+    db.add(patient)
+    db.flush()
+    db.add(models.Reminder(patient_id=patient.patient_id, patient_name=patient.name, phone_number=phone_number,
+                           appointment_reason="Checkup", language="english", method="sms",
+                           scheduled_time=datetime(2025, 8, 4, 9, 0), sent=False))
+    db.commit()
+
+
+def test_decrypted_values_are_cached_per_session(keys, db):
+    add_reminder(db, "+237612345678")
+    db.expire_all()
+    assert db.query(models.Reminder).one().phone_number == "+237612345678"
+    cache = db.info["decrypt_cache"]
+    assert list(cache.values()) == ["+237612345678"]
+
+    db.close()
+    assert cache == {} and "decrypt_cache" not in db.info
+    assert decrypt_value(encrypt_value("+237612345678")) == "+237612345678"
+    assert cache == {}
+
+
+def test_lookup_by_phone_is_admin_only_and_needs_a_key(keys, db, monkeypatch):
+    add_reminder(db, "+237612345678")
+    app = FastAPI()
+    app.include_router(reminders_router.router)
+    app.dependency_overrides[get_db] = lambda: db
+    user = schemas.Patient(patient_id="00000000-0000-0000-0000-000000000001", name="Admin", role="patient")
+    app.dependency_overrides[get_current_user] = lambda: user
+    client = TestClient(app)
+
+    assert client.get("/reminders/by-phone", params={"phone_number": "+237612345678"}).status_code == 403
+    user.role = "admin"
+    response = client.get("/reminders/by-phone", params={"phone_number": "+237 6 12 34 56 78"})
+    assert [r["appointment_reason"] for r in response.json()] == ["Checkup"]
+    assert client.get("/reminders/by-phone", params={"phone_number": "12345"}).status_code == 400
+
+    monkeypatch.setattr(crud, "BLIND_INDEX_ENABLED", False)
+    assert client.get("/reminders/by-phone", params={"phone_number": "+237612345678"}).status_code == 503
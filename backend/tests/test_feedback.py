@@ -0,0 +1,171 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app import crud, models, schemas
+from app.dependencies import get_current_user, get_db
+from app.routers import feedback as feedback_router
+from app.utils.idempotency import IdempotencyCache, MemoryIdempotencyStore
+from datetime import datetime
+from types import SimpleNamespace
+
+engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        models.Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def patient(db):
+    patient = models.Patient(name="Jane Doe", hashed_password="hash", role="patient")
+    db.add(patient)
+    db.commit()
+    return patient
+
+
+def submission(patient, feedback_id="FB-1", text="The wait was far too long"):
+    return schemas.FeedbackSubmit(feedback_id=feedback_id, text=text, rating=2, language="english",
+                                  department="Cardiology", patient_id=patient.patient_id)
+
+
+def test_feedback_id_is_unique_in_the_database(db, patient):
+    for _ in range(2):
+        db.add(models.Feedback(feedback_id="FB-1", patient_id=patient.patient_id, text="", rating=3,
+                               language="english", department="Cardiology", submitted_at=datetime.utcnow()))
+    with pytest.raises(IntegrityError):
+        db.commit()
+
+
+def test_concurrent_duplicate_submission_is_rejected(db, patient, monkeypatch):
+    crud.submit_feedback(db, submission(patient))
+    # The second request checked before the first committed: only the constraint can stop it
+    query = db.query
+    checks = []
+
+    def stale_check(*entities):
+        checks.append(entities)
+        return query(*entities).filter(False) if len(checks) == 1 else query(*entities)
+
+    monkeypatch.setattr(db, "query", stale_check)
+    with pytest.raises(ValueError, match="already exists"):
+        crud.submit_feedback(db, submission(patient))
+    monkeypatch.undo()
+    assert db.query(models.Feedback).count() == 1
+
+
+@pytest.fixture
+def analyses(monkeypatch):
+    calls = []
+
+    def analyze(db, feedback, user_id=None):
+        calls.append(feedback.feedback_id)
+        if getattr(analyze, "fail", False):
+            analyze.fail = False
+            raise RuntimeError("Sentiment model unavailable")
+        feedback.sentiment, feedback.theme, feedback.urgent = "negative", "Waiting time", False
+        db.commit()
+        return feedback
+
+    monkeypatch.setattr(crud, "analyze_feedback", analyze)
+    analyze.calls = calls
+    return analyze
+
+
+@pytest.fixture
+def client(db, patient, monkeypatch):
+    # One cache per worker; tests swap it to simulate a retry landing on another worker
+    monkeypatch.setattr(feedback_router, "get_submission_cache", lambda: client.cache)
+    app = FastAPI()
+    app.include_router(feedback_router.router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: client.user
+    client = TestClient(app, raise_server_exceptions=False)
+    client.cache = IdempotencyCache(MemoryIdempotencyStore())
+    client.user = schemas.Patient(patient_id=patient.patient_id, name=patient.name, role="patient")
+    return client
+
+
+def post(client, patient, feedback_id="FB-1"):
+    return client.post("/feedback/submit", content=submission(patient, feedback_id).model_dump_json())
+
+
+def test_retry_after_success_returns_the_stored_analysis(client, patient, analyses):
+    first = post(client, patient)
+    assert first.status_code == 200
+    assert post(client, patient).json() == first.json()
+    client.cache = IdempotencyCache(MemoryIdempotencyStore())  # Answered from the database
+    assert post(client, patient).json() == first.json()
+    assert analyses.calls == ["FB-1"]
+
+
+def test_retry_after_failed_analysis_runs_the_analysis_again(client, patient, analyses, db):
+    analyses.fail = True
+    assert post(client, patient).status_code == 500
+    response = post(client, patient)
+    assert response.status_code == 200
+    assert response.json()["sentiment"] == "negative"
+    assert analyses.calls == ["FB-1", "FB-1"]
+    assert db.query(models.Feedback).count() == 1
+
+
+def test_feedback_id_of_another_patient_is_a_conflict(client, patient, analyses, db):
+    assert post(client, patient).status_code == 200
+    other = models.Patient(name="John Roe", hashed_password="hash", role="patient")
+    db.add(other)
+    db.commit()
+    client.user = schemas.Patient(patient_id=other.patient_id, name=other.name, role="patient")
+    assert post(client, other).status_code == 409
+    client.cache = IdempotencyCache(MemoryIdempotencyStore())
+    assert post(client, other).status_code == 409
+    assert analyses.calls == ["FB-1"]
+
+
+def test_submission_racing_another_worker_is_treated_as_a_retry(client, patient, analyses, db, monkeypatch):
+    crud.submit_feedback(db, submission(patient))
+    # This worker looked the feedback up before the other one stored it
+    get_feedback = crud.get_feedback
+    lookups = []
+
+    def stale_lookup(db, feedback_id):
+        lookups.append(feedback_id)
+        return None if len(lookups) == 1 else get_feedback(db, feedback_id)
+
+    monkeypatch.setattr(crud, "get_feedback", stale_lookup)
+    response = post(client, patient)
+    assert response.status_code == 200
+    assert response.json()["patient_id"] == str(patient.patient_id)
+    assert db.query(models.Feedback).count() == 1
+
+
+def test_dashboard_export_is_queued_and_fetched_by_task_id(client, monkeypatch):
+    from app.tasks import export_feedback_csv_task
+
+    queued = []
+    monkeypatch.setattr(export_feedback_csv_task, "delay", lambda *args: queued.append(args) or SimpleNamespace(id="T1"))
+    results = {"T1": SimpleNamespace(state="STARTED"), "T2": SimpleNamespace(state="FAILURE")}
+    monkeypatch.setattr(export_feedback_csv_task, "AsyncResult", results.__getitem__)
+
+    assert client.post("/feedback/dashboard/export").status_code == 403
+    client.user = schemas.Patient(patient_id=client.user.patient_id, name="Admin", role="admin")
+    response = client.post("/feedback/dashboard/export", params={"start": "2025-08-01T00:00:00"})
+    assert (response.status_code, response.json()) == (202, {"task_id": "T1"})
+    assert queued == [("2025-08-01T00:00:00", None)]
+
+    response = client.get("/feedback/dashboard/export/T1")
+    assert (response.status_code, response.json()) == (202, {"task_id": "T1", "status": "started"})
+    results["T1"] = SimpleNamespace(state="SUCCESS", get=lambda: {"csv_data": "feedback_id\nFB-1\n"})
+    response = client.get("/feedback/dashboard/export/T1")
+    assert (response.status_code, response.json()) == (200, {"csv_data": "feedback_id\nFB-1\n"})
+    assert client.get("/feedback/dashboard/export/T2").status_code == 500
@@ -0,0 +1,38 @@
+from app.utils.idempotency import IdempotencyCache, MemoryIdempotencyStore, RedisIdempotencyStore
+import asyncio
+import fakeredis
+import pytest
+import redis
+
+
+def test_duplicates_wait_for_the_first_result():
+    cache = IdempotencyCache(MemoryIdempotencyStore(), wait_timeout=5)
+    calls = []
+
+    async def submit():
+        stored = await cache.get_or_claim("feedback_submit:FB-1")
+        if stored is not None:
+            return stored
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        cache.complete("feedback_submit:FB-1", '{"sentiment": "Positive"}')
+        return '{"sentiment": "Positive"}'
+
+    async def main():
+        return await asyncio.gather(submit(), submit(), submit())
+
+    assert asyncio.run(main()) == ['{"sentiment": "Positive"}'] * 3
+    assert calls == [1]
+
+
+def test_released_claim_lets_a_retry_do_the_work(monkeypatch):
+    monkeypatch.setattr(redis.Redis, "from_url", classmethod(lambda cls, url: fakeredis.FakeRedis()))
+    cache = IdempotencyCache(RedisIdempotencyStore(), wait_timeout=0.05)
+
+    assert asyncio.run(cache.get_or_claim("k")) is None
+    with pytest.raises(TimeoutError):
+        asyncio.run(cache.get_or_claim("k"))
+    cache.release("k")
+    assert asyncio.run(cache.get_or_claim("k")) is None
+    cache.complete("k", "done")
+    assert asyncio.run(cache.get_or_claim("k")) == "done"
@@ -0,0 +1,35 @@
+import pytest
+from twilio.rest import Client
+from app.utils.twilio_transport import create_http_client
+from loadtest.run import Results, parse_mix
+from loadtest.standins import start_fake_twilio
+
+
+def test_parse_mix_validates_scenarios():
+    assert parse_mix("reminder_list=3,submit=1") == {"reminder_list": 3, "submit": 1}
+    with pytest.raises(ValueError):
+        parse_mix("reminder_list=3,unknown=1")
+
+
+def test_results_report_error_rates_and_statuses():
+    results = Results(["submit", "trigger"], expected=10)
+    for status in ("200", "200", "500", "ReadTimeout"):
+        results.record("submit", 0.01, status)
+    report = results.summary(elapsed=2.0)
+    assert report["submit"]["requests"] == 4
+    assert report["submit"]["error_rate"] == 0.5
+    assert report["submit"]["statuses"] == {"200": 2, "500": 1, "ReadTimeout": 1}
+    assert "trigger" not in report
+
+
+def test_fake_twilio_accepts_messages_and_calls():
+    server = start_fake_twilio(latency=0)
+    try:
+        client = Client("AC" + "0" * 32, "token",
+                        http_client=create_http_client(base_url=f"http://127.0.0.1:{server.server_port}"))
+        message = client.messages.create(from_="+14155238886", to="+237600000001", body="Rappel")
+        call = client.calls.create(from_="+14155238886", to="+237600000001", twiml="<Response/>")
+        assert message.sid.startswith("SM") and call.sid.startswith("CA")
+    finally:
+        server.shutdown()
+        server.server_close()
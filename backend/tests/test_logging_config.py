@@ -0,0 +1,32 @@
+import json
+import logging
+from app.utils.logging_config import SAMPLED, JsonFormatter, SamplingFilter
+
+
+def make_record(msg, args=(), level=logging.INFO, **extra):
+    record = logging.LogRecord("app.crud", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampling_keeps_one_in_n_per_call_site():
+    sampling = SamplingFilter(every=10)
+    kept = [sampling.filter(make_record("Sent SMS to %s", ("+237",), **SAMPLED)) for _ in range(25)]
+    assert sum(kept) == 3 and kept[0]
+    assert sampling.filter(make_record("Other call site %s", ("x",), **SAMPLED))
+    assert all(sampling.filter(make_record("Sent SMS to %s", ("+237",))) for _ in range(5))
+
+
+def test_sampling_never_drops_warnings():
+    sampling = SamplingFilter(every=1000)
+    assert all(sampling.filter(make_record("Failed %s", ("x",), level=logging.WARNING, **SAMPLED)) for _ in range(5))
+
+
+def test_json_lines_carry_extra_fields():
+    record = make_record("Triggered %s reminders", (3,), node="clinic-1", **SAMPLED)
+    SamplingFilter(every=5).filter(record)
+    line = json.loads(JsonFormatter().format(record))
+    assert line["message"] == "Triggered 3 reminders"
+    assert line["level"] == "INFO" and line["logger"] == "app.crud"
+    assert line["node"] == "clinic-1" and line["sample_rate"] == 5
+    assert "sampled" not in line and "args" not in line
@@ -0,0 +1,92 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app import crud, models
+from app.database import create_db_engine, query_recorders
+from app.utils.metrics import RequestMetricsMiddleware, get_counter, get_recorder, render_prometheus
+from datetime import datetime, timedelta
+
+reminder_engine = create_engine("sqlite://")
+
+
+def test_render_prometheus_emits_cumulative_buckets_per_label_set():
+    fast = get_recorder("test_stage", "Stage latency", labels={"stage": "tokenization"})
+    slow = get_recorder("test_stage", labels={"stage": "forward_pass"})
+    fast.observe(0.002)
+    fast.observe(0.02)
+    slow.observe(3.0, error=True)
+    get_counter("test_sent", "Messages sent", labels={"method": "sms"}).inc(2)
+
+    output = render_prometheus()
+    assert output.count("# TYPE test_stage_seconds histogram") == 1
+    assert 'test_stage_seconds_bucket{stage="tokenization",le="0.005"} 1' in output
+    assert 'test_stage_seconds_bucket{stage="tokenization",le="0.025"} 2' in output
+    assert 'test_stage_seconds_bucket{stage="tokenization",le="+Inf"} 2' in output
+    assert 'test_stage_seconds_bucket{stage="forward_pass",le="2.5"} 0' in output
+    assert 'test_stage_errors_total{stage="forward_pass"} 1' in output
+    assert 'test_sent_total{method="sms"} 2.0' in output
+
+
+def test_request_middleware_labels_by_route_template():
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get("/test-items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/test-items/1")
+    client.get("/test-items/2")
+    client.get("/test-missing")
+
+    labels = {"route": "/test-items/{item_id}", "method": "GET", "status": "200"}
+    assert get_recorder("http_request", labels=labels).snapshot()["count"] == 2
+    assert get_recorder("http_request", labels={"route": "unmatched", "method": "GET", "status": "404"}).snapshot()["count"] >= 1
+
+
+def test_queries_are_timed_by_statement_verb():
+    engine = create_db_engine("sqlite://")
+    before = query_recorders["SELECT"].snapshot()["count"]
+    errors = query_recorders["OTHER"].snapshot()["errors"]
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        try:
+            conn.execute(text("BOGUS STATEMENT"))
+        except Exception:
+            pass
+    assert query_recorders["SELECT"].snapshot()["count"] == before + 1
+    assert query_recorders["OTHER"].snapshot()["errors"] == errors + 1
+
+
+def test_request_middleware_groups_unknown_methods():
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+    client = TestClient(app)
+    client.request("BREW", "/test-coffee")
+    client.request("PROPFIND", "/test-coffee")
+
+    assert get_recorder("http_request", labels={"route": "unmatched", "method": "other", "status": "404"}).snapshot()["count"] == 2
+    assert 'method="BREW"' not in render_prometheus()
+
+
+def test_reminder_sends_are_counted_per_reminder(monkeypatch):
+    models.Base.metadata.create_all(bind=reminder_engine)
+    db = sessionmaker(bind=reminder_engine)()
+    patient = models.Patient(name="Jane Doe", hashed_password="hash", role="patient")
+    db.add(patient)
+    db.flush()
+    for reason in ("Checkup", "Blood test"):
+        db.add(models.Reminder(patient_id=patient.patient_id, patient_name=patient.name, phone_number="+237612345678",
+                               appointment_reason=reason, language="english", method="sms",
+                               scheduled_time=datetime.utcnow() - timedelta(minutes=5), sent=False))
+    db.commit()
+    monkeypatch.setattr(crud, "send_sms", lambda phone_number, message, language: "SM1")
+    sent = get_counter("reminders_sent", labels={"method": "sms"})
+    before = sent.value
+
+    assert crud.trigger_reminders(db) == 2
+    assert sent.value == before + 2  # Two reminders, coalesced into one message
+    db.close()
+    models.Base.metadata.drop_all(bind=reminder_engine)
@@ -0,0 +1,17 @@
+from app.utils import nlp
+
+
+def test_local_languages_are_translated_from_the_parallel_corpus(tmp_path, monkeypatch):
+    dataset = tmp_path / "eng_douala.csv"
+    dataset.write_text("text,translation,department\nNa si  tondi,I am not happy,General\n", encoding="utf-8")
+    monkeypatch.setitem(nlp.DATASET_PATHS, "eng_douala", str(dataset))
+    nlp.load_translation_table.cache_clear()
+
+    assert nlp.translate_to_english("na si tondi", "douala") == "I am not happy"
+    assert nlp.translate_to_english("Mbolo", "douala") == "Mbolo"
+    assert nlp.translate_to_english("Très bon accueil", "french") == "Très bon accueil"
+    nlp.load_translation_table.cache_clear()
+
+
+def test_batches_too_small_to_cluster_get_no_theme():
+    assert nlp.extract_themes(["The wait was long"]) == ["No theme"]
@@ -0,0 +1,15 @@
+from datetime import date
+from app.utils.partitions import month_start, monthly_partitions
+
+
+def test_month_start_crosses_year_boundaries():
+    assert month_start(date(2025, 11, 17), 2) == date(2026, 1, 1)
+    assert month_start(date(2025, 1, 31), -1) == date(2024, 12, 1)
+
+
+def test_monthly_partitions_cover_the_range():
+    assert monthly_partitions("feedback", date(2025, 12, 15), date(2026, 2, 1)) == [
+        ("feedback_y2025m12", date(2025, 12, 1), date(2026, 1, 1)),
+        ("feedback_y2026m01", date(2026, 1, 1), date(2026, 2, 1)),
+        ("feedback_y2026m02", date(2026, 2, 1), date(2026, 3, 1)),
+    ]
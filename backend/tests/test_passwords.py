@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app import models, schemas
+from app.dependencies import get_current_user, get_db
+from app.routers import admin, auth
+from app.utils import passwords
+from app.utils.passwords import PasswordHasherBusy, hash_password, verify_password_async
+
+engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        models.Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.include_router(admin.router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: client.user
+    client = TestClient(app)
+    client.user = schemas.Patient(patient_id="00000000-0000-0000-0000-000000000001", name="Admin", role="admin")
+    return client
+
+
+def test_checks_run_on_the_pool():
+    hashed = hash_password("s3cret")
+    assert asyncio.run(verify_password_async("s3cret", hashed)) == (True, None)
+    assert asyncio.run(verify_password_async("wrong", hashed)) == (False, None)
+    assert passwords._pending == 0
+
+
+def test_checks_beyond_the_admission_limit_are_rejected(monkeypatch):
+    monkeypatch.setattr(passwords, "_pending", passwords.PASSWORD_HASH_MAX_PENDING)
+    rejected = passwords._rejected
+    with pytest.raises(PasswordHasherBusy):
+        asyncio.run(verify_password_async("s3cret", hash_password("s3cret")))
+    assert passwords._rejected == rejected + 1
+    assert passwords.get_password_pool_stats()["pending"] == passwords.PASSWORD_HASH_MAX_PENDING
+
+
+def test_login_rehashes_a_password_with_another_cost(client, db):
+    patient = models.Patient(name="Jane Doe", hashed_password=bcrypt.using(rounds=4).hash("s3cret"), role="patient")
+    db.add(patient)
+    db.commit()
+    response = client.post("/auth/token", data={"username": "Jane Doe", "password": "s3cret"})
+    assert response.status_code == 200
+    db.refresh(patient)
+    assert bcrypt.from_string(patient.hashed_password).rounds == passwords.BCRYPT_ROUNDS
+    assert client.post("/auth/token", data={"username": "Jane Doe", "password": "wrong"}).status_code == 401
+
+
+def test_login_is_refused_while_the_pool_is_saturated(client, db, monkeypatch):
+    db.add(models.Patient(name="Jane Doe", hashed_password=hash_password("s3cret"), role="patient"))
+    db.commit()
+    monkeypatch.setattr(passwords, "_pending", passwords.PASSWORD_HASH_MAX_PENDING)
+    response = client.post("/auth/token", data={"username": "Jane Doe", "password": "s3cret"})
+    assert (response.status_code, response.headers["Retry-After"]) == (503, "1")
+
+
+def test_pool_stats_are_admin_only(client):
+    stats = client.get("/admin/passwords/pool").json()
+    assert stats["workers"] == passwords.PASSWORD_HASH_WORKERS and "p95" in stats["wait"]
+    client.user = schemas.Patient(patient_id=client.user.patient_id, name="Jane Doe", role="patient")
+    assert client.get("/admin/passwords/pool").status_code == 403
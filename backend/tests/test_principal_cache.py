@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+from uuid import uuid4
+import time
+from app.utils.principal_cache import PrincipalCache
+
+
+def make_principal():
+    return SimpleNamespace(patient_id=uuid4(), name="Jane Doe", role="patient")
+
+
+def test_cached_principal_is_returned_until_ttl():
+    cache = PrincipalCache(ttl=0.05, max_size=10)
+    principal = make_principal()
+    cache.put("token", principal)
+    assert cache.get("token") is principal
+    time.sleep(0.06)
+    assert cache.get("token") is None
+
+
+def test_entry_never_outlives_token_expiry():
+    cache = PrincipalCache(ttl=60, max_size=10)
+    cache.put("token", make_principal(), token_expires_at=time.time() - 1)
+    assert cache.get("token") is None
+
+
+def test_invalidate_patient_drops_all_their_tokens():
+    cache = PrincipalCache(ttl=60, max_size=10)
+    principal, other = make_principal(), make_principal()
+    cache.put("first", principal)
+    cache.put("second", principal)
+    cache.put("other", other)
+    cache.invalidate_patient(principal.patient_id)
+    assert cache.get("first") is None and cache.get("second") is None
+    assert cache.get("other") is other
+
+
+def test_cache_is_bounded_by_least_recent_use():
+    cache = PrincipalCache(ttl=60, max_size=2)
+    first, second, third = make_principal(), make_principal(), make_principal()
+    cache.put("first", first)
+    cache.put("second", second)
+    cache.get("first")
+    cache.put("third", third)
+    assert cache.get("second") is None
+    assert cache.get("first") is first and cache.get("third") is third
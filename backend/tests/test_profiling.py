@@ -0,0 +1,56 @@
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from app.utils.profiling import ProfilingMiddleware, SamplingProfiler
+import time
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def make_client():
+    async def authorize(token):
+        if token != "admin-token":
+            raise HTTPException(status_code=403, detail="Not authorized")
+
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, authorize=authorize, interval=0.001)
+
+    @app.get("/work")
+    def work():
+        return {"total": busy_loop(0.1)}
+
+    return TestClient(app)
+
+
+def test_profiler_collapses_and_exports_speedscope():
+    with SamplingProfiler(interval=0.001) as profiler:
+        busy_loop(0.1)
+    collapsed = profiler.collapsed()
+    assert profiler.samples > 0
+    assert "busy_loop (test_profiling.py:" in collapsed
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+
+    document = profiler.speedscope("test")
+    frames = document["shared"]["frames"]
+    assert any(frame["name"] == "busy_loop" for frame in frames)
+    for profile in document["profiles"]:
+        assert len(profile["samples"]) == len(profile["weights"])
+        assert all(index < len(frames) for sample in profile["samples"] for index in sample)
+
+
+def test_requests_are_profiled_only_for_authorized_callers():
+    client = make_client()
+    assert client.get("/work").json()["total"] > 0
+
+    denied = client.get("/work", headers={"X-Profile": "collapsed", "Authorization": "Bearer patient-token"})
+    assert denied.status_code == 403
+
+    profiled = client.get("/work", headers={"X-Profile": "speedscope", "Authorization": "Bearer admin-token"})
+    assert profiled.status_code == 200
+    assert profiled.headers["x-profile-status"] == "200"
+    assert any(frame["name"] == "busy_loop" for frame in profiled.json()["shared"]["frames"])
@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import crud, models
+from app.utils.encryption import blind_index
+from app.utils.reminder_import import parse_reminder_batch, validate_reminder_batch
+from datetime import datetime
+from uuid import uuid4
+
+engine = create_engine("sqlite://")
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+HEADER = "patient_id,patient_name,phone_number,appointment_reason,language,method,scheduled_time"
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        models.Base.metadata.drop_all(bind=engine)
+
+
+def validate(payload, content_type="text/csv"):
+    df, parse_errors = parse_reminder_batch(payload.encode(), content_type)
+    valid, errors = validate_reminder_batch(df, crud.VALID_REMINDER_METHODS, crud.VALID_LANGUAGES)
+    return valid, parse_errors + errors
+
+
+def test_invalid_rows_are_reported_per_field():
+    pid = uuid4()
+    valid, errors = validate("\n".join([
+        HEADER,
+        f"{pid},Jane Doe,+237 6 12 34 56 78,Checkup,french,sms,2025-08-04T09:00:00+01:00",
+        f"{pid},Jane Doe,12345,Checkup,french,sms,2025-08-04T09:00:00",
+        f"{pid},Jane Doe,,Checkup,klingon,pigeon,2025-08-04T09:00:00",
+        f"not-a-uuid,,,{'x' * 256},english,sms,tomorrow",
+    ]))
+    assert [(e["row"], e["field"]) for e in errors] == [
+        (2, "phone_number"), (3, "method"), (3, "language"),
+        (4, "patient_id"), (4, "scheduled_time"), (4, "patient_name"), (4, "appointment_reason"),
+    ]
+    assert list(valid.index) == [1]
+    row = valid.loc[1]
+    assert (row["patient_id"], row["phone_number"]) == (pid, "+237612345678")
+    assert row["scheduled_time"] == datetime(2025, 8, 4, 8, 0)  # Stored as naive UTC
+    assert pd.isna(row["medication_list"])
+
+
+def test_ndjson_lines_that_are_not_objects_are_reported():
+    pid = uuid4()
+    record = ('{"patient_id": "%s", "patient_name": "Jane Doe", "phone_number": null, "appointment_reason": "Checkup", '
+              '"language": "english", "method": "call", "scheduled_time": "2025-08-04T09:00:00"}' % pid)
+    valid, errors = validate("\n".join([record, "[1, 2]", "{broken", record]), "application/x-ndjson")
+    assert [(e["row"], e["field"]) for e in errors] == [(2, None), (3, None)]
+    assert list(valid.index) == [1, 4]
+
+
+def test_unsupported_uploads_are_rejected():
+    with pytest.raises(ValueError, match="Missing required columns"):
+        parse_reminder_batch(b"patient_id,patient_name\nx,y\n", "text/csv")
+    with pytest.raises(ValueError, match="Unsupported content type"):
+        parse_reminder_batch(b"{}", "application/xml")
+
+
+def test_bulk_create_inserts_known_patients_and_reports_unknown_ones(db):
+    patient = models.Patient(name="Jane Doe", hashed_password="hash", role="patient")
+    db.add(patient)
+    db.commit()
+    valid, errors = validate("\n".join([
+        HEADER,
+        f"{patient.patient_id},Jane Doe,+237612345678,Checkup,english,sms,2025-08-04T09:00:00",
+        f"{uuid4()},John Roe,+237612345679,Checkup,english,sms,2025-08-04T09:00:00",
+        f"{patient.patient_id},Jane Doe,,Follow-up,french,call,2025-08-05T09:00:00",
+    ]))
+    assert errors == []
+
+    created, errors = crud.bulk_create_reminders(db, valid)
+    assert created == 2
+    assert errors == [{"row": 2, "field": "patient_id", "error": "Patient not found"}]
+    reminders = db.query(models.Reminder).order_by(models.Reminder.scheduled_time).all()
+    assert [r.appointment_reason for r in reminders] == ["Checkup", "Follow-up"]
+    assert reminders[0].phone_number == "+237612345678"
+    assert reminders[0].phone_number_index == blind_index("+237612345678")
+    assert reminders[1].phone_number is None and not reminders[1].sent
+    assert len({r.uid for r in reminders}) == 2
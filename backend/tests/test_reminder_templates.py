@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+from uuid import uuid4
+from app import crud
+from app.utils.reminder_templates import render_reminders, render_reminder_groups, get_template, voice_language
+from app.utils.reminders import build_twiml, coalesce_reminders
+
+
+def make_reminder(language, medications=None, consultations=None):
+    return SimpleNamespace(
+        language=language,
+        patient_name="Jane Doe",
+        appointment_reason="Follow-up visit",
+        medication_list=medications,
+        consultation_list=consultations
+    )
+
+
+def test_render_reminders_uses_each_reminder_language():
+    messages = render_reminders([
+        make_reminder("english", medications="Aspirin"),
+        make_reminder("french", consultations="Cardiologie"),
+    ])
+    assert messages == [
+        "Reminder for Jane Doe: Follow-up visit\nMedications: Aspirin",
+        "Rappel pour Jane Doe : Follow-up visit\nConsultations : Cardiologie",
+    ]
+
+
+def test_stored_local_language_reminders_fall_back_to_french_wording():
+    assert crud.VALID_LANGUAGES == {"english", "french"}
+    for language in ("douala", "bassa"):
+        assert get_template(language).language == language
+        assert render_reminders([make_reminder(language)]) == ["Rappel pour Jane Doe : Follow-up visit"]
+        assert voice_language(language) == "fr-FR"
+
+
+def test_unknown_language_uses_english_template():
+    assert render_reminders([make_reminder("spanish")]) == ["Reminder for Jane Doe: Follow-up visit"]
+
+
+def test_build_twiml_is_cached_by_content():
+    first = build_twiml("Rappel pour Jane Doe", "french")
+    assert 'language="fr-FR"' in first
+    assert build_twiml("Rappel pour Jane Doe", "french") is first
+    assert build_twiml("Rappel pour Jane Doe", "english") is not first
+
+
+def test_coalesced_group_renders_one_message():
+    group = [make_reminder("french", medications="Paracétamol"), make_reminder("french", consultations="Cardiologie")]
+    group[1].appointment_reason = "Prise de sang"
+    assert render_reminder_groups([group, group[:1]]) == [
+        "Rappels pour Jane Doe :\n- Follow-up visit\nMédicaments : Paracétamol\n- Prise de sang\nConsultations : Cardiologie",
+        "Rappel pour Jane Doe : Follow-up visit\nMédicaments : Paracétamol",
+    ]
+
+
+def test_coalesce_reminders_groups_by_recipient_within_window():
+    start = datetime(2025, 7, 26, 8, 0)
+    patient = uuid4()
+
+    def due(minutes, method="sms", patient_id=patient):
+        return SimpleNamespace(patient_id=patient_id, phone_number="+237987654321", method=method,
+                               language="english", scheduled_time=start + timedelta(minutes=minutes))
+
+    appointment, medication, late, call, other = due(0), due(30), due(90), due(10, "call"), due(5, patient_id=uuid4())
+    groups = coalesce_reminders([late, medication, other, appointment, call], timedelta(minutes=60))
+
+    assert groups == [[appointment, medication], [other], [call], [late]]
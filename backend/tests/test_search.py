@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import models
+from app.utils.search import create_search_indexes, apply_text_search
+from uuid import uuid4
+from datetime import datetime
+
+engine = create_engine("sqlite://")
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    models.Base.metadata.create_all(bind=engine)
+    create_search_indexes(engine)
+    yield
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS reminders_fts")
+    models.Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db():
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def add_reminder(db, reason, medications=None, consultations=None, language="english"):
+    reminder = models.Reminder(
+        patient_id=uuid4(),
+        patient_name="Jane Doe",
+        phone_number="+237987654321",
+        appointment_reason=reason,
+        medication_list=medications,
+        consultation_list=consultations,
+        language=language,
+        method="sms",
+        scheduled_time=datetime.utcnow()
+    )
+    db.add(reminder)
+    db.commit()
+    return reminder
+
+
+def search(db, term):
+    query = apply_text_search(db.query(models.Reminder), term, engine.dialect.name)
+    return [r.appointment_reason for r in query.all()]
+
+
+def test_search_matches_all_text_columns(db):
+    add_reminder(db, "Follow-up visit", medications="Aspirin")
+    add_reminder(db, "Vaccination", consultations="Cardiology review")
+    add_reminder(db, "Blood test")
+
+    assert search(db, "aspirin") == ["Follow-up visit"]
+    assert search(db, "cardio") == ["Vaccination"]
+    assert search(db, "follow") == ["Follow-up visit"]
+
+
+def test_search_tracks_updates_and_deletes(db):
+    reminder = add_reminder(db, "Visite de suivi", language="french")
+    reminder.appointment_reason = "Consultation prénatale"
+    db.commit()
+    assert search(db, "suivi") == []
+    assert search(db, "prénatale") == ["Consultation prénatale"]
+
+    db.delete(reminder)
+    db.commit()
+    assert search(db, "prénatale") == []
+
+
+def test_short_terms_fall_back_to_substring_match(db):
+    add_reminder(db, "ECG check")
+    add_reminder(db, "Dental cleaning")
+
+    assert search(db, "EC") == ["ECG check"]
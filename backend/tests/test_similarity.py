@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import models
+from app.utils.embeddings import EMBEDDING_DIM, hash_texts
+from app.utils.similarity import find_similar_feedback, save_feedback_embeddings
+from datetime import datetime, timedelta
+
+engine = create_engine("sqlite://")
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+TEXTS = [
+    ("Cardiology", "The wait in the emergency room was far too long"),
+    ("Cardiology", "Waited far too long in the emergency room"),
+    ("Pharmacy", "We waited far too long at the emergency room"),
+    ("Cardiology", "The nurses were kind and the food was good"),
+]
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        models.Base.metadata.drop_all(bind=engine)
+
+
+def add_feedback(db):
+    patient = models.Patient(name="Jane Doe", hashed_password="hash", role="patient")
+    db.add(patient)
+    db.flush()
+    submitted = datetime(2025, 8, 1, 9, 0)
+    feedbacks = [
+        models.Feedback(feedback_id=f"FB-{index}", patient_id=patient.patient_id, text=text, rating=3,
+                        language="english", department=department, submitted_at=submitted + timedelta(days=index))
+        for index, (department, text) in enumerate(TEXTS)
+    ]
+    db.add_all(feedbacks)
+    db.flush()
+    save_feedback_embeddings(db, feedbacks, hash_texts([text for _, text in TEXTS]))
+    db.commit()
+    return feedbacks
+
+
+def test_embeddings_are_stored_as_float16(db):
+    feedback_id = add_feedback(db)[0].id
+    db.expunge_all()
+    stored = db.get(models.FeedbackEmbedding, feedback_id).embedding
+    assert stored.dtype == np.float32 and stored.shape == (EMBEDDING_DIM,)
+    assert abs(float(np.linalg.norm(stored)) - 1.0) < 1e-2
+
+
+def test_similar_feedback_is_ranked_and_filtered(db):
+    first, second, pharmacy, unrelated = add_feedback(db)
+
+    similar = find_similar_feedback(db, first, k=3)
+    assert [fb.feedback_id for fb, _ in similar][-1] == unrelated.feedback_id
+    assert similar[0][1] > similar[-1][1]
+
+    same_department = find_similar_feedback(db, first, k=3, department="Cardiology")
+    assert [fb.feedback_id for fb, _ in same_department] == [second.feedback_id, unrelated.feedback_id]
+    assert [fb.feedback_id for fb, _ in find_similar_feedback(db, first, start=pharmacy.submitted_at)] == \
+        [pharmacy.feedback_id, unrelated.feedback_id]
+
+    db.query(models.FeedbackEmbedding).filter(models.FeedbackEmbedding.id == first.id).delete()
+    assert find_similar_feedback(db, first) is None
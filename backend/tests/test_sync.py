@@ -0,0 +1,213 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import crud, models, schemas
+from app.utils import sync
+from app.utils.encoding import models_response, schema_columns
+from app.utils.sync import collect_changes, collect_reminder_changes, decode_records, encode_records
+from pydantic import TypeAdapter
+from typing import List
+from uuid import uuid4
+from datetime import datetime, timedelta
+import orjson
+
+engine = create_engine("sqlite://")
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        models.Base.metadata.drop_all(bind=engine)
+
+
+def add_patient_with_reminders(db, count):
+    patient = models.Patient(name="Jane Doe", hashed_password="hash", phone_number="+237987654321", role="patient")
+    db.add(patient)
+    db.flush()
+    scheduled = datetime(2025, 8, 4, 9, 0)
+    for offset in range(count):
+        db.add(models.Reminder(
+            patient_id=patient.patient_id, patient_name=patient.name, phone_number=patient.phone_number,
+            appointment_reason="Checkup", language="english", method="sms",
+            scheduled_time=scheduled + timedelta(days=offset), sent=False,
+        ))
+    db.commit()
+    return patient
+
+
+def test_records_round_trip_through_gzip_ndjson(db):
+    patient = add_patient_with_reminders(db, 1)
+    records, _ = collect_changes(db)
+    decoded = decode_records(encode_records(records), "gzip")
+    assert [record["type"] for record in decoded] == ["patient", "reminder"]
+    assert decoded[0]["patient_id"] == patient.patient_id
+    assert decoded[1]["scheduled_time"] == datetime(2025, 8, 4, 9, 0)
+    assert decoded[1]["uid"] == db.query(models.Reminder).one().uid
+
+
+def test_decode_rejects_unknown_record_types():
+    with pytest.raises(ValueError):
+        decode_records(b'{"type": "session"}\n')
+
+
+def test_collect_changes_pages_reminders_by_watermark(db):
+    add_patient_with_reminders(db, 3)
+    records, watermarks = collect_changes(db, batch_size=2)
+    assert sum(record["type"] == "reminder" for record in records) == 2
+    state = db.get(models.SyncState, "reminders")
+    state.last_id, state.last_updated_at = watermarks["reminders"]
+    db.commit()
+    records, _ = collect_changes(db, batch_size=2)
+    assert sum(record["type"] == "reminder" for record in records) == 1
+
+
+def test_reminder_changes_send_only_what_changed_since_the_cursor(db, monkeypatch):
+    monkeypatch.setattr(sync, "REMINDER_SYNC_SETTLE", 0)
+    patient = add_patient_with_reminders(db, 3)
+    first = collect_reminder_changes(db, patient.patient_id, limit=2)
+    assert first["full"] and first["has_more"] and len(first["reminders"]) == 2
+    second = collect_reminder_changes(db, patient.patient_id, first["cursor"], limit=2)
+    assert not second["full"] and not second["has_more"] and len(second["reminders"]) == 1
+
+    idle = collect_reminder_changes(db, patient.patient_id, second["cursor"])
+    assert idle["reminders"] == [] and idle["deleted"] == []
+
+    sent, deleted = db.query(models.Reminder).order_by(models.Reminder.id).limit(2).all()
+    sent.sent = True
+    db.add(models.ReminderTombstone(reminder_id=deleted.id, uid=deleted.uid, patient_id=patient.patient_id))
+    db.delete(deleted)
+    db.commit()
+    # Not yet settled: a concurrent transaction could still commit an earlier updated_at
+    monkeypatch.setattr(sync, "REMINDER_SYNC_SETTLE", 60)
+    assert collect_reminder_changes(db, patient.patient_id, idle["cursor"])["reminders"] == []
+
+    monkeypatch.setattr(sync, "REMINDER_SYNC_SETTLE", 0)
+    changes = collect_reminder_changes(db, patient.patient_id, idle["cursor"])
+    assert [r.id for r in changes["reminders"]] == [sent.id] and changes["reminders"][0].sent
+    assert changes["deleted"] == [deleted.id]
+
+
+def test_projected_reminder_changes_validate_into_the_schema(db, monkeypatch):
+    monkeypatch.setattr(sync, "REMINDER_SYNC_SETTLE", 0)
+    patient = add_patient_with_reminders(db, 3)
+    columns = schema_columns(models.Reminder, schemas.Reminder)
+    first = collect_reminder_changes(db, patient.patient_id, limit=2, columns=columns)
+    assert not any(isinstance(row, models.Reminder) for row in first["reminders"])
+    second = collect_reminder_changes(db, patient.patient_id, first["cursor"], limit=2, columns=columns)
+
+    adapter = TypeAdapter(List[schemas.Reminder])
+    reminders = adapter.validate_python(first["reminders"] + second["reminders"])
+    assert [r.id for r in reminders] == [r.id for r in db.query(models.Reminder).order_by(models.Reminder.id)]
+    body = orjson.loads(models_response(adapter, second["reminders"]).body)
+    assert body[0]["patient_id"] == str(patient.patient_id) and body[0]["sent"] is False
+
+
+def patient_record(name="Jane Doe", role="patient"):
+    return {"type": "patient", "patient_id": uuid4(), "name": name, "hashed_password": "hash",
+            "phone_number": None, "role": role}
+
+
+def feedback_record(patient, feedback_id):
+    return {"type": "feedback", "feedback_id": feedback_id, "patient_id": patient["patient_id"], "text": "Long wait",
+            "rating": 2, "language": "english", "sentiment": None, "theme": None, "urgent": None,
+            "department": "Cardiology", "submitted_at": datetime(2025, 8, 4, 9, 0)}
+
+
+def test_ingest_never_grants_a_node_role(db):
+    admin = patient_record("Node Admin", role="admin")
+    counts = crud.ingest_sync_records(db, [admin, feedback_record(admin, "FB-1")], node="clinic-1")
+    assert counts["patients"] == counts["feedback"] == 0
+    assert [(s["type"], s["reason"]) for s in counts["skipped"]] == [
+        ("patient", "Role 'admin' is not synced"), ("feedback", "Unknown patient")]
+    assert db.query(models.Patient).count() == 0
+
+
+def test_ingest_skips_a_patient_whose_name_is_taken(db):
+    existing = add_patient_with_reminders(db, 0)
+    taken, fresh = patient_record(existing.name), patient_record("John Roe")
+    records = [taken, fresh, feedback_record(taken, "FB-1"), feedback_record(fresh, "FB-2")]
+    counts = crud.ingest_sync_records(db, [dict(record) for record in records], node="clinic-1")
+    assert (counts["patients"], counts["feedback"]) == (1, 1)
+    assert [(s["type"], s["id"]) for s in counts["skipped"]] == [
+        ("patient", str(taken["patient_id"])), ("feedback", "FB-1")]
+    assert {p.name for p in db.query(models.Patient)} == {"Jane Doe", "John Roe"}
+    assert [f.feedback_id for f in db.query(models.Feedback)] == ["FB-2"]
+
+    # Re-sending the batch changes nothing
+    counts = crud.ingest_sync_records(db, [dict(record) for record in records], node="clinic-1")
+    assert (counts["patients"], counts["feedback"], len(counts["skipped"])) == (0, 0, 2)
+
+
+def reminder_record(patient, version=1, **fields):
+    record = {"type": "reminder", "uid": fields.pop("uid", uuid4()), "patient_id": patient["patient_id"],
+              "patient_name": patient["name"], "phone_number": None, "appointment_reason": "Checkup",
+              "medication_list": None, "consultation_list": None, "language": "english", "method": "sms",
+              "scheduled_time": datetime(2025, 8, 4, 9, 0), "sent": False, "sent_at": None, "message_sid": None,
+              "delivery_status": None, "delivery_updated_at": None, "version": version}
+    return {**record, **fields}
+
+
+def test_node_reminders_stay_dispatched_by_the_node(db, monkeypatch):
+    patient = patient_record()
+    reminder = reminder_record(patient, scheduled_time=datetime(2000, 1, 1))
+    crud.ingest_sync_records(db, [dict(patient), dict(reminder)], node="clinic-1")
+    assert db.query(models.Reminder).one().origin_node == "clinic-1"
+    monkeypatch.setattr(crud, "send_sms", lambda *args: pytest.fail("central sent a node reminder"))
+    assert crud.trigger_reminders(db) == 0
+
+    # Another node cannot take it over or delete it
+    counts = crud.ingest_sync_records(db, [reminder_record(patient, version=5, uid=reminder["uid"]),
+                                           {"type": "reminder_deleted", "uid": reminder["uid"]}], node="clinic-2")
+    assert (counts["reminders_updated"], counts["reminders_deleted"], len(counts["skipped"])) == (0, 0, 2)
+
+
+def test_ingest_merges_by_node_version_and_never_undoes_a_receipt(db):
+    patient = patient_record()
+    uid = uuid4()
+    crud.ingest_sync_records(db, [dict(patient), reminder_record(patient, uid=uid)], node="clinic-1")
+    stored = db.query(models.Reminder).one()
+    # The status callback reached the central API before the node pushed the send
+    stored.sent, stored.message_sid, stored.delivery_status = True, "SM1", "delivered"
+    db.commit()
+    central_version = stored.version
+
+    sent = reminder_record(patient, version=3, uid=uid, appointment_reason="Follow-up", sent=True,
+                           sent_at=datetime(2025, 8, 4, 9, 0), message_sid="SM1", delivery_status="sent")
+    assert crud.ingest_sync_records(db, [dict(sent)], node="clinic-1")["reminders_updated"] == 1
+    db.refresh(stored)
+    assert (stored.appointment_reason, stored.sent, stored.delivery_status) == ("Follow-up", True, "delivered")
+    assert (stored.origin_version, stored.version) == (3, central_version + 1)
+
+    # An older version, resent or delayed, changes nothing whatever the node's clock said
+    assert crud.ingest_sync_records(db, [reminder_record(patient, version=2, uid=uid)], node="clinic-1")["reminders_updated"] == 0
+    assert crud.ingest_sync_records(db, [dict(sent)], node="clinic-1")["reminders_updated"] == 0
+
+
+def test_node_deletions_are_pushed_but_moves_are_not(db):
+    patient = add_patient_with_reminders(db, 2)
+    other = models.Patient(name="John Roe", hashed_password="hash", role="patient")
+    db.add(other)
+    db.commit()
+    moved, deleted = db.query(models.Reminder).order_by(models.Reminder.id).all()
+    db.add(crud._tombstone(moved))
+    moved.patient_id = other.patient_id
+    db.commit()
+    crud.delete_reminder(db, deleted.id)
+
+    records, watermarks = collect_changes(db)
+    deletions = [r for r in decode_records(encode_records(records), "gzip") if r["type"] == "reminder_deleted"]
+    assert [r["uid"] for r in deletions] == [deleted.uid]
+    assert watermarks["reminder_tombstones"][0] == max(t.id for t in db.query(models.ReminderTombstone))
+
+    # Central side: the deletion removes the node's reminder and tombstones it for patient delta sync
+    central = patient_record("Ann Roe")
+    crud.ingest_sync_records(db, [dict(central), reminder_record(central, uid=deleted.uid)], node="clinic-1")
+    assert crud.ingest_sync_records(db, deletions, node="clinic-1")["reminders_deleted"] == 1
+    assert db.query(models.Reminder).filter(models.Reminder.uid == deleted.uid).count() == 0
+    assert db.query(models.ReminderTombstone).filter(models.ReminderTombstone.patient_id == central["patient_id"]).count() == 1
@@ -0,0 +1,29 @@
+from app.utils import transcription
+from app.utils.transcription import spool_upload, store_audio
+import asyncio
+import os
+import pytest
+
+
+async def chunks(count, size=64 * 1024):
+    for index in range(count):
+        yield bytes([index % 256]) * size
+
+
+def test_large_upload_spills_to_disk_and_is_stored(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcription, "AUDIO_DIR", str(tmp_path))
+    spool, size = asyncio.run(spool_upload(chunks(40)))
+    assert size == 40 * 64 * 1024
+    assert spool._rolled  # Above AUDIO_SPOOL_MEMORY the upload no longer sits in memory
+
+    path = store_audio(spool, "audio/ogg; codecs=opus")
+    assert spool.closed
+    assert os.path.dirname(path) == str(tmp_path) and os.path.splitext(path)[1] in (".oga", ".ogg")
+    with open(path, "rb") as f:
+        data = f.read()
+    assert len(data) == size and data[-1] == 39
+
+
+def test_upload_above_limit_is_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(spool_upload(chunks(5), max_bytes=4 * 64 * 1024))
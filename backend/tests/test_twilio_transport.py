@@ -0,0 +1,72 @@
+import json
+import threading
+import pytest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from twilio.rest import Client
+from app.utils.metrics import LatencyRecorder, render_prometheus
+from app.utils.twilio_transport import create_http_client
+
+
+class FakeTwilioHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    statuses = []
+    paths = []
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.paths.append(self.path)
+        status = self.statuses.pop(0) if self.statuses else 201
+        body = json.dumps({"sid": f"SM{len(self.paths)}", "status": "queued"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_twilio():
+    FakeTwilioHandler.statuses = []
+    FakeTwilioHandler.paths = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTwilioHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_are_sent_to_stand_in_and_recorded(fake_twilio):
+    recorder = LatencyRecorder("test_twilio_request")
+    client = Client("ACtest", "token", http_client=create_http_client(base_url=fake_twilio, recorder=recorder))
+
+    for _ in range(3):
+        message = client.messages.create(from_="+14155238886", to="+237987654321", body="Rappel")
+
+    assert message.sid == "SM3"
+    assert all(path == "/2010-04-01/Accounts/ACtest/Messages.json" for path in FakeTwilioHandler.paths)
+    snapshot = recorder.snapshot()
+    assert snapshot["count"] == 3
+    assert snapshot["errors"] == 0
+    assert snapshot["p99"] > 0
+
+
+def test_rate_limited_requests_are_retried(fake_twilio):
+    FakeTwilioHandler.statuses = [429]
+    client = Client("ACtest", "token", http_client=create_http_client(base_url=fake_twilio, backoff_factor=0))
+
+    message = client.messages.create(from_="+14155238886", to="+237987654321", body="Rappel")
+
+    assert message.sid == "SM2"
+    assert len(FakeTwilioHandler.paths) == 2
+
+
+def test_default_transport_reports_to_the_metrics_registry(fake_twilio):
+    client = Client("ACtest", "token", http_client=create_http_client(base_url=fake_twilio))
+    client.messages.create(from_="+14155238886", to="+237987654321", body="Rappel")
+    assert "twilio_request_seconds_count " in render_prometheus()